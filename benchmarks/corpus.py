@@ -0,0 +1,168 @@
+"""
+HTML corpus of the extraction benchmark (see benchmarks.extraction).
+
+Pages in 'fixtures' follow the markup of the hosts' pages, with links of every
+supported host in forum posts. Large forum pages are generated on demand,
+the same generator with a fixed seed rewrites the stored fixtures:
+
+    python -m benchmarks.corpus
+"""
+from benchmarks.standin import StandInServer, forum_post, forum_page, image_link
+from pathlib import Path
+from typing import Dict
+import random
+import string
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+SEED = 1000
+
+_LOWER = string.ascii_lowercase + string.digits
+_MIXED = string.ascii_letters + string.digits
+
+
+def _token(rng: random.Random, length: int, alphabet: str = _MIXED) -> str:
+    return "".join(rng.choices(alphabet, k=length))
+
+
+# Links of a forum post by host, with the share of posts linking the host
+def _imagebam(rng, i):
+    token = _token(rng, 16, _LOWER)
+    return image_link(f"https://www.imagebam.com/image/{token}",
+                      f"https://thumbs{rng.randint(1, 4)}.imagebam.com/{token[:2]}/{token[2:4]}/{token}_t.jpg")
+
+
+def _imagetwist(rng, i):
+    token = _token(rng, 12, _LOWER)
+    name = f"{rng.randint(1000, 4000)}x{rng.randint(1000, 4000)}_{_token(rng, 32, _LOWER)}.jpg"
+    return image_link(f"https://imagetwist.com/{token}/{name}",
+                      f"https://img{rng.randint(1, 9)}.imagetwist.com/th/{rng.randint(10000, 60000)}/{token}.jpg")
+
+
+def _pixhost(rng, i):
+    image = f"{rng.randint(100000000, 999999999)}_set-{i}_{_token(rng, 11, _LOWER)}.jpg"
+    directory = rng.randint(100, 999)
+    return image_link(f"https://pixhost.to/show/{directory}/{image}",
+                      f"https://t{rng.randint(1, 90)}.pixhost.to/thumbs/{directory}/{image}")
+
+
+def _imgbox(rng, i):
+    token = _token(rng, 8)
+    return image_link(f"https://imgbox.com/{token}",
+                      f"https://thumbs2.imgbox.com/{_token(rng, 2, _LOWER)}/{_token(rng, 2, _LOWER)}/{token}_t.png")
+
+
+def _jpgchurch(rng, i):
+    token = _token(rng, 19, _LOWER)
+    return image_link(f"https://jpg.church/img/{token}",
+                      f"https://simp{rng.randint(1, 6)}.jpg.church/images/{token}.md.jpg")
+
+
+def _albums(rng, i):
+    links = [
+        f"https://bunkr.is/a/{_token(rng, 8)}",
+        f"https://cyberdrop.me/a/{_token(rng, 8)}",
+        f"https://gofile.io/d/{_token(rng, 6)}",
+        f"https://jpg.church/a/set-{i}.{_token(rng, 5)}",
+        f"https://pixl.is/album/set{i}.{_token(rng, 5)}",
+        f"https://pixeldrain.com/l/{_token(rng, 8)}",
+        f"https://stream.bunkr.is/v/clip_{i}-{_token(rng, 8)}.mp4",
+        f"https://anonfiles.com/{_token(rng, 10)}/clip_{i}_mp4",
+    ]
+    link = rng.choice(links)
+    return f'<a href="{link}" target="_blank" rel="nofollow">{link}</a>'
+
+
+def _attachment(rng, i):
+    return f'<a href="https://forum.thotsbay.com/attachments/set-{i}-{rng.randint(1, 99)}-jpg.' \
+           f'{rng.randint(10000, 99999)}/" target="_blank" class="file-preview">' \
+           f'<img src="https://forum.thotsbay.com/data/attachments/{rng.randint(10, 99)}/thumb.jpg" /></a>'
+
+
+POST_LINKS = (
+    (_imagebam, 25),
+    (_imagetwist, 25),
+    (_pixhost, 15),
+    (_imgbox, 10),
+    (_jpgchurch, 10),
+    (_albums, 10),
+    (_attachment, 5),
+)
+
+_QUOTE = '<div style="margin:20px; margin-top:5px; "><div class="smallfont" style="margin-bottom:2px">Quote:</div>' \
+         '<table cellpadding="6" cellspacing="0" border="0" width="100%"><tr><td class="alt2" ' \
+         'style="border:1px inset">Originally Posted by <strong>poster{poster}</strong> ' \
+         'thanks for the new set, more of the older ones please</td></tr></table></div>'
+
+
+def mixed_post(rng: random.Random, number: int) -> str:
+    """Forum post with a few links of the hosts, the text and quotes real posts have."""
+    kinds, weights = zip(*POST_LINKS)
+    parts = []
+    if rng.random() < 0.2:
+        parts.append(_QUOTE.format(poster=rng.randint(1, 97)))
+    parts.append(f"Set {number}, {rng.randint(2, 80)} pics<br />")
+    for kind in rng.choices(kinds, weights, k=rng.randint(1, 8)):
+        parts.append(kind(rng, number))
+    if rng.random() < 0.3:
+        parts.append("<br /><br />Thanks to the original uploader. Enjoy!")
+    return forum_post(number, "\n".join(parts))
+
+
+def forum_thread(posts: int, seed: int = SEED) -> str:
+    """Forum thread page of 'posts' posts of mixed host links."""
+    rng = random.Random(seed)
+    return forum_page("Bench Model", [mixed_post(rng, number) for number in range(1, posts + 1)], 1, 3)
+
+
+def cyberdrop_album(files: int, seed: int = SEED) -> str:
+    rng = random.Random(seed)
+    items = []
+    for i in range(files):
+        extension = rng.choice((".jpg", ".jpeg", ".png", ".mp4"))
+        source = f"https://fs-{rng.randint(1, 6):02d}.cyberdrop.me/{_token(rng, 8)}-{_token(rng, 6)}{extension}"
+        items.append(
+            f'<div class="image-container column" id="file"><a class="image" href="{source}" target="_blank" '
+            f'title="IMG_{i:04d}{extension}" data-fancybox="gallery"><img alt="IMG_{i:04d}{extension}" '
+            f'data-src="https://fs-01.cyberdrop.me/thumbs/{_token(rng, 8)}.png" src="/images/loading.svg"></a>'
+            f'<div class="details"><p><span class="name">IMG_{i:04d}{extension}</span></p>'
+            f'<p class="is-size-7">{rng.randint(100, 9000)} KB</p></div></div>'
+        )
+    return (
+        f'<!DOCTYPE html><html><head><title>Cyberdrop - Bench Album</title></head><body>\n'
+        f'<section class="section"><h1 id="title" class="title has-text-centered" title="Bench Album">\n'
+        f'Bench Album\n</h1><p class="subtitle">{files} files</p>\n'
+        f'<div id="table" class="columns is-multiline is-mobile is-centered">\n'
+        + "\n".join(items) +
+        f'\n</div></section></body></html>\n'
+    )
+
+
+def host_pages(items: int) -> Dict[str, str]:
+    """Album pages of the stand-in hosts with 'items' items on a page."""
+    server = StandInServer(items=items, page_size=items)
+    return {
+        "bunkr_album": server.bunkr("/a/benchAlb", {})[1],
+        "jpgchurch_album": server.jpgchurch("/a/bench.NXbench", {})[1],
+        "pixl_album": server.pixl("/album/bench.PXbench", {})[1],
+        "cyberdrop_album": cyberdrop_album(items),
+    }
+
+
+def fixtures() -> Dict[str, str]:
+    """Pages of the stored corpus by name."""
+    pages = host_pages(100)
+    pages["forum_thread"] = forum_thread(40)
+    return pages
+
+
+def load_fixtures() -> Dict[str, str]:
+    return {path.stem: path.read_text() for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+if __name__ == '__main__':
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    for name, html in fixtures().items():
+        path = FIXTURES_DIR / f"{name}.html"
+        path.write_text(html)
+        print(f"{path} {len(html) / 1024:.1f} KB")
@@ -0,0 +1,73 @@
+"""
+Classification of a batch of urls, the scraper index against trying every scraper in order.
+
+    python -m benchmarks.dispatch --urls 100000
+"""
+from scrapers import get_scraper_classes, MANIFEST
+from scrapers.dispatch import ScraperIndex
+from argparse import ArgumentParser
+import random
+import time
+
+UNSUPPORTED = (
+    "https://example.com/gallery/{n}",
+    "https://www.reddit.com/r/pics/comments/{n}/",
+    "https://imgur.com/a/{n}",
+    "https://cdn{n}.example.org/file.jpg",
+)
+
+
+def batch_urls(count: int, unsupported: float, seed: int = 0) -> list:
+    """Sample urls of the scrapers with varied ids, 'unsupported' share of them of other hosts."""
+    rng = random.Random(seed)
+    samples = [url for scraper in get_scraper_classes() for url in scraper.SAMPLE_URLS]
+    urls = []
+    for n in range(count):
+        if rng.random() < unsupported:
+            urls.append(rng.choice(UNSUPPORTED).format(n=n))
+            continue
+        url = rng.choice(samples)
+        # Changed id keeps the url matching, the scanners can't rely on repeated urls
+        head, _, tail = url.rpartition("/")
+        urls.append(f"{head}/{tail[:-4]}{n % 10}{tail[-3:]}" if len(tail) > 4 else url)
+    return urls
+
+
+def linear_scan(urls: list) -> list:
+    result = []
+    for url in urls:
+        for scraper in get_scraper_classes():
+            if scraper.is_suitable(url):
+                result.append(scraper)
+                break
+        else:
+            result.append(None)
+    return result
+
+
+def run(count: int, unsupported: float):
+    urls = batch_urls(count, unsupported)
+
+    start = time.perf_counter()
+    expected = linear_scan(urls)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ScraperIndex(MANIFEST)
+    classified = index.classify(urls)
+    indexed = time.perf_counter() - start
+
+    mismatches = sum(a is not b for a, b in zip(expected, classified))
+    matched = sum(scraper is not None for scraper in expected)
+    print(f"{count} urls, {matched} supported, {mismatches} mismatches")
+    print(f"linear scan   {linear:8.3f}s  {count / linear:10.0f} urls/s")
+    print(f"scraper index {indexed:8.3f}s  {count / indexed:10.0f} urls/s  ({linear / indexed:.1f}x)")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Url to scraper dispatch benchmark.")
+    parser.add_argument('--urls', type=int, default=100000, help="Urls of the batch. (default=100000)")
+    parser.add_argument('--unsupported', type=float, default=0.2,
+                        help="Share of urls no scraper handles. (default=0.2)")
+    args = parser.parse_args()
+    run(args.urls, args.unsupported)
@@ -0,0 +1,204 @@
+"""
+End-to-end throughput of LoLs against the local stand-in of the hosts (see benchmarks.standin).
+
+Urls of the sites are scraped and downloaded by LoLs as in a real run, the session
+of LoLs sends every request to the stand-in, so no network access is needed.
+Reports items/s, MB/s, peak RSS of the process (the stand-in runs in it too)
+and request counts, optionally written as json to compare runs.
+
+    python -m benchmarks.end_to_end --items 200 --sizes 64,1024 --workers 8
+    python -m benchmarks.end_to_end --sites forum --latency 50 --throttle 25 --json forum.json
+"""
+from benchmarks.standin import StandInServer, SITES, SITE_URLS, parse_sizes
+from downloader.hosts import HostPolicyAdapter, HostPolicy, host_of
+from downloader.summary import DOWNLOADED
+from downloader.journal import DownloadJournal
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit, urlunsplit
+from contextlib import redirect_stdout
+from argparse import ArgumentParser
+from pathlib import Path
+from lols import LoLs
+import tempfile
+import json
+import time
+import sys
+import os
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+class _LocalHTTPAdapter(HTTPAdapter):
+    """Sends requests to the stand-in, the original host goes in the 'Host' header."""
+    def __init__(self, address: str, **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+
+    def send(self, request, **kwargs):
+        url = request.url
+        parts = urlsplit(url)
+        request.headers["Host"] = parts.hostname
+        request.url = urlunsplit(("http", self.address, parts.path, parts.query, ""))
+        response = super().send(request, **kwargs)
+        # Scrapers see the url they requested
+        response.url = url
+        request.url = url
+        return response
+
+
+class LocalAdapter(HostPolicyAdapter):
+    """Policy adapter of LoLs, with connection pools of every host connected to the stand-in."""
+    def __init__(self,
+                 address: str,
+                 policies: dict = None,
+                 host_workers: int = None,
+                 segments: int = 1,
+                 scrape_workers: int = 0
+                 ):
+        super().__init__(policies, host_workers, segments, scrape_workers)
+        self.address = address
+
+    def _adapter(self, domain: str, policy: HostPolicy) -> HTTPAdapter:
+        with self._lock:
+            if domain not in self._adapters:
+                self._adapters[domain] = _LocalHTTPAdapter(
+                    self.address,
+                    pool_connections=policy.pool_connections,
+                    pool_maxsize=self.pool_maxsize(policy)
+                )
+            return self._adapters[domain]
+
+
+class BenchmarkLoLs(LoLs):
+    def extractor_method(self, url, extractor):
+        # Output directory isn't asked for
+        return [extractor(self.downloader).iter_items(url)], host_of(url)
+
+
+def peak_rss() -> int:
+    """Peak resident memory of the process in bytes, 0 if unknown."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run(server: StandInServer, sites: list, **options) -> dict:
+    """Runs LoLs on the urls of the sites in a temporary directory, returns the results."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            # Scrapers save their auth config in here
+            Path("config").mkdir()
+            Path("urls.txt").write_text("\n".join(SITE_URLS[site] for site in sites) + "\n")
+            lols = BenchmarkLoLs(load_from_file="urls.txt", separate=True, save_urls=False, progress="plain", **options)
+            # Pools sized as the ones of LoLs
+            sizing = lols.host_adapter
+            adapter = LocalAdapter(server.address, sizing.policies, sizing.host_workers, sizing.segments,
+                                   sizing.scrape_workers)
+            lols.session.mount("https://", adapter)
+            lols.session.mount("http://", adapter)
+
+            # Reports of LoLs are left out
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                lols.main()
+                elapsed = time.perf_counter() - start
+
+            written = sum(path.stat().st_size for path in lols.downloader.output_path.rglob("*")
+                          if path.is_file() and path.name != DownloadJournal.FILE_NAME)
+        finally:
+            os.chdir(cwd)
+
+    counts = lols.summary.counts()
+    hosts = lols.metrics.snapshot()["hosts"]
+    received = sum(stats["counters"].get("bytes", 0) for stats in hosts.values())
+    expected_items, expected_bytes = server.expected(sites)
+    return {
+        "sites": sites,
+        "options": options,
+        "seconds": round(elapsed, 3),
+        "items": sum(counts.values()),
+        "expected_items": expected_items,
+        "statuses": dict(counts),
+        "items_per_second": round(counts[DOWNLOADED] / elapsed, 2),
+        "bytes": received,
+        "expected_bytes": expected_bytes,
+        "written_bytes": written,
+        "mb_per_second": round(received / elapsed / 1024 / 1024, 2),
+        "peak_rss": peak_rss(),
+        "requests": sum(stats["counters"].get("requests", 0) for stats in hosts.values()),
+        "server": dict(server.counters),
+    }
+
+
+def report(result: dict):
+    print(f"Sites: {', '.join(result['sites'])}  options: "
+          + ", ".join(f"{name}={value}" for name, value in result["options"].items()))
+    statuses = ", ".join(f"{status} {count}" for status, count in sorted(result["statuses"].items()))
+    print(f"  items       {result['items']}/{result['expected_items']} ({statuses})")
+    print(f"  time        {result['seconds']:.2f}s")
+    print(f"  items/s     {result['items_per_second']:.1f}")
+    print(f"  MB/s        {result['mb_per_second']:.1f}  "
+          f"({result['bytes'] / 1024 / 1024:.1f}/{result['expected_bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"  peak RSS    {result['peak_rss'] / 1024 / 1024:.1f} MB")
+    server = result["server"]
+    print(f"  requests    {result['requests']} sent, {server.get('requests', 0)} served: "
+          f"{server.get('pages', 0)} pages, {server.get('files', 0)} files, "
+          f"{server.get('throttled', 0)} throttled, {server.get('not_found', 0)} not found")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="End-to-end benchmark against local stand-in hosts.")
+    parser.add_argument('--sites', default=",".join(SITES),
+                        help=f"Comma separated sites to run. (default={','.join(SITES)})")
+    parser.add_argument('--items', type=int, default=100, help="Files of every site. (default=100)")
+    parser.add_argument('--sizes', default="256",
+                        help="Comma separated file sizes in KB, cycled over the files. (default=256)")
+    parser.add_argument('--page-size', type=int, default=40,
+                        help="Items on a page of albums and threads. (default=40)")
+    parser.add_argument('--latency', type=float, default=0, help="Delay of every response in ms. (default=0)")
+    parser.add_argument('--throttle', type=int, default=0, metavar='N',
+                        help="Every N-th request of a host is answered by 429, 0 disables. (default=0)")
+    parser.add_argument('--retry-after', type=float, default=1,
+                        help="'Retry-After' of throttled responses in seconds. (default=1)")
+    parser.add_argument('--workers', type=int, default=1, help="LoLs download workers. (default=1)")
+    parser.add_argument('--host-workers', type=int, default=4, help="LoLs downloads per host. (default=4)")
+    parser.add_argument('--resolve-workers', type=int, default=4, help="LoLs resolve workers. (default=4)")
+    parser.add_argument('--segments', type=int, default=1, help="LoLs segments per download. (default=1)")
+    parser.add_argument('--max-request-rate', type=float, default=20.0,
+                        help="LoLs requests per second of a host. (default=20.0)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="LoLs chunk size in KB. (default=64)")
+    parser.add_argument('--json', metavar='FILE', help="Write the results as json.")
+    args = parser.parse_args()
+
+    sites = [site.strip() for site in args.sites.split(",") if site.strip()]
+    unknown = set(sites) - set(SITES)
+    if unknown:
+        parser.error(f"Unknown sites {sorted(unknown)}, expected some of {SITES}")
+
+    with StandInServer(
+            items=args.items,
+            page_size=args.page_size,
+            sizes=parse_sizes(args.sizes),
+            latency=args.latency / 1000,
+            throttle=args.throttle,
+            retry_after=args.retry_after
+    ) as stand_in:
+        result = run(
+            stand_in, sites,
+            workers=args.workers,
+            host_workers=args.host_workers,
+            resolve_workers=args.resolve_workers,
+            segments=args.segments,
+            max_request_rate=args.max_request_rate,
+            chunk_size=args.chunk_size
+        )
+    report(result)
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
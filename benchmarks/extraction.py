@@ -0,0 +1,116 @@
+"""
+Parse time and allocations of the extraction paths on the HTML corpus (see benchmarks.corpus).
+
+'_extract_from_html' of every extractor is timed on forum pages, as done for every
+crawled page, album parsing of the album extractors on album pages. Next to the stored
+fixtures, forum pages of '--posts' posts and albums of '--album-items' items are generated.
+
+    python -m benchmarks.extraction --posts 1000,5000 --album-items 2000
+    python -m benchmarks.extraction --filter Pixl
+"""
+from benchmarks.corpus import load_fixtures, forum_thread, host_pages
+from scrapers.bunkr import BunkrAlbumExtractor
+from scrapers.cyberdrop import CyberdropAlbumExtractor
+from scrapers.jpgchurch import JPGChurchExtractor
+from scrapers.pixl import PixlAlbumExtractor
+from scrapers import get_scraper_classes
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Tuple
+import tracemalloc
+import timeit
+
+
+class _Page:
+    status_code = 200
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FixtureDownloader:
+    """Answers every request of a scraper with the page."""
+    def __init__(self, html: str):
+        self.html = html
+
+    def send_request(self, url, method='GET', **kwargs):
+        return _Page(self.html)
+
+
+def _extracted(extractor: type, url: str) -> Callable:
+    return lambda html: list(extractor(FixtureDownloader(html))._extract_data(url))
+
+
+# (target name, page kind, function of the page html)
+def targets() -> List[Tuple[str, str, Callable]]:
+    extractors = [scraper for scraper in get_scraper_classes() if scraper.SCRAPER_TYPE == "EXTRACTOR"]
+    result = [(f"{extractor.__name__}._extract_from_html", "forum", extractor._extract_from_html)
+              for extractor in extractors]
+    result.append(("all extractors ._extract_from_html", "forum",
+                   lambda html: [link for extractor in extractors for link in extractor._extract_from_html(html) or ()]))
+    result += [
+        ("JPGChurchExtractor._extract_content_links", "jpgchurch", JPGChurchExtractor()._extract_content_links),
+        ("PixlAlbumExtractor._extract_images", "pixl", PixlAlbumExtractor()._extract_images),
+        ("PixlAlbumExtractor._extract_album_name", "pixl", PixlAlbumExtractor()._extract_album_name),
+        ("CyberdropAlbumExtractor._extract_data", "cyberdrop",
+         _extracted(CyberdropAlbumExtractor, "https://cyberdrop.me/a/benchAlb")),
+        ("BunkrAlbumExtractor._extract_data", "bunkr", _extracted(BunkrAlbumExtractor, "https://bunkr.is/a/benchAlb")),
+    ]
+    return result
+
+
+def corpus(posts: List[int], album_items: int) -> Dict[str, str]:
+    """Pages by name, fixtures first, the name starts with the page kind."""
+    pages = load_fixtures()
+    for count in posts:
+        pages[f"forum_thread_{count}_posts"] = forum_thread(count)
+    if album_items:
+        for name, html in host_pages(album_items).items():
+            pages[f"{name}_{album_items}_items"] = html
+    return pages
+
+
+def found(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        return 1
+    return len(result)
+
+
+def measure(func: Callable, html: str, repeat: int) -> Tuple[float, int, int]:
+    """(best seconds of a call, items found, peak bytes allocated by a call)"""
+    timer = timeit.Timer(lambda: func(html))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number)) / number
+
+    tracemalloc.start()
+    result = func(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, found(result), peak
+
+
+def run(posts: List[int], album_items: int, repeat: int, name_filter: str = None):
+    pages = corpus(posts, album_items)
+    functions = targets()
+    print(f"{'Target':<48}{'Page':<36}{'KB':>8}{'found':>7}{'ms':>10}{'MB/s':>10}{'peak KB':>9}")
+    for page_name, html in pages.items():
+        for name, kind, func in functions:
+            if not page_name.startswith(kind) or (name_filter and name_filter.lower() not in name.lower()):
+                continue
+            seconds, count, peak = measure(func, html, repeat)
+            size = len(html)
+            print(f"{name[:47]:<48}{page_name[:35]:<36}{size / 1024:>8.1f}{count:>7}{seconds * 1000:>10.3f}"
+                  f"{size / seconds / 1024 / 1024:>10.1f}{peak / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Extraction microbenchmark on the HTML corpus.")
+    parser.add_argument('--posts', default="1000,5000",
+                        help="Comma separated post counts of generated forum pages. (default=1000,5000)")
+    parser.add_argument('--album-items', type=int, default=2000,
+                        help="Items of generated album pages, 0 for fixtures only. (default=2000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs of every target. (default=3)")
+    parser.add_argument('--filter', help="Only targets containing the text.")
+    args = parser.parse_args()
+    run([int(count) for count in args.posts.split(",") if count.strip()], args.album_items, args.repeat, args.filter)
@@ -0,0 +1,51 @@
+"""
+Memory taken by scraped items, the slotted Item against the former plain class.
+
+    python -m benchmarks.item_memory --items 200000
+"""
+from downloader.downloader import Item
+from argparse import ArgumentParser
+import tracemalloc
+
+
+class PlainItem:
+    """Item as it was before, with per-instance __dict__ and no interning."""
+    def __init__(self, content_type: str, filename: str, extension: str, source: str, album_title: str = None):
+        self.content_type = content_type
+        self.album_title = album_title
+        self.filename = filename
+        self.extension = extension
+        self.source = source
+
+
+def fields(i: int) -> dict:
+    # Values are built at runtime like the ones parsed from html/json,
+    # so equal strings are separate objects unless interned
+    album = i // 500
+    return dict(
+        content_type="".join(["im", "age"]),
+        filename=f"IMG_{i:08d}",
+        extension="".join([".", "jpg"]),
+        source=f"https://cdn{i % 12}.bunkr.is/IMG_{i:08d}-{i * 7919 % 100000:05d}.jpg",
+        album_title=f"Forum thread {album} - model name",
+    )
+
+
+def measure(cls, count: int) -> float:
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    items = [cls(**fields(i)) for i in range(count)]
+    size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(start, "filename"))
+    tracemalloc.stop()
+    assert len(items) == count
+    # The list itself is the same for both
+    return (size - 8 * count) / count
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Item memory benchmark.")
+    parser.add_argument('--items', type=int, default=200000, help="Number of items. (default=200000)")
+    args = parser.parse_args()
+
+    for cls in (PlainItem, Item):
+        print(f"{cls.__name__:<10} {measure(cls, args.items):8.1f} bytes per item")
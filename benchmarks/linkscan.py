@@ -0,0 +1,53 @@
+"""
+Links of crawled forum pages, the single-pass LinkScanner against '_extract_from_html' of every extractor.
+
+    python -m benchmarks.linkscan --posts 1000,5000
+"""
+from benchmarks.corpus import load_fixtures, forum_thread
+from scrapers import get_link_scanner
+from argparse import ArgumentParser
+import timeit
+
+
+def per_extractor(extractors: list, html: str) -> dict:
+    """Links as found by the crawler before the scanner, every extractor on the whole page."""
+    result = {}
+    for extractor in extractors:
+        links = extractor._extract_from_html(html)
+        if links:
+            result[extractor] = links
+    return result
+
+
+def run(posts: list, repeat: int):
+    scanner = get_link_scanner()
+    pages = {name: html for name, html in load_fixtures().items() if name.startswith("forum")}
+    for count in posts:
+        pages[f"forum_thread_{count}_posts"] = forum_thread(count)
+
+    extractors = [entry.load() for entry in scanner.entries]
+    print(f"{'Page':<28}{'KB':>8}{'links':>7}{'extractors ms':>15}{'scanner ms':>12}{'speedup':>9}")
+    for name, html in pages.items():
+        expected = per_extractor(extractors, html)
+        found = scanner.scan(html)
+        if {extractor: sorted(links) for extractor, links in expected.items()} != \
+                {extractor: sorted(links) for extractor, links in found.items()}:
+            print(f"{name}: links differ")
+
+        timer = timeit.Timer(lambda: per_extractor(extractors, html))
+        number, _ = timer.autorange()
+        old = min(timer.repeat(repeat, number)) / number
+        timer = timeit.Timer(lambda: scanner.scan(html))
+        number, _ = timer.autorange()
+        new = min(timer.repeat(repeat, number)) / number
+        print(f"{name[:27]:<28}{len(html) / 1024:>8.1f}{sum(map(len, found.values())):>7}"
+              f"{old * 1000:>15.2f}{new * 1000:>12.2f}{old / new:>8.1f}x")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Link scanning benchmark on forum pages.")
+    parser.add_argument('--posts', default="1000,5000",
+                        help="Comma separated post counts of generated forum pages. (default=1000,5000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs of every page. (default=3)")
+    args = parser.parse_args()
+    run([int(count) for count in args.posts.split(",") if count.strip()], args.repeat)
@@ -0,0 +1,399 @@
+"""
+Local stand-in for the hosts of the scrapers, used by the offline benchmarks.
+
+A single HTTP server answers for every host, the host is taken from the 'Host'
+header of the request (see benchmarks.end_to_end for routing a session to it):
+
+    bunkr.is                album page with '__NEXT_DATA__' json
+    api.gofile.io           'createAccount' and 'getContent' api with nested folders,
+                            'locked' folders require GOFILE_PASSWORD
+    jpg.church, pixl.is     albums paginated by 'data-pagination="next"' links
+    planetsuzy.org          multi-page thread linking imagebam and imagetwist images
+    www.imagebam.com,
+    imagetwist.com          image pages with the direct link
+    any other host          synthetic file, its size is encoded in the file name
+
+Every site has 'items' files of sizes cycled from 'sizes', albums and threads
+have 'page_size' of them per page. Every response is delayed by 'latency' seconds,
+with 'throttle' set every n-th request of a host is answered by 429.
+"""
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+from collections import Counter
+from hashlib import sha256
+from typing import List, Sequence
+import threading
+import json
+import re
+import os
+import sys
+
+SITES = ("bunkr", "gofile", "jpgchurch", "pixl", "forum")
+
+# Entry url of every site
+SITE_URLS = {
+    "bunkr": "https://bunkr.is/a/benchAlb",
+    "gofile": "https://gofile.io/d/bench0",
+    "jpgchurch": "https://jpg.church/a/bench.NXbench",
+    "pixl": "https://pixl.is/album/bench.PXbench",
+    "forum": "http://planetsuzy.org/t1000-bench-model.html",
+}
+
+GOFILE_DEPTH = 3  # levels of nested folders
+GOFILE_PASSWORD = "bench"
+FORUM_THREAD = "t1000-bench-model.html"
+FORUM_TITLE = "Bench Model"
+
+PATTERN_FILE_SIZE = re.compile(r"s(\d+)\.\w+$")
+PATTERN_PAGE_NUMBER = re.compile(r"-p(\d+)-")
+
+_BLOCK = os.urandom(1024 * 1024)  # content of synthetic files, repeated
+
+
+def file_name(site: str, index: int, size: int, extension: str = ".jpg") -> str:
+    """Name of a synthetic file, the stand-in serves 'size' bytes for it."""
+    return f"{site}{index:06d}s{size}{extension}"
+
+
+def pages(count: int, page_size: int) -> int:
+    return max(1, -(-count // page_size))
+
+
+def seek(page: int) -> str:
+    """'seek' query parameter of paginated albums."""
+    return f"2022-01-01+00%3A00%3A{page:02d}.bench"
+
+
+def forum_page_name(page: int) -> str:
+    thread_id, name = FORUM_THREAD.split("-", 1)
+    return FORUM_THREAD if page == 1 else f"{thread_id}-p{page}-{name}"
+
+
+def forum_post(number: int, message: str) -> str:
+    """vBulletin-like post with the message html."""
+    return (
+        f'<table class="tborder" id="post{number}" cellpadding="6" cellspacing="0" border="0" width="100%">\n'
+        f'<tr><td class="alt2" width="175"><a class="bigusername" href="member.php?u={number % 97}">'
+        f'poster{number % 97}</a><div class="smallfont">Join Date: Jan 2015<br />Posts: {number * 7 % 5000}'
+        f'</div></td>\n'
+        f'<td class="alt1" id="td_post_{number}"><div id="post_message_{number}">\n{message}\n'
+        f'</div></td></tr>\n</table>\n'
+    )
+
+
+def image_link(link: str, thumbnail: str) -> str:
+    return f'<a href="{link}" target="_blank"><img src="{thumbnail}" border="0" alt="" /></a>'
+
+
+def forum_page(title: str, posts: Sequence[str], page: int, page_count: int) -> str:
+    """vBulletin-like thread page of the posts, linking the next page."""
+    next_link = ""
+    if page < page_count:
+        next_link = f'<a rel="next" class="smallfont" href="{forum_page_name(page + 1)}" ' \
+                    f'title="Next Page - Results {page * len(posts) + 1}">&gt;</a>'
+    return (
+        f'<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN">\n'
+        f'<html><head><title>{title} - Free Porn & Adult Videos Forum</title>\n'
+        f'<link rel="stylesheet" type="text/css" href="clientscript/vbulletin_css/style-00001.css" />\n'
+        f'</head><body>\n<div class="pagenav"><span>Page {page} of {page_count}</span> {next_link}</div>\n'
+        f'<div id="posts">\n{"".join(posts)}</div>\n'
+        f'<div class="pagenav">{next_link}</div>\n</body></html>\n'
+    )
+
+
+def forum_links(index: int, size: int) -> tuple:
+    """(image page link, thumbnail) of a forum post, imagebam and imagetwist in turns."""
+    name = file_name("forum", index, size)
+    stem = name.rsplit(".", 1)[0]
+    if index % 2:
+        return f"https://imagetwist.com/tw{index:06d}/{name}", \
+               f"https://img{index % 4 + 1}.imagetwist.com/th/00001/{stem}.jpg"
+    return f"https://www.imagebam.com/image/{stem}", f"https://thumbs{index % 4 + 1}.imagebam.com/aa/bb/{stem}_t.jpg"
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients close connections of responses they don't read (probes, aborted transfers)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInServer:
+    def __init__(self,
+                 items: int = 100,
+                 page_size: int = 40,
+                 sizes: Sequence[int] = (256 * 1024,),
+                 latency: float = 0.0,
+                 throttle: int = 0,
+                 retry_after: float = 1.0
+                 ):
+        self.items = items
+        self.page_size = max(1, page_size)
+        self.sizes = list(sizes)
+        self.latency = latency
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.counters = Counter()
+        self._host_requests = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address
+        return f"{host}:{port}"
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def size(self, index: int) -> int:
+        return self.sizes[index % len(self.sizes)]
+
+    def expected(self, sites: Sequence[str]) -> tuple:
+        """(items, bytes) a complete run of the sites downloads."""
+        total = sum(self.size(i) for i in range(self.items))
+        return self.items * len(sites), total * len(sites)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _throttled(self, host: str) -> bool:
+        if not self.throttle:
+            return False
+        with self._lock:
+            self._host_requests[host] += 1
+            return self._host_requests[host] % self.throttle == 0
+
+    # Pages of the sites, return (content type, body) or None if not found
+
+    def bunkr(self, path: str, query: dict):
+        files = [
+            {
+                "name": file_name("bunkr", i, self.size(i)),
+                "i": f"https://i{i % 3 + 1}.bunkr.is",
+                "cdn": f"https://cdn{i % 3 + 1}.bunkr.is",
+                "size": str(self.size(i)),
+            }
+            for i in range(self.items)
+        ]
+        data = {
+            "props": {"pageProps": {"album": {"name": "Bench Album"}, "files": files}},
+            "page": "/a/[id]",
+            "isFallback": False,
+        }
+        return "text/html", (
+            f'<html><head><title>Bench Album</title></head><body><div id="__next"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script></body></html>'
+        )
+
+    def gofile(self, path: str, query: dict):
+        if path == "/createAccount":
+            return "application/json", json.dumps({"status": "ok", "data": {"token": "benchtoken"}})
+        if path != "/getContent":
+            return None
+        code = query.get("contentId", [""])[0]
+        if code.startswith("locked"):
+            if query.get("password", [""])[0] != sha256(GOFILE_PASSWORD.encode()).hexdigest():
+                return "application/json", json.dumps({"status": "error-passwordRequired", "data": {}})
+            code = f"bench{GOFILE_DEPTH - 1}"
+        match = re.fullmatch(r"bench(\d+)", code)
+        if not match or int(match.group(1)) >= GOFILE_DEPTH:
+            return "application/json", json.dumps({"status": "error-notFound", "data": {}})
+
+        # Every folder has its share of the files and the next folder
+        level = int(match.group(1))
+        share = pages(self.items, GOFILE_DEPTH)
+        contents = {}
+        for i in range(level * share, min(self.items, (level + 1) * share)):
+            name = file_name("gofile", i, self.size(i))
+            contents[f"file{i}"] = {
+                "type": "file",
+                "name": name,
+                "size": self.size(i),
+                "link": f"https://store{i % 3 + 1}.gofile.io/download/file{i}/{name}",
+            }
+        if level + 1 < GOFILE_DEPTH:
+            contents[f"folder{level + 1}"] = {"type": "folder", "code": f"bench{level + 1}"}
+        return "application/json", json.dumps({"status": "ok", "data": {"code": code, "contents": contents}})
+
+    def _album_page(self, query: dict) -> tuple:
+        """(page number, page count, indexes of items on the page) of a paginated album."""
+        page = int(query.get("page", ["1"])[0])
+        count = pages(self.items, self.page_size)
+        start = (page - 1) * self.page_size
+        return page, count, range(start, min(self.items, start + self.page_size))
+
+    def jpgchurch(self, path: str, query: dict):
+        # Next pages link the requested album, so any album id is served
+        album_id = path.rstrip("/").split("/")[-1]
+        page, count, indexes = self._album_page(query)
+        images = "".join(
+            f'<div class="list-item"><a href="https://jpg.church/img/bench{i}" class="image-container">'
+            f'<img src="https://simp{i % 3 + 1}.jpg.church/images/'
+            f'{file_name("jpgchurch", i, self.size(i), ".md.jpg")}" alt="" width="500" height="750"></a></div>\n'
+            for i in indexes
+        )
+        next_link = f'<a data-pagination="next" href="https://jpg.church/a/{album_id}/?page={page + 1}' \
+                    f'&seek={seek(page)}" >Next</a>' if page < count else ""
+        return "text/html", f'<html><body><div class="pad-content-listing">\n{images}</div>{next_link}</body></html>'
+
+    def pixl(self, path: str, query: dict):
+        album_id = path.rstrip("/").split("/")[-1]
+        page, count, indexes = self._album_page(query)
+        images = "".join(
+            f'<div class="list-item"><img src="https://i.pixl.is/'
+            f'{file_name("pixl", i, self.size(i), ".md.jpg")}" alt="" width="500" height="750"></div>\n'
+            for i in indexes
+        )
+        next_link = f'<a data-pagination="next" href="https://pixl.is/album/{album_id}/?page={page + 1}' \
+                    f'&seek={seek(page)}">Next</a>' if page < count else ""
+        return "text/html", (
+            f'<html><body><div class="header"><a class="album-link" data-text="album-name" '
+            f'href="https://pixl.is/album/{album_id}">Bench Album</a></div>\n'
+            f'<div class="pad-content-listing">\n{images}</div>{next_link}</body></html>'
+        )
+
+    def forum(self, path: str, query: dict):
+        match = PATTERN_PAGE_NUMBER.search(path)
+        page = int(match.group(1)) if match else 1
+        count = pages(self.items, self.page_size)
+        start = (page - 1) * self.page_size
+        posts = [forum_post(i + 1, f"Set #{i + 1}<br />{image_link(*forum_links(i, self.size(i)))}")
+                 for i in range(start, min(self.items, start + self.page_size))]
+        return "text/html", forum_page(FORUM_TITLE, posts, page, count)
+
+    def imagebam(self, path: str, query: dict):
+        stem = path.rsplit("/", 1)[-1]
+        return "text/html", f'<html><body><div class="main-image"><img src="https://images{len(stem) % 4 + 1}' \
+                            f'.imagebam.com/aa/bb/{stem}.jpg" alt="" class="main-image"></div></body></html>'
+
+    def imagetwist(self, path: str, query: dict):
+        name = path.rsplit("/", 1)[-1]
+        return "text/html", f'<html><body><p style="display: block;"><img src="https://i{len(name) % 4 + 1}' \
+                            f'.imagetwist.com/i/00001/{name}/{name}" class="pic img img-responsive"></p></body></html>'
+
+    ROUTES = {
+        "bunkr.is": bunkr,
+        "api.gofile.io": gofile,
+        "jpg.church": jpgchurch,
+        "pixl.is": pixl,
+        "planetsuzy.org": forum,
+        "www.planetsuzy.org": forum,
+        "www.imagebam.com": imagebam,
+        "imagetwist.com": imagetwist,
+    }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self):
+                self.respond(body=False)
+
+            def do_GET(self):
+                self.respond(body=True)
+
+            def respond(self, body: bool):
+                host = (self.headers.get("Host") or "").split(":")[0]
+                url = urlsplit(self.path)
+                server.count("requests")
+                if server.latency:
+                    threading.Event().wait(server.latency)
+
+                if server._throttled(host):
+                    server.count("throttled")
+                    self.send_response(429)
+                    self.send_header("Retry-After", f"{server.retry_after:g}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                route = server.ROUTES.get(host)
+                if route is None:
+                    match = PATTERN_FILE_SIZE.search(url.path)
+                    if match:
+                        return self.send_file(int(match.group(1)), body)
+                    page = None
+                else:
+                    page = route(server, url.path, parse_qs(url.query))
+
+                if page is None:
+                    server.count("not_found")
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                server.count("pages")
+                content_type, text = page
+                data = text.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(data)
+
+            def send_file(self, size: int, body: bool):
+                server.count("files")
+                start, end = 0, size - 1
+                match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+                if match:
+                    start = int(match.group(1))
+                    end = min(end, int(match.group(2))) if match.group(2) else end
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if not body:
+                    return
+
+                view = memoryview(_BLOCK)
+                position = start
+                while position <= end:
+                    offset = position % len(_BLOCK)
+                    chunk = view[offset:min(len(_BLOCK), offset + end - position + 1)]
+                    # Counted before it's sent, the client can't have bytes which aren't counted yet
+                    server.count("bytes", len(chunk))
+                    self.wfile.write(chunk)
+                    position += len(chunk)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def parse_sizes(value: str) -> List[int]:
+    """Comma separated sizes in KB as bytes."""
+    return [int(float(size) * 1024) for size in value.split(",") if size.strip()]
@@ -0,0 +1,90 @@
+"""
+Startup of one-url invocations, measured in fresh interpreters with '-X importtime'.
+
+Every scenario runs in a new process, the wall time of the process and the import time
+reported by '-X importtime' are taken as the best of '--repeat' runs. 'lazy' scenarios
+import only the scraper of the url, 'all scrapers' ones import every scraper module
+as the registry did before the manifest. 'run one url' is what a download run imports
+before scraping, requests and the downloader included, next to them the scraper modules
+are only a few milliseconds. The listing paths don't import the downloader.
+
+    python -m benchmarks.startup --repeat 10
+    python -m benchmarks.startup --top 5
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List, Tuple
+import subprocess
+import time
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+URL = "https://gofile.io/d/abc123"
+# Modules of the registry itself, not counted as scrapers
+INFRASTRUCTURE = {"scrapers.manifest", "scrapers.dispatch", "scrapers.linkscan", "scrapers._scraper_base"}
+
+# (name, arguments of the interpreter)
+SCENARIOS: List[Tuple[str, List[str]]] = [
+    ("classify url, lazy", ["-c", "from scrapers import get_scraper_index; "
+                                  f"get_scraper_index().scraper_for({URL!r})"]),
+    ("classify url, all scrapers", ["-c", "from scrapers import get_scraper_index, get_scraper_classes; "
+                                          f"get_scraper_classes(); get_scraper_index().scraper_for({URL!r})"]),
+    ("run one url", ["-c", "import lols; from scrapers import get_scraper_index; "
+                           f"get_scraper_index().scraper_for({URL!r})"]),
+    ("python -m scrapers", ["-m", "scrapers"]),
+    ("main.py --list-scrapers", ["main.py", "--list-scrapers"]),
+]
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, float], List[str]]:
+    """Cumulative ms of every top level import and names of all imported modules."""
+    top_level, modules = {}, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append(name.strip())
+        # Nested imports are indented by two spaces a level
+        if not name.startswith("   "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return top_level, modules
+
+
+def measure(arguments: List[str], repeat: int) -> Tuple[float, float, Dict[str, float], List[str]]:
+    """Best wall ms, best import ms, top level imports and imported modules of the scenario."""
+    best_wall = best_import = None
+    top_level, modules = {}, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, "-X", "importtime", *arguments], cwd=ROOT,
+                                 capture_output=True, text=True)
+        wall = (time.perf_counter() - start) * 1000
+        if process.returncode:
+            raise RuntimeError(f"{arguments} failed: {process.stderr[-1000:]}")
+        imports, names = parse_importtime(process.stderr)
+        total = sum(imports.values())
+        if best_wall is None or wall < best_wall:
+            best_wall = wall
+        if best_import is None or total < best_import:
+            best_import, top_level, modules = total, imports, names
+    return best_wall, best_import, top_level, modules
+
+
+def run(repeat: int, top: int):
+    print(f"{'Scenario':<28}{'wall ms':>9}{'import ms':>11}{'modules':>9}{'scrapers':>10}  requests")
+    for name, arguments in SCENARIOS:
+        wall, imports, top_level, modules = measure(arguments, repeat)
+        scrapers = sum(module.startswith("scrapers.") and module not in INFRASTRUCTURE for module in modules)
+        print(f"{name:<28}{wall:>9.1f}{imports:>11.1f}{len(modules):>9}{scrapers:>10}  "
+              f"{'yes' if 'requests' in modules else 'no'}")
+        for module, ms in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]:
+            print(f"    {module:<36}{ms:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="CLI startup benchmark with -X importtime.")
+    parser.add_argument('--repeat', type=int, default=5, help="Processes started for every scenario. (default=5)")
+    parser.add_argument('--top', type=int, default=0,
+                        help="Slowest top level imports listed for every scenario. (default=0)")
+    args = parser.parse_args()
+    run(args.repeat, args.top)
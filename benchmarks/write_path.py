@@ -0,0 +1,112 @@
+"""
+Throughput of the download write path against a local HTTP server.
+
+Compares the old 'shutil.copyfileobj' and 'raw.read' loops with the
+'readinto' loop used by the Downloader.
+
+    python -m benchmarks.write_path --size 512 --chunk-size 64
+"""
+from downloader.diskio import body_reader, preallocate
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from argparse import ArgumentParser
+from pathlib import Path
+import tempfile
+import threading
+import requests
+import shutil
+import time
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve(body: bytes) -> HTTPServer:
+    """Starts server responding with the body to every GET request."""
+    view = memoryview(body)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Accept-Ranges", "bytes")
+            self.end_headers()
+            for i in range(0, len(body), 1024 * 1024):
+                self.wfile.write(view[i:i + 1024 * 1024])
+
+        def log_message(self, *args):
+            pass
+
+    server = _Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def copyfileobj_path(response, path: Path, chunk_size: int):
+    response.raw.decode_content = True
+    with open(path, "wb") as f:
+        shutil.copyfileobj(response.raw, f)
+
+
+def read_path(response, path: Path, chunk_size: int):
+    response.raw.decode_content = True
+    with open(path, "wb") as f:
+        while True:
+            chunk = response.raw.read(chunk_size)
+            if not chunk:
+                break
+            f.write(chunk)
+
+
+def readinto_path(response, path: Path, chunk_size: int):
+    response.raw.decode_content = True
+    readinto = body_reader(response)
+    buffer = memoryview(bytearray(chunk_size))
+    with open(path, "wb") as f:
+        preallocate(f, 0, int(response.headers["Content-Length"]))
+        while True:
+            size = readinto(buffer)
+            if not size:
+                break
+            f.write(buffer[:size])
+
+
+WRITE_PATHS = {
+    "copyfileobj": copyfileobj_path,
+    "read": read_path,
+    "readinto": readinto_path,
+}
+
+
+def run(size: int, chunk_size: int, repeat: int):
+    server = serve(bytes(size))
+    url = f"http://127.0.0.1:{server.server_address[1]}/file"
+    session = requests.Session()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "file.bin"
+        for name, write_path in WRITE_PATHS.items():
+            timings = []
+            for _ in range(repeat):
+                path.unlink(missing_ok=True)
+                start = time.perf_counter()
+                with session.get(url, stream=True) as response:
+                    write_path(response, path, chunk_size)
+                timings.append(time.perf_counter() - start)
+                assert path.stat().st_size == size
+            best = min(timings)
+            print(f"{name:<12} {size / best / 1024 / 1024:8.1f} MB/s  (best of {repeat}, {best:.3f}s)")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Download write path benchmark.")
+    parser.add_argument('--size', type=int, default=256, help="File size in MB. (default=256)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="Chunk size in KB. (default=64)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs of every path. (default=5)")
+    args = parser.parse_args()
+    run(args.size * 1024 * 1024, args.chunk_size * 1024, args.repeat)
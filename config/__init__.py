@@ -17,6 +17,19 @@ class Manager:
 
         return data
 
+    @classmethod
+    def settings_path(cls, name) -> Path:
+        return Path().cwd() / "config" / f"{name}.json"
+
+    @classmethod
+    def load_settings(cls, name) -> dict:
+        """Loads optional settings file, without auth metadata."""
+        path = cls.settings_path(name)
+
+        if not path.exists():
+            return {}
+        return json.load(path.open("r"))
+
     @classmethod
     def save_config(cls, domain_name, data: dict):
         path = Path().cwd() / "config" / f"{domain_name}.json"
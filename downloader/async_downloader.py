@@ -0,0 +1,393 @@
+from .downloader import DownloaderBase, Item, accepts_ranges, expected_size
+from .diskio import check_free_space, fsync, FSYNC_NEVER, FSYNC_PERIODIC, FSYNC_INTERVAL
+from .pool import DownloadResult, host_limit
+from .hosts import host_of
+from .ratelimit import HostRateLimiter, RateLimitedError
+from .bandwidth import BandwidthLimiter
+from .watchdog import StallWatchdog
+from exceptions import StalledTransferError, IncompleteDownloadError
+from .summary import DOWNLOADED, RESUMED, REFETCHED, SKIPPED, INVALID
+from requests.cookies import get_cookie_header
+from typing import Callable, List, Union
+from pathlib import Path
+import functools
+import requests
+import asyncio
+import aiohttp
+import logging
+import json
+import time
+
+
+def _file_size(path: Path) -> Union[int, None]:
+    return path.stat().st_size if path.exists() else None
+
+
+class AsyncResponse:
+    """
+    Response with already read body.
+
+    Mirrors the parts of 'requests.Response' used by the scrapers.
+    """
+    def __init__(self, status_code: int, headers, url: str, content: bytes, encoding: str = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.url = url
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncDownloader(DownloaderBase):
+    """
+    Download engine running all transfers on a single asyncio event loop.
+
+    Number of in-flight transfers is bounded globally by 'workers'
+    and for every host by its policy (or 'host_workers').
+    Cookies are shared with the blocking session used for scraping,
+    so the auth done by scrapers applies to downloads too.
+    '.part' files are resumed with Range requests as in the threads engine,
+    content store and segmented downloads are only supported by the threads engine.
+    File system calls and the result callback run on the default executor,
+    so a slow disk or journal doesn't hold up the other transfers.
+    """
+    CHUNK_SIZE = 64 * 1024
+    TRIES = 3
+    RETRY_DELAY = 5
+
+    def __init__(self,
+                 session: requests.Session = None,
+                 workers: int = 100,
+                 host_workers: int = 8,
+                 host_policies: dict = None,
+                 skip_existing: bool = False,
+                 rate_limiter: HostRateLimiter = None,
+                 bandwidth: BandwidthLimiter = None,
+                 connect_timeout: float = None,
+                 read_timeout: float = None,
+                 watchdog: StallWatchdog = None,
+                 chunk_size: int = None,
+                 fsync_policy: str = FSYNC_NEVER,
+                 min_free_space: int = 0
+                 ):
+        self._sync_session = session
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.fsync_policy = fsync_policy
+        self.min_free_space = min_free_space
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.watchdog = watchdog or StallWatchdog()
+        self.skip_existing = skip_existing
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.bandwidth = bandwidth or BandwidthLimiter()
+        self.workers = max(1, workers)
+        self.host_workers = max(1, host_workers)
+        self.host_policies = host_policies
+        self._session = None
+        self._slots = None
+        self._host_slots = {}
+
+    async def __aenter__(self):
+        self._slots = asyncio.Semaphore(self.workers)
+        self._host_slots = {}
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.workers)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+    def _cookies_header(self, url: str) -> dict:
+        if self._sync_session is None:
+            return {}
+        cookie = get_cookie_header(
+            self._sync_session.cookies,
+            requests.Request(method="GET", url=url).prepare()
+        )
+        return {"cookie": cookie} if cookie else {}
+
+    def _host_slots_for(self, url: str) -> asyncio.Semaphore:
+        host = host_of(url)
+        if host not in self._host_slots:
+            limit = min(host_limit(host, self.host_workers, self.host_policies), self.workers)
+            self._host_slots[host] = asyncio.Semaphore(limit)
+        return self._host_slots[host]
+
+    @staticmethod
+    async def _blocking(func: Callable, *args, **kwargs):
+        """Runs blocking call on the default executor, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def _timeout(self, url: str) -> aiohttp.ClientTimeout:
+        connect, read = self.request_timeout(url)
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+    async def _throttle(self, url: str):
+        """Waits for the rate limit of the url's host."""
+        delay = self.rate_limiter.delay(host_of(url))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def send_request(self, url, method='GET', **kwargs) -> AsyncResponse:
+        """Has to be awaited within 'async with downloader:' block."""
+        scraper = kwargs.pop("scraper", None)
+        headers = kwargs.pop("headers", dict())
+        headers.update(self.general_headers)
+        headers.update(self._cookies_header(url))
+
+        await self._throttle(url)
+        start = time.monotonic()
+        async with self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=kwargs.pop("data", None),
+                params=kwargs.pop("params", None),
+                timeout=self._timeout(url)
+        ) as res:
+            self.metrics.request(host_of(url), method, time.monotonic() - start, res.status, scraper)
+            self.rate_limiter.update(host_of(url), res.status, res.headers)
+            content = await res.read()
+            return AsyncResponse(
+                status_code=res.status,
+                headers=res.headers,
+                url=str(res.url),
+                content=content,
+                encoding=res.charset
+            )
+
+    async def download_item(self,
+                            item: Item,
+                            separate_content: bool,
+                            save_urls: bool,
+                            album_name: str = None
+                            ) -> str:
+        album_path = self.album_path(item, album_name)
+        file_path = await self._blocking(self.file_path, item, album_path, separate_content)
+        part_path = self.part_path(file_path)
+        status = None
+        checked = False
+
+        for attempt in range(1, self.TRIES + 1):
+            self.metrics.download_attempt(host_of(item.source))
+            try:
+                async with self._host_slots_for(item.source), self._slots:
+                    if not checked:
+                        local_size = await self._blocking(_file_size, file_path)
+                        if local_size is not None and self.skip_existing:
+                            remote_size = item.size if item.size is not None else await self._remote_size(item)
+                            if remote_size == local_size:
+                                logging.debug(f"Size matches the remote file ({local_size} B), skipping: {item}")
+                                return SKIPPED
+                            status = REFETCHED
+                            if (remote_size is not None
+                                    and local_size < remote_size
+                                    and await self._blocking(self._resume_truncated, file_path, part_path)):
+                                logging.debug(f"Existing file is truncated ({local_size}/{remote_size} B): {item}")
+                        elif local_size is not None:
+                            logging.debug(f"Filename already exists: {item}")
+                        checked = True
+                    result = await self._download(item, file_path)
+                    if result is None:
+                        return INVALID
+                    # Resumed also a truncated file moved to '.part'
+                    status = RESUMED if result == RESUMED else status or result
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, RateLimitedError,
+                    StalledTransferError, IncompleteDownloadError) as e:
+                if attempt == self.TRIES:
+                    raise
+                logging.debug(f"{e!r}, retrying in {self.RETRY_DELAY} seconds: {item}")
+                await asyncio.sleep(self.RETRY_DELAY)
+
+        if save_urls:
+            await self._blocking(self.save_url, album_path, item.source)
+        return status
+
+    @staticmethod
+    def _resume_truncated(file_path: Path, part_path: Path) -> bool:
+        """Moves truncated file to its '.part' file to be resumed, returns False if it can't be."""
+        # Appending to a hardlink would corrupt the content store
+        if part_path.exists() or file_path.stat().st_nlink != 1:
+            return False
+        file_path.replace(part_path)
+        return True
+
+    async def _remote_size(self, item: Item) -> Union[int, None]:
+        """Size of the remote file from HEAD request, None if unknown."""
+        headers = dict(self.general_headers)
+        headers.update(self._cookies_header(item.source))
+
+        await self._throttle(item.source)
+        start = time.monotonic()
+        async with self._session.head(item.source, headers=headers, allow_redirects=True,
+                                      timeout=self._timeout(item.source)) as res:
+            self.metrics.request(host_of(item.source), "HEAD", time.monotonic() - start, res.status)
+            self.rate_limiter.update(host_of(item.source), res.status, res.headers)
+            if res.status >= 400:
+                return None
+            return expected_size(AsyncResponse(res.status, res.headers, str(res.url), b""))
+
+    async def _download(self, item: Item, file_path) -> Union[str, None]:
+        """
+        Streams the item into a '.part' file, which is renamed once complete.
+        An existing '.part' file, also one left by the threads engine, is resumed from its end.
+        Returns DOWNLOADED or RESUMED, None if the server responded with an error.
+        """
+        headers = dict(self.general_headers)
+        headers.update(self._cookies_header(item.source))
+        part_path = self.part_path(file_path)
+        offset = await self._blocking(_file_size, part_path) or 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        await self._throttle(item.source)
+        start = time.monotonic()
+        async with self._session.get(item.source, headers=headers, timeout=self._timeout(item.source)) as res:
+            self.metrics.request(host_of(item.source), "GET", time.monotonic() - start, res.status)
+            self.rate_limiter.update(host_of(item.source), res.status, res.headers)
+            # Status and headers for the helpers shared with the threads engine
+            response = AsyncResponse(res.status, res.headers, str(res.url), b"")
+
+            if offset and res.status == 416:
+                # Range starts past the end, the '.part' file is either complete or stale
+                if expected_size(response) != offset:
+                    await self._blocking(part_path.unlink)
+                    raise IncompleteDownloadError(f"Server rejected resume from byte {offset}: {item}")
+                await self._blocking(part_path.replace, file_path)
+                return RESUMED
+            if res.status == 429:
+                raise RateLimitedError(f"Too many requests: {item.source}")
+            if res.status >= 400:
+                logging.debug(f"Invalid response {res.status}: {item}")
+                return None
+
+            status = DOWNLOADED
+            if offset and res.status != 206:
+                logging.debug(f"Server ignored Range header, downloading from start: {item}")
+                offset = 0
+            elif offset:
+                logging.debug(f"Resuming download from byte {offset}: {item}")
+                status = RESUMED
+
+            total_size = expected_size(response, offset)
+            await self._blocking(check_free_space, part_path.parent,
+                                 total_size - offset if total_size is not None else 0, self.min_free_space)
+
+            self.progress.item_started(item, total=total_size, received=offset)
+            host = host_of(item.source)
+            unsynced = 0
+            try:
+                f = await self._blocking(open, part_path, "ab" if offset else "wb")
+                try:
+                    with self.watchdog.monitor(None, name=item.source) as monitor:
+                        async for chunk in res.content.iter_chunked(self.bandwidth.chunk_size(self.chunk_size)):
+                            wait = self.bandwidth.delay(host, len(chunk))
+                            if wait > 0:
+                                with monitor.paused():
+                                    await asyncio.sleep(wait)
+                            await self._blocking(f.write, chunk)
+                            self.metrics.transferred(host, len(chunk))
+                            self.progress.item_progress(item, len(chunk))
+                            monitor.update(len(chunk))
+                            if monitor.check():
+                                raise monitor.error()
+
+                            unsynced += len(chunk)
+                            if self.fsync_policy == FSYNC_PERIODIC and unsynced >= FSYNC_INTERVAL:
+                                await self._blocking(fsync, f)
+                                unsynced = 0
+                        if self.fsync_policy != FSYNC_NEVER:
+                            await self._blocking(fsync, f)
+                finally:
+                    await self._blocking(f.close)
+            except Exception:
+                if not accepts_ranges(response):
+                    # The next attempt couldn't resume anyway
+                    await self._blocking(part_path.unlink, missing_ok=True)
+                raise
+
+        await self._blocking(self._finish_part, part_path, file_path, total_size)
+        return status
+
+    @staticmethod
+    def _finish_part(part_path: Path, file_path: Path, total_size: Union[int, None]):
+        """Renames complete '.part' file to its final name."""
+        received = part_path.stat().st_size
+        if total_size is not None and received != total_size:
+            if received > total_size:
+                # Remote file changed, start over
+                part_path.unlink()
+            raise IncompleteDownloadError(f"Received {received} of {total_size} bytes: {file_path.name}")
+        part_path.replace(file_path)
+
+    async def download_items(self,
+                             items: List[Item],
+                             separate_content: bool,
+                             save_urls: bool,
+                             album_name: str = None,
+                             on_result: Callable = None,
+                             album_name_of: Callable = None,
+                             collect: bool = True
+                             ) -> List[DownloadResult]:
+        """
+        Downloads all items, 'on_result' is called with result of every item once it's done,
+        without 'collect' the results are passed only to it and an empty list is returned.
+        Album name of every item can be given by 'album_name_of(item)' instead of 'album_name'.
+        """
+        results = []
+
+        async def fetch(item):
+            start = time.monotonic()
+            try:
+                status = await self.download_item(
+                    item, separate_content, save_urls,
+                    album_name_of(item) if album_name_of else album_name
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.exception(f"Failed to download {item}")
+                result = DownloadResult(item, error=e)
+            else:
+                result = DownloadResult(item, status=status)
+            if collect:
+                results.append(result)
+            self.metrics.item_finished(host_of(item.source), result.status, time.monotonic() - start)
+            self.progress.item_finished(item, result.status)
+            if on_result:
+                # Journal writes block
+                await self._blocking(on_result, result)
+
+        async with self:
+            tasks = [asyncio.create_task(fetch(item)) for item in items]
+            try:
+                await asyncio.gather(*tasks)
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        return results
+
+    def run(self,
+            items: List[Item],
+            separate_content: bool,
+            save_urls: bool,
+            album_name: str = None,
+            on_result: Callable = None,
+            album_name_of: Callable = None,
+            collect: bool = True
+            ) -> List[DownloadResult]:
+        """Blocking entry point, downloads all items on a new event loop."""
+        return asyncio.run(
+            self.download_items(items, separate_content, save_urls, album_name, on_result, album_name_of, collect)
+        )
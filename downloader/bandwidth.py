@@ -0,0 +1,146 @@
+from config import Manager as config
+from .ratelimit import TokenBucket
+from typing import Union
+import threading
+import logging
+import time
+
+BANDWIDTH_CONFIG_NAME = "bandwidth"
+
+
+class BandwidthLimiter:
+    """
+    Caps download throughput of all transfers together ('rate')
+    and of every host separately ('host_rate'), both in bytes per second.
+
+    Transfers take bytes from a shared token bucket in equal quanta and
+    reservations are served in order, so concurrent transfers split
+    the budget evenly, and budget left unused by a slow transfer goes
+    to the others.
+
+    Limits can be changed while running by 'set_limits' or by editing
+    'config/bandwidth.json' (values in KB/s, null for unlimited), e.g.:
+    {"limit_rate": 2048, "host_limit_rate": 512}
+    """
+    QUANTUM = 64 * 1024
+    BURST_SECONDS = 0.5
+    RELOAD_INTERVAL = 5.0
+
+    def __init__(self, rate: float = None, host_rate: float = None, watch_config: bool = True):
+        self.rate = None
+        self.host_rate = None
+        self.watch_config = watch_config
+        self._bucket = None
+        self._host_buckets = {}
+        self._lock = threading.Lock()
+        self._next_reload = 0.0
+        self._config_mtime = None
+
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.set_limits(rate, host_rate)
+
+    def _capacity(self, rate: float) -> float:
+        return max(self.QUANTUM, rate * self.BURST_SECONDS)
+
+    def _new_bucket(self, rate: float) -> TokenBucket:
+        return TokenBucket(rate, self._capacity(rate))
+
+    def _update_bucket(self, bucket: Union[TokenBucket, None], rate: float) -> Union[TokenBucket, None]:
+        if not rate:
+            return None
+        if bucket is None:
+            return self._new_bucket(rate)
+        bucket.set_rate(rate)
+        bucket.capacity = self._capacity(rate)
+        return bucket
+
+    def set_limits(self, rate: float = None, host_rate: float = None):
+        """Changes the limits, None removes the limit."""
+        with self._lock:
+            self.rate = rate or None
+            self.host_rate = host_rate or None
+            self._bucket = self._update_bucket(self._bucket, self.rate)
+            if self.host_rate:
+                for host, bucket in self._host_buckets.items():
+                    self._host_buckets[host] = self._update_bucket(bucket, self.host_rate)
+            else:
+                self._host_buckets.clear()
+        logging.debug(f"Bandwidth limit {self.rate} B/s, per host {self.host_rate} B/s")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rate or self.host_rate)
+
+    def chunk_size(self, default: int) -> int:
+        """Size of reads from the network, limited transfers read in equal quanta."""
+        return min(default, self.QUANTUM) if self.enabled else default
+
+    def _reload(self):
+        """Applies limits from the config file if it changed."""
+        now = time.monotonic()
+        if not self.watch_config or now < self._next_reload:
+            return
+        self._next_reload = now + self.RELOAD_INTERVAL
+
+        path = config.settings_path(BANDWIDTH_CONFIG_NAME)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._config_mtime:
+            return
+        self._config_mtime = mtime
+
+        try:
+            settings = config.load_settings(BANDWIDTH_CONFIG_NAME)
+        except ValueError as e:
+            logging.debug(f"Invalid bandwidth config: {e!r}")
+            return
+        rate = settings.get("limit_rate")
+        host_rate = settings.get("host_limit_rate")
+        self.set_limits(
+            rate * 1024 if rate else None,
+            host_rate * 1024 if host_rate else None
+        )
+
+    def delay(self, host: str, size: int) -> float:
+        """Reserves 'size' bytes received from the host, returns seconds to wait."""
+        self._reload()
+        if not self.enabled:
+            return 0.0
+
+        with self._lock:
+            bucket = self._bucket
+            host_bucket = None
+            if self.host_rate:
+                if host not in self._host_buckets:
+                    self._host_buckets[host] = self._new_bucket(self.host_rate)
+                host_bucket = self._host_buckets[host]
+
+        wait = bucket.reserve(size) if bucket else 0.0
+        if host_bucket:
+            wait = max(wait, host_bucket.reserve(size))
+
+        if wait > 0:
+            with self._lock:
+                self.throttled += 1
+                self.throttled_seconds += wait
+        return wait
+
+    def consume(self, host: str, size: int, monitor=None):
+        """
+        Blocks until 'size' bytes from the host fit into the limits.
+        The wait is left out of the stall window of the transfer's monitor.
+        """
+        wait = self.delay(host, size)
+        if wait > 0:
+            if monitor is not None:
+                monitor.sleep(wait)
+            else:
+                time.sleep(wait)
+
+    def report(self):
+        if self.throttled:
+            print(f"Bandwidth limit throttled transfers {self.throttled} times, "
+                  f"{self.throttled_seconds:.1f}s of waiting in total.")
@@ -0,0 +1,125 @@
+from exceptions import InsufficientDiskSpaceError
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from pathlib import Path
+from typing import Callable
+import requests
+import http.client
+import ctypes.util
+import logging
+import ctypes
+import shutil
+import os
+
+# Fsync policies of downloaded files
+FSYNC_NEVER = "never"  # left to the OS
+FSYNC_CLOSE = "close"  # once the file is complete
+FSYNC_PERIODIC = "periodic"  # every FSYNC_INTERVAL bytes and once complete
+
+FSYNC_INTERVAL = 16 * 1024 * 1024
+
+# fallocate() mode reserving blocks without changing the file size, linux/falloc.h
+FALLOC_FL_KEEP_SIZE = 0x01
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _fallocate = _libc.fallocate
+    _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+except (OSError, AttributeError, TypeError):
+    # Not Linux/glibc, files are written without preallocation
+    _fallocate = None
+
+
+def body_reader(response: requests.Response) -> Callable:
+    """
+    Returns 'readinto(buffer)' function reading the response body into a buffer.
+
+    Identity encoded body is read from the socket straight into the buffer,
+    skipping the intermediate bytes objects of urllib3, encoded body is decoded by urllib3.
+    """
+    raw = response.raw
+    fp = getattr(raw, "_fp", None)
+    if (response.headers.get("Content-Encoding", "identity") != "identity"
+            or not isinstance(fp, http.client.HTTPResponse)):
+        return _decoded_reader(raw)
+
+    def readinto(buffer) -> int:
+        try:
+            size = fp.readinto(buffer)
+        except (http.client.HTTPException, OSError) as e:
+            raise ProtocolError(f"Connection broken: {e!r}", e)
+        if not size and fp.isclosed():
+            # Body is read, return the connection to the pool as urllib3 would
+            raw.release_conn()
+        return size
+
+    return readinto
+
+
+def _decoded_reader(raw) -> Callable:
+    """
+    Returns 'readinto(buffer)' function for encoded body decoded by urllib3.
+
+    Decoded data of a read can be longer than the buffer (urllib3 reads
+    'amt' encoded bytes), the rest is kept for the next call.
+    """
+    pending = bytearray()
+    chunks = None
+
+    def readinto(buffer) -> int:
+        nonlocal chunks
+        if not pending:
+            if chunks is None:
+                chunks = raw.stream(len(buffer), decode_content=True)
+            try:
+                pending.extend(next(chunks, b""))
+            except ReadTimeoutError as e:
+                # Raised as requests exception, like 'iter_content' does
+                raise requests.exceptions.ConnectionError(e)
+        size = min(len(buffer), len(pending))
+        buffer[:size] = pending[:size]
+        del pending[:size]
+        return size
+
+    return readinto
+
+
+def preallocate(f, offset: int, length: int) -> bool:
+    """
+    Reserves disk blocks for 'length' bytes from 'offset' of the open file,
+    so the file isn't fragmented and a full disk fails the write early.
+
+    The file size is kept, so the size of a '.part' file keeps telling
+    how much of it was downloaded. Returns False if not supported.
+    """
+    if _fallocate is None or length <= 0:
+        return False
+    if _fallocate(f.fileno(), FALLOC_FL_KEEP_SIZE, offset, length) != 0:
+        logging.debug(f"fallocate failed: {os.strerror(ctypes.get_errno())}")
+        return False
+    return True
+
+
+def preallocate_full(f, size: int):
+    """Extends the open file to 'size' bytes with blocks reserved where supported."""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as e:
+            logging.debug(f"posix_fallocate failed: {e!r}")
+    f.truncate(size)
+
+
+def check_free_space(path: Path, size: int, reserve: int = 0):
+    """Raises InsufficientDiskSpaceError if 'size' bytes wouldn't leave 'reserve' bytes free."""
+    free = shutil.disk_usage(path).free
+    if free - size < reserve:
+        raise InsufficientDiskSpaceError(
+            f"{size} bytes needed in {path}, {free} bytes free "
+            f"({reserve} bytes have to stay free)"
+        )
+
+
+def fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
@@ -1,66 +1,178 @@
-import time
 import requests
 from pathlib import Path
 import retry
 from .headers import HeadersMixin
-from tqdm.auto import tqdm
 from urllib3.exceptions import ProtocolError
-import shutil
+from exceptions import IncompleteDownloadError, RangeNotSupportedError, InsufficientDiskSpaceError, StalledTransferError, \
+    MissingAlbumNameError
+from .diskio import body_reader, preallocate, check_free_space, fsync, FSYNC_NEVER, FSYNC_PERIODIC, FSYNC_INTERVAL
+from .segmented import SegmentedDownload
+from .store import ContentStore
+from .hosts import host_of, policy_for
+from .ratelimit import HostRateLimiter, RateLimitedError
+from .bandwidth import BandwidthLimiter
+from .watchdog import StallWatchdog
+from .summary import DOWNLOADED, RESUMED, REFETCHED, SKIPPED, INVALID, FAILED
+from .progress import ProgressListener
+from .metrics import MetricsListener
+from .item import Item
+from typing import Tuple, Union
+import threading
 import logging
+import time
+
+
+def accepts_ranges(response: requests.Response) -> bool:
+    return response.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+
+def expected_size(response: requests.Response, offset: int = 0) -> Union[int, None]:
+    """
+    Returns size of the whole file the response belongs to,
+    None if it can't be verified against the written bytes.
+    """
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        # Decoded content differs in size from the announced one
+        return None
+
+    if response.status_code in (206, 416):
+        # Content-Range: bytes 1000-4999/5000 or bytes */5000
+        total = response.headers.get("Content-Range", "").split("/")[-1]
+        return int(total) if total.isdigit() else None
 
+    length = response.headers.get("Content-Length")
+    return offset + int(length) if length is not None else None
 
-class Item:
-    content_type: str  # image/video/archive
-    album_title: str
-    filename: str
-    extension: str  # .jpg/.mp4...
-    source: str
-
-    def __init__(self, content_type: str, filename: str, extension: str, source: str, album_title: str = None):
-        self.content_type = content_type
-        self.album_title = album_title
-        self.filename = filename
-        self.extension = extension
-        self.source = source
-
-    def __str__(self):
-        return f"Item(" \
-               f"{self.filename}{self.extension}, " \
-               f"{self.source}" \
-               f")"
-
-    def __repr__(self):
-        return f"Item(" \
-               f"content_type={self.content_type}, " \
-               f"album_title={self.album_title}, " \
-               f"filename={self.filename}, " \
-               f"extension={self.extension}, " \
-               f"source={self.source}" \
-               f")"
-
-
-class Downloader(HeadersMixin):
+
+class DownloaderBase(HeadersMixin):
+    """Output layout shared by the download engines."""
     OUTPUT_DIR = "Output"
     IMAGES_DIR_NAME = "Images"
     VIDEOS_DIR_NAME = "Videos"
     ARCHIVES_DIR_NAME = "Archives"
     AUDIO_DIR_NAME = "Audio"
 
+    _urls_lock = threading.Lock()
+
+    # Receives transfer events, replaced by the progress view of a run
+    progress = ProgressListener()
+    # Receives request and download events, replaced by the metrics of a run
+    metrics = MetricsListener()
+
+    host_policies = None
+    connect_timeout = None  # overrides of host policy timeouts
+    read_timeout = None
+
+    def album_path(self, item: Item, album_name: str = None) -> Path:
+        """
+        Directory of the item's album, named by the output directory name or the album title.
+        Names are asked on the main thread while scraping, workers downloading
+        under the progress display never prompt.
+        """
+        album_dir = album_name or item.album_title
+        if not album_dir:
+            raise MissingAlbumNameError(f"No output directory name or album title: {item.source}")
+        return self.output_path / album_dir
+
+    def file_path(self, item: Item, album_path: Path, separate_content: bool, create: bool = True) -> Path:
+        """Returns path of the item's file, creates its directory if 'create' is set."""
+        # Set download path
+        if separate_content:
+            if item.content_type == "image":
+                dl_dir_path = album_path / self.IMAGES_DIR_NAME
+            elif item.content_type == "video":
+                dl_dir_path = album_path / self.VIDEOS_DIR_NAME
+            elif item.content_type == "archive":
+                dl_dir_path = album_path / self.ARCHIVES_DIR_NAME
+            elif item.content_type == "audio":
+                dl_dir_path = album_path / self.AUDIO_DIR_NAME
+        else:
+            dl_dir_path = album_path
+
+        if create:
+            dl_dir_path.mkdir(parents=True, exist_ok=True)
+
+        return dl_dir_path / (item.filename + item.extension)
+
+    @staticmethod
+    def part_path(file_path: Path) -> Path:
+        """Path the file is downloaded into before it's complete."""
+        return file_path.with_name(file_path.name + ".part")
+
+    def save_url(self, album_path: Path, url: str):
+        with self._urls_lock, open(album_path / "urls.txt", "a") as f:
+            f.write(url)
+            f.write("\n")
+
+    def request_timeout(self, url: str) -> Tuple[float, float]:
+        """(connect, read) timeout in seconds for requests to the url's host."""
+        policy = policy_for(host_of(url), self.host_policies)
+        return (self.connect_timeout or policy.connect_timeout,
+                self.read_timeout or policy.read_timeout)
+
+    @classmethod
+    def is_invalid(cls, response) -> bool:
+        if response.status_code >= 400:
+            return True
+
+    @property
+    def output_path(self):
+        return self._create_path(self.OUTPUT_DIR)
+
+    def _create_path(self, dirname_or_absolutepath: str):
+        path = Path(dirname_or_absolutepath)
+        if path.is_absolute():
+            return path
+        else:
+            return Path().cwd() / dirname_or_absolutepath
+
+
+class Downloader(DownloaderBase):
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(self,
-                 session: requests.Session
+                 session: requests.Session,
+                 segments: int = 1,
+                 segment_threshold: int = 50 * 1024 * 1024,
+                 skip_existing: bool = False,
+                 store: ContentStore = None,
+                 rate_limiter: HostRateLimiter = None,
+                 bandwidth: BandwidthLimiter = None,
+                 chunk_size: int = None,
+                 fsync_policy: str = FSYNC_NEVER,
+                 min_free_space: int = 0,
+                 host_policies: dict = None,
+                 connect_timeout: float = None,
+                 read_timeout: float = None,
+                 watchdog: StallWatchdog = None
                  ):
         self._session = session
+        self.host_policies = host_policies
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.watchdog = watchdog or StallWatchdog()
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.fsync_policy = fsync_policy
+        self.min_free_space = min_free_space
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.bandwidth = bandwidth or BandwidthLimiter()
+        self.skip_existing = skip_existing
+        self.store = store
+        self.segments = segments
+        self.segment_threshold = segment_threshold
 
     def set_session(self, session: requests.Session):
         self._session = session
 
     def send_request(self, url, method, **kwargs) -> requests.Response:
+        """'scraper' names the scraper class sending the request in metrics."""
+        scraper = kwargs.pop("scraper", None)
         prepped_req = self._prepare_request(
             url=url,
             method=method,
             **kwargs
         )
-        response = self._send_request(prepped_req, **kwargs)
+        response = self._send_request(prepped_req, scraper=scraper, **kwargs)
         return response
 
     def _prepare_request(self, method: str, url: str, **kwargs) -> requests.PreparedRequest:
@@ -78,95 +190,274 @@ class Downloader(HeadersMixin):
         return self._session.prepare_request(req)
 
     @retry.retry(requests.exceptions.RequestException, tries=3, delay=3)
-    def _send_request(self, prepared_request, **kwargs) -> requests.Response:
-        res = self._session.send(
-            request=prepared_request,
-            stream=kwargs.pop("stream", None)
-        )
+    def _send_request(self, prepared_request, scraper: str = None, **kwargs) -> requests.Response:
+        host = host_of(prepared_request.url)
+        self.rate_limiter.acquire(host)
+
+        start = time.monotonic()
+        try:
+            res = self._session.send(
+                request=prepared_request,
+                stream=kwargs.pop("stream", None),
+                timeout=kwargs.pop("timeout", None) or self.request_timeout(prepared_request.url)
+            )
+        except requests.exceptions.RequestException as e:
+            self.metrics.request(host, prepared_request.method, time.monotonic() - start, scraper=scraper, error=e)
+            raise
+        self.metrics.request(host, prepared_request.method, time.monotonic() - start, res.status_code, scraper)
+        self.rate_limiter.update(host, res.status_code, res.headers)
+
         if res.status_code == 429:
-            time.sleep(10)
-            raise requests.exceptions.RequestException
-                      # stream=stream,
-                      # verify=verify,
-                      # proxies=proxies,
-                      # cert=cert,
-                      # timeout=timeout
+            res.close()
+            raise RateLimitedError(f"Too many requests: {prepared_request.url}", response=res)
         return res
 
-    @retry.retry(
-        (requests.exceptions.RequestException, ProtocolError),
-        tries=3,
-        delay=5)
     def download_item(self,
                       item: Item,
                       separate_content: bool,
                       save_urls: bool,
                       album_name: str = None
-                      ):
-        album_dir = album_name or item.album_title or input(
-            f"Enter the name for album directory: "
-        )
-        album_path = self.output_path / album_dir
+                      ) -> str:
+        """Downloads the item (see '_download_item'), its decision and duration are recorded in metrics."""
+        host = host_of(item.source)
+        start = time.monotonic()
+        try:
+            status = self._download_item(item, separate_content, save_urls, album_name)
+        except Exception:
+            self.metrics.item_finished(host, FAILED, time.monotonic() - start)
+            raise
+        self.metrics.item_finished(host, status, time.monotonic() - start)
+        return status
 
-        # Set download path
-        if separate_content:
-            if item.content_type == "image":
-                dl_dir_path = album_path / self.IMAGES_DIR_NAME
-            elif item.content_type == "video":
-                dl_dir_path = album_path / self.VIDEOS_DIR_NAME
-            elif item.content_type == "archive":
-                dl_dir_path = album_path / self.ARCHIVES_DIR_NAME
-            elif item.content_type == "audio":
-                dl_dir_path = album_path / self.AUDIO_DIR_NAME
-        else:
-            dl_dir_path = album_path
+    @retry.retry(
+        (requests.exceptions.RequestException, ProtocolError, IncompleteDownloadError, StalledTransferError),
+        tries=3,
+        delay=5)
+    def _download_item(self,
+                       item: Item,
+                       separate_content: bool,
+                       save_urls: bool,
+                       album_name: str = None
+                       ) -> str:
+        """
+        Downloads the item into a '.part' file, which is renamed to the final
+        name once the received size matches the size announced by the server.
+        If the '.part' file already exists (failed attempt or killed process),
+        download resumes from its end using a Range request.
 
-        if not dl_dir_path.exists():
-            dl_dir_path.mkdir(parents=True)
+        With 'skip_existing' set, existing file matching the remote size is skipped,
+        truncated one is resumed and any other is downloaded again.
 
-        file_path = dl_dir_path / (item.filename + item.extension)
+        Returns download decision, one of the statuses from 'summary' module.
+        """
+        self.metrics.download_attempt(host_of(item.source))
+        album_path = self.album_path(item, album_name)
+        file_path = self.file_path(item, album_path, separate_content)
+        part_path = self.part_path(file_path)
+        status = DOWNLOADED
 
-        if file_path.exists():
+        local_size = file_path.stat().st_size if file_path.exists() else None
+        if local_size is not None and self.skip_existing:
+            remote_size = item.size if item.size is not None else self._remote_size(item)
+            if remote_size == local_size:
+                logging.debug(f"Size matches the remote file ({local_size} B), skipping: {item}")
+                return SKIPPED
+            status = REFETCHED
+            if (remote_size is not None
+                    and local_size < remote_size
+                    and not part_path.exists()
+                    # Appending to a hardlink would corrupt the content store
+                    and file_path.stat().st_nlink == 1):
+                logging.debug(f"Existing file is truncated ({local_size}/{remote_size} B): {item}")
+                file_path.replace(part_path)
+                local_size = None
+        elif local_size is not None:
             logging.debug(f"Filename already exists: {item}")
 
-        print(f"Downloading: {item.source}\n")
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        logging.debug(f"Downloading: {item.source}")
         # Make request
         response = self.send_request(
             method='GET',
             url=item.source,
-            stream=True
+            stream=True,
+            headers=headers
         )
 
+        if offset and response.status_code == 416:
+            # Range starts past the end, the '.part' file is either complete or stale
+            if expected_size(response) != offset:
+                part_path.unlink()
+                raise IncompleteDownloadError(f"Server rejected resume from byte {offset}: {item}")
+            self._finish_part(part_path, file_path, expected_size=offset)
+            if save_urls:
+                self.save_url(album_path, item.source)
+            return RESUMED
+
         if self.is_invalid(response):
-            return
+            return INVALID
 
-        total_size = int(response.headers.get('Content-Length'))
-        response.raw.decode_content = True
+        if offset and response.status_code != 206:
+            logging.debug(f"Server ignored Range header, downloading from start: {item}")
+            offset = 0
+        elif offset:
+            logging.debug(f"Resuming download from byte {offset}: {item}")
+            status = RESUMED
+
+        total_size = expected_size(response, offset)
+
+        if local_size is not None and self.skip_existing and total_size == local_size:
+            # HEAD didn't tell the size, but the response headers did
+            response.close()
+            logging.debug(f"Size matches the remote file ({local_size} B), skipping: {item}")
+            return SKIPPED
 
-        with tqdm.wrapattr(response.raw, "read", total=total_size, desc="") as raw:
-            with open(file_path, 'wb') as f:
-                shutil.copyfileobj(raw, f)
+        hasher = None
+        if not offset and self._use_segments(response, total_size):
+            response.close()
+            try:
+                SegmentedDownload(self, item, part_path, total_size, self.segments).run()
+            except RangeNotSupportedError as e:
+                logging.debug(f"{e}, falling back to single stream: {item}")
+                response = self.send_request(
+                    method='GET',
+                    url=item.source,
+                    stream=True
+                )
+                if self.is_invalid(response):
+                    part_path.unlink(missing_ok=True)
+                    return INVALID
+                total_size = expected_size(response)
+                hasher = self._new_hasher(part_path, offset=0)
+                self._stream(response, item, part_path, offset=0, total_size=total_size, hasher=hasher)
+            except BaseException:
+                # Preallocated file with holes can't be resumed
+                part_path.unlink(missing_ok=True)
+                raise
+        else:
+            hasher = self._new_hasher(part_path, offset)
+            self._stream(response, item, part_path, offset=offset, total_size=total_size, hasher=hasher)
+
+        self._finish_part(part_path, file_path, expected_size=total_size, hasher=hasher)
 
         if save_urls:
-            with open(album_path / "urls.txt", "a") as f:
-                f.write(item.source)
-                f.write("\n")
+            self.save_url(album_path, item.source)
+        return status
 
-    @classmethod
-    def is_invalid(cls, response: requests.Response) -> bool:
-        if response.status_code >= 400:
-            return True
+    def _remote_size(self, item: Item) -> Union[int, None]:
+        """Size of the remote file from HEAD request, None if unknown."""
+        try:
+            response = self.send_request(
+                method='HEAD',
+                url=item.source
+            )
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"HEAD request failed: {e!r}")
+            return None
+        if self.is_invalid(response):
+            return None
+        return expected_size(response)
 
-    @property
-    def output_path(self):
-        return self._create_path(self.OUTPUT_DIR)
+    def _use_segments(self, response: requests.Response, total_size: Union[int, None]) -> bool:
+        return (self.segments > 1
+                and total_size is not None
+                and total_size >= self.segment_threshold
+                and accepts_ranges(response))
 
-    def _create_path(self, dirname_or_absolutepath: str):
-        path = Path(dirname_or_absolutepath)
-        if path.is_absolute():
-            return path
-        else:
-            return Path().cwd() / dirname_or_absolutepath
+    def _new_hasher(self, part_path: Path, offset: int):
+        """Hasher of the content store fed with already downloaded part of the file."""
+        if self.store is None:
+            return None
+        hasher = self.store.new_hasher()
+        if offset:
+            self.store.hash_file(part_path, hasher)
+        return hasher
+
+    def _stream(self,
+                response: requests.Response,
+                item: Item,
+                part_path: Path,
+                offset: int,
+                total_size: Union[int, None],
+                hasher=None
+                ):
+        """
+        Writes response body into '.part' file, appending to it if offset is set.
+        Body is read into a single reused buffer and the file is preallocated
+        to the announced size. Written chunks update the hasher if provided.
+        """
+        response.raw.decode_content = True
+        remaining = total_size - offset if total_size is not None else 0
+        try:
+            check_free_space(part_path.parent, remaining, self.min_free_space)
+        except InsufficientDiskSpaceError:
+            response.close()
+            raise
+
+        self.progress.item_started(item, total=total_size, received=offset)
+        host = host_of(item.source)
+        readinto = body_reader(response)
+        buffer = memoryview(bytearray(self.chunk_size))
+        read_size = self.watchdog.chunk_size(self.bandwidth.chunk_size(self.chunk_size))
+        monitor = self.watchdog.monitor(response, name=item.source)
+        unsynced = 0
+
+        try:
+            with monitor, open(part_path, 'ab' if offset else 'wb') as f:
+                preallocate(f, offset, remaining)
+                while True:
+                    size = readinto(buffer[:read_size])
+                    if not size:
+                        break
+                    self.bandwidth.consume(host, size, monitor)
+                    self.metrics.transferred(host, size)
+                    chunk = buffer[:size]
+                    f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    self.progress.item_progress(item, size)
+                    monitor.update(size)
+
+                    unsynced += size
+                    if self.fsync_policy == FSYNC_PERIODIC and unsynced >= FSYNC_INTERVAL:
+                        fsync(f)
+                        unsynced = 0
+                if self.fsync_policy != FSYNC_NEVER:
+                    fsync(f)
+        except Exception as e:
+            if not accepts_ranges(response):
+                # The next attempt couldn't resume anyway
+                part_path.unlink(missing_ok=True)
+            if monitor.stalled:
+                raise monitor.error() from e
+            raise
+
+        if monitor.stalled:
+            # Aborted connection ended the body early
+            raise monitor.error()
+
+    def _finish_part(self, part_path: Path, file_path: Path, expected_size: Union[int, None], hasher=None):
+        """
+        Renames complete '.part' file to its final name,
+        or moves it into the content store and links it there.
+        """
+        received = part_path.stat().st_size
+        if expected_size is not None and received != expected_size:
+            if received > expected_size:
+                # Remote file changed, start over
+                part_path.unlink()
+            raise IncompleteDownloadError(
+                f"Received {received} of {expected_size} bytes: {file_path.name}"
+            )
+
+        if self.store is None:
+            part_path.replace(file_path)
+            return
+
+        hasher = hasher or self.store.hash_file(part_path)
+        self.store.put(part_path, file_path, hasher.hexdigest())
 
     def update_cookies(self, cookies: dict, domain: str):
         for k, v in cookies.items():
@@ -0,0 +1,29 @@
+from typing import List
+import re
+
+# Optional scheme and userinfo, then the host up to the port, path, query or fragment.
+# Matched instead of 'urlsplit', which is ~6x slower on the dispatch of every scraped url.
+_HOST_RE = re.compile(r'(?:[^/?#:]*://|//)?(?:[^/?#@]*@)?(\[[^\]/?#]*\]|[^/?#:]*)')
+
+
+def host_of(url: str) -> str:
+    """Returns lowercase hostname of the url, which may be given without scheme."""
+    host = _HOST_RE.match(url).group(1)
+    if host.startswith("["):
+        # IPv6 address, '' if the bracket isn't closed
+        host = host[1:-1]
+    return host.lower()
+
+
+def domain_suffixes(host: str) -> List[str]:
+    """The host and its parent domains, 'cdn1.bunkr.is' -> ['cdn1.bunkr.is', 'bunkr.is', 'is']"""
+    labels = host.split(".")
+    return [".".join(labels[i:]) for i in range(len(labels))]
+
+
+def match_domain(host: str, domains) -> str:
+    """Returns the longest domain from 'domains' the host belongs to, or None."""
+    for candidate in domain_suffixes(host):
+        if candidate in domains:
+            return candidate
+    return None
@@ -0,0 +1,145 @@
+from requests.adapters import BaseAdapter, HTTPAdapter
+from config import Manager as config
+from .hostnames import host_of, match_domain
+from typing import Tuple
+import threading
+import logging
+
+HOSTS_CONFIG_NAME = "hosts"
+
+
+class HostPolicy:
+    """Connection settings for all hosts of a domain."""
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 keep_alive: bool = True,
+                 connect_timeout: float = 10,
+                 read_timeout: float = 60,
+                 max_concurrency: int = None
+                 ):
+        self.pool_connections = pool_connections  # number of hosts with cached connections
+        self.pool_maxsize = pool_maxsize  # connections kept alive per host
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_concurrency = max_concurrency  # concurrent downloads per host, None for default
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def updated(self, **settings) -> "HostPolicy":
+        """Returns copy of the policy with changed settings."""
+        values = dict(vars(self))
+        values.update(settings)
+        return HostPolicy(**values)
+
+    def __repr__(self):
+        return f"HostPolicy(" + ", ".join(f"{k}={v}" for k, v in vars(self).items()) + ")"
+
+
+DEFAULT_POLICY = HostPolicy()
+
+# Policies by domain, every subdomain (CDN shard) is covered by the policy of its domain
+HOST_POLICIES = {
+    # cdn*, i*, media-files* shards
+    "bunkr.is": HostPolicy(pool_connections=16, pool_maxsize=2, max_concurrency=2, read_timeout=90),
+    # fs-* shards
+    "cyberdrop.to": HostPolicy(pool_connections=16, pool_maxsize=4, max_concurrency=4),
+    "cyberdrop.me": HostPolicy(pool_connections=16, pool_maxsize=4, max_concurrency=4),
+    "cyberdrop.cc": HostPolicy(pool_connections=16, pool_maxsize=4, max_concurrency=4),
+    # Album pages and file API
+    "pixeldrain.com": HostPolicy(pool_maxsize=3, max_concurrency=3, read_timeout=90),
+    "api.gofile.io": HostPolicy(pool_maxsize=2, max_concurrency=2, read_timeout=30),
+    # store* file servers
+    "gofile.io": HostPolicy(pool_connections=16, pool_maxsize=2, max_concurrency=2, read_timeout=90),
+    # Forums, pages are crawled one by one
+    "forum.thotsbay.com": HostPolicy(pool_maxsize=1, max_concurrency=1, read_timeout=30),
+    "planetsuzy.org": HostPolicy(pool_maxsize=1, max_concurrency=1, read_timeout=30),
+}
+
+
+def policy_for(host: str, policies: dict = None) -> HostPolicy:
+    policies = HOST_POLICIES if policies is None else policies
+    domain = match_domain(host, policies)
+    return policies[domain] if domain else DEFAULT_POLICY
+
+
+def load_host_policies() -> dict:
+    """
+    Built-in policies updated with 'config/hosts.json', e.g.:
+    {"bunkr.is": {"max_concurrency": 4}, "example.com": {"read_timeout": 30}}
+    """
+    policies = dict(HOST_POLICIES)
+    for domain, settings in config.load_settings(HOSTS_CONFIG_NAME).items():
+        policies[domain] = policies.get(domain, DEFAULT_POLICY).updated(**settings)
+        logging.debug(f"Host policy for {domain}: {policies[domain]}")
+    return policies
+
+
+class HostPolicyAdapter(BaseAdapter):
+    """
+    Transport adapter dispatching requests to a connection pool sized
+    by the policy of the request's host.
+    Applies policy timeouts to requests sent without one.
+    """
+    def __init__(self, policies: dict = None, host_workers: int = None, segments: int = 1, scrape_workers: int = 0):
+        super().__init__()
+        self.policies = HOST_POLICIES if policies is None else policies
+        self.host_workers = host_workers
+        self.segments = max(segments or 1, 1)
+        self.scrape_workers = scrape_workers
+        self._adapters = {}
+        self._lock = threading.Lock()
+
+    def pool_maxsize(self, policy: HostPolicy) -> int:
+        """
+        Connections kept alive per host, at least one for every segment
+        of every concurrent download of the host, and one for every
+        resolve and probe worker ('scrape_workers'), as they may all request the same host.
+        """
+        concurrency = policy.max_concurrency or self.host_workers or 1
+        return max(policy.pool_maxsize, concurrency * self.segments + self.scrape_workers)
+
+    def _adapter(self, domain: str, policy: HostPolicy) -> HTTPAdapter:
+        with self._lock:
+            if domain not in self._adapters:
+                self._adapters[domain] = HTTPAdapter(
+                    pool_connections=policy.pool_connections,
+                    pool_maxsize=self.pool_maxsize(policy)
+                )
+            return self._adapters[domain]
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        host = host_of(request.url)
+        domain = match_domain(host, self.policies)
+        policy = self.policies[domain] if domain else DEFAULT_POLICY
+
+        if timeout is None:
+            timeout = policy.timeout
+        if not policy.keep_alive:
+            request.headers["Connection"] = "close"
+
+        return self._adapter(domain or "", policy).send(
+            request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies
+        )
+
+    def close(self):
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters.clear()
+
+
+def mount_host_adapters(session,
+                        policies: dict = None,
+                        host_workers: int = None,
+                        segments: int = 1,
+                        scrape_workers: int = 0
+                        ) -> HostPolicyAdapter:
+    """Routes all session's http(s) traffic through the policy adapter."""
+    adapter = HostPolicyAdapter(policies, host_workers, segments, scrape_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
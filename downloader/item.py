@@ -0,0 +1,79 @@
+from typing import Union
+import sys
+
+
+def _intern(value: Union[str, None]) -> Union[str, None]:
+    return sys.intern(value) if value is not None else None
+
+
+class Item:
+    """
+    Scraped file, immutable. Items are equal if they have the same source.
+
+    Slotted and with the values repeated across items (content type,
+    album title, extension) interned, so large crawls stay compact.
+    """
+    __slots__ = ("content_type", "album_title", "filename", "extension", "source", "size")
+
+    content_type: str  # image/video/archive
+    album_title: str
+    filename: str
+    extension: str  # .jpg/.mp4...
+    source: str
+    size: int  # bytes, None if unknown
+
+    def __init__(self,
+                 content_type: str,
+                 filename: str,
+                 extension: str,
+                 source: str,
+                 album_title: str = None,
+                 size: int = None
+                 ):
+        set_ = object.__setattr__
+        set_(self, "content_type", _intern(content_type))
+        set_(self, "album_title", _intern(album_title))
+        set_(self, "filename", filename)
+        set_(self, "extension", _intern(extension))
+        set_(self, "source", source)
+        set_(self, "size", size)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Item is immutable, use 'replace({name}=...)'")
+
+    def __delattr__(self, name):
+        raise AttributeError("Item is immutable")
+
+    def replace(self, **changes) -> "Item":
+        """Returns copy of the item with changed values."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return Item(**values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.source == other.source
+
+    def __hash__(self):
+        return hash(self.source)
+
+    def __reduce__(self):
+        return Item, tuple(getattr(self, name) for name in ("content_type", "filename", "extension",
+                                                             "source", "album_title", "size"))
+
+    def __str__(self):
+        return f"Item(" \
+               f"{self.filename}{self.extension}, " \
+               f"{self.source}" \
+               f")"
+
+    def __repr__(self):
+        return f"Item(" \
+               f"content_type={self.content_type}, " \
+               f"album_title={self.album_title}, " \
+               f"filename={self.filename}, " \
+               f"extension={self.extension}, " \
+               f"source={self.source}, " \
+               f"size={self.size}" \
+               f")"
@@ -0,0 +1,216 @@
+from .downloader import Item
+from . import summary
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+import threading
+import logging
+import sqlite3
+
+# Item statuses
+PENDING = "pending"
+IN_PROGRESS = "in-progress"
+DONE = "done"
+FAILED = "failed"
+
+# Source (scraped url) statuses
+SCRAPING = "scraping"  # items are being recorded as they are scraped
+SCRAPED = "scraped"  # items are recorded, some of them may be left to download
+COMPLETED = "completed"  # all items are done
+
+
+class DownloadJournal:
+    """
+    Record of scraped urls and their items kept in SQLite database.
+
+    Lets a run interrupted by a crash or Ctrl-C continue with the items
+    left to download without scraping their url again,
+    and a re-run of an url download only the items which weren't done before.
+    """
+    FILE_NAME = ".lols_journal.sqlite"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "  url TEXT PRIMARY KEY,"
+            "  dir_name TEXT,"
+            "  status TEXT NOT NULL,"
+            "  updated_at TEXT NOT NULL"
+            ");"
+            "CREATE TABLE IF NOT EXISTS items ("
+            "  url TEXT NOT NULL,"
+            "  source TEXT NOT NULL,"
+            "  content_type TEXT,"
+            "  album_title TEXT,"
+            "  filename TEXT,"
+            "  extension TEXT,"
+            "  target TEXT,"
+            "  size INTEGER,"
+            "  status TEXT NOT NULL,"
+            "  error TEXT,"
+            "  updated_at TEXT NOT NULL,"
+            "  PRIMARY KEY (url, source)"
+            ");"
+            "CREATE INDEX IF NOT EXISTS items_status ON items (status);"
+        )
+        self._db.commit()
+
+    def _execute(self, query: str, params=()) -> list:
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+            self._db.commit()
+            return rows
+
+    def source_status(self, url: str) -> str:
+        """Status of the scraped url, None if it isn't recorded."""
+        rows = self._execute("SELECT status FROM sources WHERE url = ?", (url,))
+        return rows[0][0] if rows else None
+
+    def add_items(self, url: str, items: List[Item], dir_name: str, status: str = SCRAPED):
+        """
+        Records scraped items of the url, already recorded items keep their status.
+        Items streamed from a scraper are added with SCRAPING status until the last of them,
+        an url left SCRAPING is scraped again in the next run.
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO sources (url, dir_name, status, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET "
+                "dir_name = excluded.dir_name, status = excluded.status, updated_at = excluded.updated_at",
+                (url, dir_name, status, now)
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO items "
+                "(url, source, content_type, album_title, filename, extension, size, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (url, item.source, item.content_type, item.album_title,
+                     item.filename, item.extension, item.size, PENDING, now)
+                    for item in items
+                ]
+            )
+            self._db.commit()
+
+    def remaining_items(self, url: str) -> Tuple[List[Item], str]:
+        """Items of the url which aren't done yet and name of their output directory."""
+        rows = self._execute(
+            "SELECT content_type, filename, extension, source, album_title, size FROM items "
+            "WHERE url = ? AND status != ? ORDER BY rowid",
+            (url, DONE)
+        )
+        items = [
+            Item(content_type=content_type, filename=filename, extension=extension,
+                 source=source, album_title=album_title, size=size)
+            for content_type, filename, extension, source, album_title, size in rows
+        ]
+        dir_name = self._execute("SELECT dir_name FROM sources WHERE url = ?", (url,))
+        return items, (dir_name[0][0] if dir_name else None)
+
+    def set_status(self,
+                   url: str,
+                   item: Item,
+                   status: str,
+                   target: Path = None,
+                   error: Exception = None
+                   ):
+        size = target.stat().st_size if target is not None and target.exists() else None
+        self._execute(
+            "UPDATE items SET status = ?, target = COALESCE(?, target), size = COALESCE(?, size), "
+            "error = ?, updated_at = ? WHERE url = ? AND source = ?",
+            (status, str(target) if target else None, size,
+             repr(error) if error else None, datetime.now().isoformat(), url, item.source)
+        )
+
+    def start(self, url: str, item: Item):
+        """Marks the item in progress, recording it if the scraper is still adding items of the url."""
+        self._execute(
+            "INSERT INTO items "
+            "(url, source, content_type, album_title, filename, extension, size, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (url, source) DO UPDATE SET "
+            "status = excluded.status, error = NULL, updated_at = excluded.updated_at",
+            (url, item.source, item.content_type, item.album_title,
+             item.filename, item.extension, item.size, IN_PROGRESS, datetime.now().isoformat())
+        )
+
+    def finish(self, url: str, item: Item, decision: str, target: Path = None, error: Exception = None):
+        """Records item's download decision (see 'summary' module)."""
+        status = FAILED if decision in (summary.FAILED, summary.INVALID) else DONE
+        self.set_status(url, item, status, target=target, error=error)
+
+    def done_sources(self, url: str) -> set:
+        """Sources of the url's items which are done."""
+        rows = self._execute("SELECT source FROM items WHERE url = ? AND status = ?", (url, DONE))
+        return {source for source, in rows}
+
+    def finish_source(self, url: str):
+        """Marks the scraped url completed if all of its items are done."""
+        self._execute(
+            "UPDATE sources SET status = ?, updated_at = ? WHERE url = ? AND status = ? AND NOT EXISTS "
+            "(SELECT 1 FROM items WHERE items.url = sources.url AND items.status != ?)",
+            (COMPLETED, datetime.now().isoformat(), url, SCRAPED, DONE)
+        )
+
+    def failed_items(self) -> list:
+        """(url, source, target, error) of all failed items."""
+        return self._execute(
+            "SELECT url, source, target, error FROM items WHERE status = ? ORDER BY url, rowid",
+            (FAILED,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ScrapeRecorder:
+    """
+    Filters items scraped from an url, dropping duplicates and items done in previous runs,
+    and records them in journal in chunks as they come. Items can be accepted from several threads.
+
+    'close' records the rest of the items, the url is marked SCRAPED
+    unless its scraping 'failed', then it's scraped again in the next run.
+    """
+    CHUNK = 500
+
+    def __init__(self, journal: DownloadJournal, url: str, dir_name: str):
+        self.journal = journal if url else None
+        self.url = url
+        self.dir_name = dir_name
+        self.failed = False
+        self.total = 0
+        self.skipped = 0
+        self._done = self.journal.done_sources(url) if self.journal else set()
+        self._seen = set()  # sources only, items are freed once they are downloaded
+        self._chunk = []
+        self._lock = threading.Lock()
+
+    def accept(self, item: Item) -> bool:
+        """Returns True if the item is to be downloaded."""
+        with self._lock:
+            self.total += 1
+            if item.source in self._seen:
+                return False
+            self._seen.add(item.source)
+            if self.journal:
+                self._chunk.append(item)
+                if len(self._chunk) >= self.CHUNK:
+                    self._flush(SCRAPING)
+            if item.source in self._done:
+                self.skipped += 1
+                return False
+            return True
+
+    def _flush(self, status: str):
+        self.journal.add_items(self.url, self._chunk, self.dir_name, status=status)
+        self._chunk = []
+
+    def close(self):
+        with self._lock:
+            if self.journal:
+                self._flush(SCRAPING if self.failed else SCRAPED)
+        logging.debug(f"Scraped total of {self.total} items, {len(self._seen)} unique: {self.url}")
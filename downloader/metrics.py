@@ -0,0 +1,298 @@
+from collections import Counter, defaultdict
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple, Union
+from .ratelimit import THROTTLE_STATUS_CODES
+from .summary import FAILED, INVALID
+import threading
+import logging
+import json
+import time
+import os
+
+# Output formats of the metrics file
+JSON = "json"
+PROMETHEUS = "prometheus"
+
+FORMATS = (JSON, PROMETHEUS)
+
+# Upper bounds of histogram buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # request until response headers
+DURATION_BUCKETS = (0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)  # whole download of an item
+
+
+class MetricsListener:
+    """Receives request and download events, ignores them unless replaced by Metrics."""
+    def request(self,
+                host: str,
+                method: str,
+                seconds: float,
+                status: int = None,
+                scraper: str = None,
+                error: Exception = None
+                ):
+        pass
+
+    def download_attempt(self, host: str):
+        pass
+
+    def transferred(self, host: str, size: int):
+        pass
+
+    def item_finished(self, host: str, status: str, seconds: float):
+        pass
+
+    def item_scraped(self, scraper: str):
+        pass
+
+
+class Histogram:
+    """Count of observed values in buckets of upper bounds 'buckets', the last bucket is unbounded."""
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """(upper bound, count of values up to it), 'inf' bound last."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Union[float, None]:
+        """Upper bound of the bucket holding the quantile, None if nothing was observed."""
+        if not self.count:
+            return None
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): total
+                        for bound, total in self.cumulative()},
+            "sum": round(self.sum, 6),
+            "count": self.count,
+        }
+
+
+class Stats:
+    """Counters and histograms of a single host or scraper."""
+    def __init__(self):
+        self.counters = Counter()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.duration = Histogram(DURATION_BUCKETS)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.counters["attempts"] - self.counters["items"])
+
+    def to_dict(self) -> dict:
+        return {
+            "counters": {name: round(value, 6) if isinstance(value, float) else value
+                         for name, value in self.counters.items()},
+            "request_seconds": self.latency.to_dict(),
+            "download_seconds": self.duration.to_dict(),
+        }
+
+
+class Metrics(MetricsListener):
+    """
+    Counters and latency histograms per host and per scraper class.
+
+    Requests are counted per host, requests of scrapers also per scraper class,
+    their latency is the time until response headers arrive.
+    Downloads count attempts (retries are the attempts above one per item),
+    received bytes and durations of whole items.
+
+    With 'path' set, the metrics are rewritten every 'interval' seconds
+    as JSON or Prometheus text format, so they can be watched while the run goes on.
+    """
+    def __init__(self, path: Path = None, fmt: str = None, interval: float = 15.0):
+        self.path = Path(path) if path else None
+        if fmt is None:
+            fmt = PROMETHEUS if self.path and self.path.suffix in (".prom", ".txt") else JSON
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown metrics format '{fmt}', expected one of {FORMATS}")
+        self.format = fmt
+        self.interval = interval
+        self.hosts: Dict[str, Stats] = defaultdict(Stats)
+        self.scrapers: Dict[str, Stats] = defaultdict(Stats)
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def request(self,
+                host: str,
+                method: str,
+                seconds: float,
+                status: int = None,
+                scraper: str = None,
+                error: Exception = None
+                ):
+        with self._lock:
+            for stats in (self.hosts[host], self.scrapers[scraper] if scraper else None):
+                if stats is None:
+                    continue
+                stats.counters["requests"] += 1
+                stats.counters[f"requests_{method.lower()}"] += 1
+                stats.latency.observe(seconds)
+                if error is not None:
+                    stats.counters["errors"] += 1
+                else:
+                    stats.counters[f"responses_{status // 100}xx"] += 1
+                    if status in THROTTLE_STATUS_CODES:
+                        stats.counters["throttled"] += 1
+
+    def download_attempt(self, host: str):
+        with self._lock:
+            self.hosts[host].counters["attempts"] += 1
+
+    def transferred(self, host: str, size: int):
+        with self._lock:
+            self.hosts[host].counters["bytes"] += size
+
+    def item_finished(self, host: str, status: str, seconds: float):
+        with self._lock:
+            stats = self.hosts[host]
+            stats.counters["items"] += 1
+            stats.counters[f"items_{status}"] += 1
+            if status not in (FAILED, INVALID):
+                # Failed items mostly wait for retries, they'd hide the speed of the host
+                stats.counters["transfer_seconds"] += seconds
+            stats.duration.observe(seconds)
+
+    def item_scraped(self, scraper: str):
+        with self._lock:
+            self.scrapers[scraper].counters["items"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "updated_at": datetime.now().isoformat(),
+                "uptime": round(time.time() - self._started, 3),
+                "hosts": {host: stats.to_dict() for host, stats in self.hosts.items()},
+                "scrapers": {scraper: stats.to_dict() for scraper, stats in self.scrapers.items()},
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = [
+            "# TYPE lols_uptime_seconds gauge",
+            f"lols_uptime_seconds {snapshot['uptime']}",
+        ]
+        for group, label in (("hosts", "host"), ("scrapers", "scraper")):
+            groups = snapshot[group]
+            counters = sorted({name for stats in groups.values() for name in stats["counters"]})
+            for name in counters:
+                metric = f"lols_{label}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, stats in groups.items():
+                    if name in stats["counters"]:
+                        lines.append(f'{metric}{{{label}="{_escape(key)}"}} {stats["counters"][name]}')
+            for histogram in ("request_seconds", "download_seconds"):
+                metric = f"lols_{label}_{histogram}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, stats in groups.items():
+                    values = stats[histogram]
+                    if not values["count"]:
+                        continue
+                    labels = f'{label}="{_escape(key)}"'
+                    for bound, total in values["buckets"].items():
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {total}')
+                    lines.append(f"{metric}_sum{{{labels}}} {values['sum']}")
+                    lines.append(f"{metric}_count{{{labels}}} {values['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Replaces the metrics file at once, readers never see a partial file."""
+        if self.path is None:
+            return
+        content = self.to_prometheus() if self.format == PROMETHEUS else self.to_json()
+        temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(content)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.debug(f"Failed to write metrics to {self.path}: {e!r}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        if self.path is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def report(self):
+        with self._lock:
+            hosts = [(host, stats) for host, stats in self.hosts.items() if stats.counters["requests"]]
+            scrapers = [(scraper, stats) for scraper, stats in self.scrapers.items() if stats.counters["requests"]]
+            if hosts:
+                print(f"\n{'Host':<28}{'requests':>9}{'errors':>8}{'throttled':>10}{'retries':>8}"
+                      f"{'items':>7}{'failed':>7}{'MB':>9}{'MB/s':>7}{'p50 ms':>8}{'p95 ms':>8}")
+                for host, stats in sorted(hosts, key=lambda entry: -entry[1].counters["bytes"]):
+                    counters = stats.counters
+                    downloading = counters["transfer_seconds"]
+                    speed = counters["bytes"] / downloading / 1024 / 1024 if downloading else 0.0
+                    print(f"{host[:27]:<28}{counters['requests']:>9}{counters['errors']:>8}"
+                          f"{counters['throttled']:>10}{stats.retries:>8}{counters['items']:>7}"
+                          f"{counters[f'items_{FAILED}'] + counters[f'items_{INVALID}']:>7}"
+                          f"{counters['bytes'] / 1024 / 1024:>9.1f}{speed:>7.1f}"
+                          f"{_milliseconds(stats.latency.quantile(0.5)):>8}"
+                          f"{_milliseconds(stats.latency.quantile(0.95)):>8}")
+            if scrapers:
+                print(f"\n{'Scraper':<28}{'requests':>9}{'errors':>8}{'throttled':>10}"
+                      f"{'items':>7}{'p50 ms':>8}{'p95 ms':>8}")
+                for scraper, stats in sorted(scrapers):
+                    counters = stats.counters
+                    print(f"{scraper[:27]:<28}{counters['requests']:>9}{counters['errors']:>8}"
+                          f"{counters['throttled']:>10}{counters['items']:>7}"
+                          f"{_milliseconds(stats.latency.quantile(0.5)):>8}"
+                          f"{_milliseconds(stats.latency.quantile(0.95)):>8}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _milliseconds(bound: Union[float, None]) -> str:
+    """Bucket bound of a quantile, '-' if unknown, '>' past the last bucket."""
+    if bound is None:
+        return "-"
+    if bound == float("inf"):
+        return f">{LATENCY_BUCKETS[-1] * 1000:.0f}"
+    return f"<{bound * 1000:.0f}"
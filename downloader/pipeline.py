@@ -0,0 +1,248 @@
+from queue import Queue, Empty, Full
+from typing import Callable, Iterable, List
+from .pool import DownloadPool, DownloadResult
+import threading
+import logging
+import time
+
+_END = object()  # closes the input of a stage
+_WAIT = 0.5  # seconds between checks of a stopped pipeline while waiting on a queue
+
+
+class Stage:
+    """
+    Step of a Pipeline, 'workers' threads call 'func(value)' for values
+    taken from its queue of at most 'capacity' values.
+
+    The returned value is passed to the next stage, None is dropped.
+    'expand' stage returns an iterable of values instead.
+    Exception of 'func' is logged and counted, its value is dropped.
+    """
+    def __init__(self,
+                 name: str,
+                 func: Callable,
+                 workers: int = 1,
+                 capacity: int = 100,
+                 expand: bool = False
+                 ):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.capacity = max(1, capacity)
+        self.expand = expand
+        self.queue = None
+        self.taken = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0  # seconds spent in 'func' by all workers, including waits for the next stage
+        self.max_depth = 0
+        self._stopped = None
+        self._lock = threading.Lock()
+
+    def open(self, stopped: threading.Event):
+        self.queue = Queue(maxsize=self.capacity)
+        self._stopped = stopped
+
+    def put(self, value) -> bool:
+        """Blocks while the queue is full, returns False if the pipeline stopped."""
+        while not self._stopped.is_set():
+            try:
+                self.queue.put(value, timeout=_WAIT)
+            except Full:
+                continue
+            if value is not _END:
+                with self._lock:
+                    self.max_depth = max(self.max_depth, self.queue.qsize())
+            return True
+        return False
+
+    def get(self):
+        """Next value of the queue, _END once the input is closed or the pipeline stopped."""
+        while not self._stopped.is_set():
+            try:
+                return self.queue.get(timeout=_WAIT)
+            except Empty:
+                continue
+        return _END
+
+    def close(self):
+        """Ends the input, every worker stops at its own _END."""
+        for _ in range(self.workers):
+            self.put(_END)
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def count(self, taken: int = 0, emitted: int = 0, errors: int = 0, busy: float = 0.0):
+        with self._lock:
+            self.taken += taken
+            self.emitted += emitted
+            self.errors += errors
+            self.busy += busy
+
+    def start(self, emit: Callable) -> List[threading.Thread]:
+        threads = [
+            threading.Thread(target=self._work, args=(emit,), name=f"{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _work(self, emit: Callable):
+        while True:
+            value = self.get()
+            if value is _END:
+                return
+            self.count(taken=1)
+            start = time.perf_counter()
+            try:
+                output = self.func(value)
+                for output_value in (output if self.expand else (output,)):
+                    if output_value is not None:
+                        self.count(emitted=1)
+                        emit(output_value)
+            except Exception:
+                logging.exception(f"Pipeline stage '{self.name}' failed on {value}")
+                self.count(errors=1)
+            finally:
+                self.count(busy=time.perf_counter() - start)
+
+
+class PoolStage(Stage):
+    """
+    Download stage run on a DownloadPool, so items are dispatched by host
+    within the host limits (see HostQueues). Emits DownloadResult of every item.
+    """
+    def __init__(self,
+                 name: str,
+                 pool: DownloadPool,
+                 fetch: Callable,
+                 capacity: int = 100,
+                 is_large: Callable = None
+                 ):
+        super().__init__(name, fetch, workers=pool.workers, capacity=capacity)
+        self.pool = pool
+        self.is_large = is_large
+
+    def close(self):
+        # A single reader feeds the pool
+        self.put(_END)
+
+    def start(self, emit: Callable) -> List[threading.Thread]:
+        thread = threading.Thread(target=self._run, args=(emit,), name=self.name, daemon=True)
+        thread.start()
+        return [thread]
+
+    def _inputs(self):
+        while True:
+            value = self.get()
+            if value is _END:
+                return
+            self.count(taken=1)
+            yield value
+
+    def _fetch(self, item):
+        start = time.perf_counter()
+        try:
+            return self.func(item)
+        finally:
+            self.count(busy=time.perf_counter() - start)
+
+    def _run(self, emit: Callable):
+        def on_result(result: DownloadResult):
+            self.count(emitted=1, errors=0 if result.ok else 1)
+            emit(result)
+
+        self.pool.run(
+            self._inputs(), self._fetch,
+            is_large=self.is_large, on_result=on_result, max_pending=self.capacity, collect=False
+        )
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each stage with its own workers,
+    so network and disk bound stages overlap.
+    A full queue blocks the stage before it, which keeps memory flat
+    however many values are fed in.
+
+    Queue depth and throughput of every stage are logged every LOG_INTERVAL seconds
+    and printed by 'report'.
+    """
+    LOG_INTERVAL = 10.0
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.elapsed = 0.0
+        self._stopped = threading.Event()
+
+    def run(self, values: Iterable):
+        """Feeds the values to the first stage, returns once every stage is done with them."""
+        self._stopped.clear()
+        for stage in self.stages:
+            stage.open(self._stopped)
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            threads.append(stage.start(next_stage.put if next_stage else (lambda value: None)))
+
+        start = time.monotonic()
+        done = threading.Event()
+        monitor = threading.Thread(target=self._log_stats, args=(done,), daemon=True)
+        monitor.start()
+        try:
+            for value in values:
+                if not self.stages[0].put(value):
+                    break
+            # Stages are closed in order, each once the stage before it is done
+            for stage, stage_threads in zip(self.stages, threads):
+                stage.close()
+                for thread in stage_threads:
+                    thread.join()
+        except BaseException:
+            # Running calls finish, nothing more is taken from the queues
+            self._stopped.set()
+            raise
+        finally:
+            done.set()
+            self.elapsed = time.monotonic() - start
+
+    def stop(self):
+        self._stopped.set()
+
+    def _log_stats(self, done: threading.Event):
+        while not done.wait(self.LOG_INTERVAL):
+            logging.debug("Pipeline: " + ", ".join(
+                f"{stage.name} {stage.depth}/{stage.capacity} queued {stage.emitted} out"
+                for stage in self.stages
+            ))
+
+    def stats(self) -> List[dict]:
+        elapsed = self.elapsed or 1e-9
+        return [
+            {
+                "stage": stage.name,
+                "workers": stage.workers,
+                "in": stage.taken,
+                "out": stage.emitted,
+                "errors": stage.errors,
+                "max_queue": stage.max_depth,
+                "capacity": stage.capacity,
+                "rate": stage.taken / elapsed,
+                "utilization": stage.busy / (elapsed * stage.workers),
+            }
+            for stage in self.stages
+        ]
+
+    def report(self):
+        if not any(stage.taken for stage in self.stages):
+            return
+        print(f"\nPipeline stages ({self.elapsed:.1f}s):")
+        for row in self.stats():
+            print(f"  {row['stage']:<14}{row['workers']:>3} workers  "
+                  f"in {row['in']:<6} out {row['out']:<6} errors {row['errors']:<4} "
+                  f"max queue {row['max_queue']}/{row['capacity']:<5} "
+                  f"{row['rate']:7.1f}/s  busy {row['utilization']:4.0%}")
@@ -0,0 +1,238 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Callable, Iterable, List
+from .hosts import policy_for, host_of
+from .summary import FAILED
+import threading
+import logging
+
+
+def host_limit(host: str, default: int, policies: dict = None) -> int:
+    """Returns maximum concurrent downloads allowed from the host."""
+    limit = policy_for(host, policies).max_concurrency
+    return limit if limit is not None else default
+
+
+class DownloadResult:
+    def __init__(self, item, status: str = None, error: Exception = None):
+        self.item = item
+        self.status = FAILED if error else status
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        return f"DownloadResult(" \
+               f"item={self.item}, " \
+               f"status={self.status}, " \
+               f"error={self.error!r}" \
+               f")"
+
+
+class HostQueues:
+    """
+    Items waiting for download grouped by host, each host has a queue
+    of small and a queue of large items.
+
+    Hosts are served round-robin in order of their first item, a host running
+    its limit of downloads is skipped until one of them is done,
+    so a host with many queued items doesn't hold back the others.
+
+    Items can be fed while workers are taking them ('feeding'),
+    'put' blocks while 'capacity' items are waiting.
+    """
+    SMALL = 0
+    LARGE = 1
+
+    def __init__(self, limit: Callable, capacity: int = None, feeding: bool = False):
+        self._limit = limit  # limit(host) -> max concurrent downloads
+        self._capacity = capacity
+        self._feeding = feeding
+        self._queues = {}
+        self._active = {}
+        self._hosts = []
+        self._next = 0
+        self._pending = [0, 0]
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, item, large: bool = False) -> bool:
+        """Queues the item, returns False if the queues are closed."""
+        host = host_of(item.source)
+        lane = self.LARGE if large else self.SMALL
+        with self._condition:
+            while self._capacity and sum(self._pending) >= self._capacity and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return False
+            if host not in self._queues:
+                self._queues[host] = (deque(), deque())
+                self._active[host] = 0
+                self._hosts.append(host)
+            self._queues[host][lane].append(item)
+            self._pending[lane] += 1
+            self._condition.notify_all()
+            return True
+
+    def feed(self, items: Iterable, is_large: Callable = None):
+        """
+        Puts the items as they come, workers wait for more until the items end.
+        Items for which 'is_large(item)' is true go to the large queues.
+        """
+        try:
+            for item in items:
+                if not self.put(item, large=bool(is_large and is_large(item))):
+                    break
+        finally:
+            with self._condition:
+                self._feeding = False
+                self._condition.notify_all()
+
+    def _take_from(self, lane: int):
+        for i in range(len(self._hosts)):
+            index = (self._next + i) % len(self._hosts)
+            host = self._hosts[index]
+            queue = self._queues[host][lane]
+            if queue and self._active[host] < self._limit(host):
+                self._next = index + 1
+                self._active[host] += 1
+                self._pending[lane] -= 1
+                return queue.popleft()
+        return None
+
+    def take(self, dedicated: bool = False):
+        """
+        Blocks until an item of a host below its limit can be started,
+        returns None once the queues are empty and not fed or closed.
+        Dedicated workers prefer large items, the others take large items
+        only when no small one is waiting.
+        """
+        with self._condition:
+            while not self._closed and (any(self._pending) or self._feeding):
+                if dedicated:
+                    item = self._take_from(self.LARGE)
+                    if item is None:
+                        item = self._take_from(self.SMALL)
+                else:
+                    item = self._take_from(self.SMALL)
+                    if item is None and not self._pending[self.SMALL]:
+                        item = self._take_from(self.LARGE)
+                if item is not None:
+                    if self._capacity:
+                        # Room for the feeder
+                        self._condition.notify_all()
+                    return item
+                self._condition.wait()
+            return None
+
+    def done(self, item):
+        with self._condition:
+            self._active[host_of(item.source)] -= 1
+            self._condition.notify_all()
+
+    def close(self):
+        """Releases waiting workers, no more items are taken."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class DownloadPool:
+    """
+    Downloads items concurrently on a thread pool.
+
+    Concurrency is capped globally by 'workers' and separately for every host
+    by 'max_concurrency' of its policy ('host_workers' if not set),
+    so a single CDN shard never gets more than its limit of connections.
+    Items are dispatched from per-host queues round-robin, workers aren't
+    blocked by a busy host while items of other hosts are waiting.
+    Up to 'large_workers' of the workers are dedicated to large items,
+    the others take them only when no small item is left.
+    Items can be a lazy iterable, they are fed to the workers as they come,
+    with at most MAX_PENDING of them waiting.
+    Failure of an item is recorded in its result and doesn't abort the batch.
+    """
+    MAX_PENDING = 10000
+
+    def __init__(self,
+                 workers: int,
+                 host_workers: int = 4,
+                 host_policies: dict = None,
+                 large_workers: int = 0
+                 ):
+        self.workers = max(1, workers)
+        self.host_workers = max(1, host_workers)
+        self.host_policies = host_policies
+        self.large_workers = max(0, large_workers)
+        self._host_limits = {}
+
+    def host_limit(self, host: str) -> int:
+        if host not in self._host_limits:
+            self._host_limits[host] = min(
+                host_limit(host, self.host_workers, self.host_policies), self.workers
+            )
+        return self._host_limits[host]
+
+    def run(self,
+            items: Iterable,
+            fetch: Callable,
+            large_items: list = None,
+            is_large: Callable = None,
+            on_result: Callable = None,
+            max_pending: int = None,
+            collect: bool = True
+            ) -> List[DownloadResult]:
+        """
+        Calls 'fetch(item)' for every item and returns results in completion order,
+        status of the result is the value returned by 'fetch'.
+        Items of a host are started in the given order, 'large_items' and items
+        for which 'is_large(item)' is true go to the dedicated workers.
+        'on_result' is called with every result once its item is done,
+        without 'collect' the results are passed only to it and an empty list is returned.
+        At most 'max_pending' items (MAX_PENDING by default) are taken from 'items' ahead of the workers.
+        """
+        queues = HostQueues(self.host_limit, capacity=max_pending or self.MAX_PENDING, feeding=True)
+        for item in large_items or []:
+            queues.put(item, large=True)
+        large_workers = min(self.large_workers, self.workers - 1) if large_items or is_large else 0
+        results = []
+        lock = threading.Lock()
+
+        def worker(dedicated: bool):
+            while True:
+                item = queues.take(dedicated)
+                if item is None:
+                    return
+                try:
+                    result = self._fetch(item, fetch)
+                finally:
+                    queues.done(item)
+                if collect:
+                    with lock:
+                        results.append(result)
+                if on_result:
+                    on_result(result)
+
+        # One more thread feeds the items, so a lazy iterable is consumed while downloading
+        with ThreadPoolExecutor(max_workers=self.workers + 1) as executor:
+            futures = [executor.submit(worker, i < large_workers) for i in range(self.workers)]
+            futures.append(executor.submit(queues.feed, items, is_large))
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Let the running downloads finish, but don't start new ones
+                queues.close()
+                raise
+
+        return results
+
+    def _fetch(self, item, fetch: Callable) -> DownloadResult:
+        try:
+            status = fetch(item)
+        except Exception as e:
+            logging.exception(f"Failed to download {item}")
+            return DownloadResult(item, error=e)
+        return DownloadResult(item, status=status)
@@ -0,0 +1,178 @@
+from collections import deque
+from typing import TextIO
+import threading
+import time
+import sys
+
+# Display modes
+AUTO = "auto"
+LIVE = "live"  # redrawn in place, needs a terminal
+PLAIN = "plain"  # appended lines, for logs of cron jobs and CI
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressListener:
+    """Receiver of download events, ignores all of them."""
+    def items_added(self, count: int):
+        pass
+
+    def item_started(self, item, total: int = None, received: int = 0):
+        """Transfer of the item started, 'received' bytes were downloaded before."""
+        pass
+
+    def item_progress(self, item, size: int):
+        """Chunk of 'size' bytes of the item was written."""
+        pass
+
+    def item_finished(self, item, status: str):
+        pass
+
+
+class _Transfer:
+    def __init__(self, item, total: int, received: int):
+        self.item = item
+        self.total = total
+        self.received = received
+
+
+class ProgressView(ProgressListener):
+    """
+    Aggregate progress of all downloads: items, bytes, throughput and ETA.
+
+    In 'live' mode it's redrawn in place together with a line for every
+    active transfer, in 'plain' mode a single summary line is printed
+    every 'interval' seconds.
+    """
+    REFRESH = 0.5
+    MAX_TRANSFER_LINES = 10
+    SPEED_WINDOW = 5.0  # seconds
+
+    def __init__(self, total_items: int = 0, mode: str = AUTO, stream: TextIO = None, interval: float = 10.0):
+        self.stream = stream or sys.stderr
+        if mode == AUTO:
+            mode = LIVE if self.stream.isatty() else PLAIN
+        self.mode = mode
+        self.interval = interval
+
+        self.total_items = total_items
+        self.done_items = 0
+        self.failed_items = 0
+        self.bytes = 0
+        self._transfers = {}
+        self._started = time.monotonic()
+        self._samples = deque([(self._started, 0)])
+        self._drawn_lines = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Events
+    def items_added(self, count: int):
+        with self._lock:
+            self.total_items += count
+
+    def item_started(self, item, total: int = None, received: int = 0):
+        with self._lock:
+            self._transfers[id(item)] = _Transfer(item, total, received)
+
+    def item_progress(self, item, size: int):
+        with self._lock:
+            self.bytes += size
+            transfer = self._transfers.get(id(item))
+            if transfer:
+                transfer.received += size
+
+    def item_finished(self, item, status: str):
+        with self._lock:
+            self._transfers.pop(id(item), None)
+            self.done_items += 1
+            if status in ("failed", "invalid"):
+                self.failed_items += 1
+
+    # Rendering
+    def speed(self) -> float:
+        """Bytes per second over the last few seconds."""
+        now = time.monotonic()
+        self._samples.append((now, self.bytes))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.SPEED_WINDOW:
+            self._samples.popleft()
+        first_time, first_bytes = self._samples[0]
+        elapsed = now - first_time
+        return (self.bytes - first_bytes) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> str:
+        remaining = self.total_items - self.done_items
+        if not self.done_items or remaining <= 0:
+            return "--:--:--"
+        elapsed = time.monotonic() - self._started
+        return format_duration(elapsed / self.done_items * remaining)
+
+    def summary_line(self) -> str:
+        failed = f" ({self.failed_items} failed)" if self.failed_items else ""
+        return (f"Items {self.done_items}/{self.total_items}{failed} | "
+                f"{format_size(self.bytes)} | "
+                f"{format_size(self.speed())}/s | "
+                f"ETA {self.eta()}")
+
+    def transfer_lines(self) -> list:
+        transfers = list(self._transfers.values())
+        lines = []
+        for transfer in transfers[:self.MAX_TRANSFER_LINES]:
+            name = transfer.item.filename + transfer.item.extension
+            if len(name) > 40:
+                name = name[:37] + "..."
+            if transfer.total:
+                percent = 100 * transfer.received // transfer.total
+                size = f"{percent:3d}% {format_size(transfer.received)}/{format_size(transfer.total)}"
+            else:
+                size = format_size(transfer.received)
+            lines.append(f"  {name:<40} {size}")
+        if len(transfers) > self.MAX_TRANSFER_LINES:
+            lines.append(f"  ... and {len(transfers) - self.MAX_TRANSFER_LINES} more")
+        return lines
+
+    def render(self):
+        with self._lock:
+            if self.mode == LIVE:
+                lines = [self.summary_line()] + self.transfer_lines()
+                # Move cursor to the start of previous output and clear it
+                clear = f"\x1b[{self._drawn_lines}F\x1b[J" if self._drawn_lines else ""
+                self.stream.write(clear + "\n".join(lines) + "\n")
+                self._drawn_lines = len(lines)
+            else:
+                self.stream.write(self.summary_line() + "\n")
+            self.stream.flush()
+
+    def _run(self):
+        interval = self.REFRESH if self.mode == LIVE else self.interval
+        while not self._stop.wait(interval):
+            self.render()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.render()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,178 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Union
+import requests
+import threading
+import logging
+import time
+
+# Responses telling the client to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class RateLimitedError(requests.exceptions.RequestException):
+    """Raised if the server responded with 429 Too Many Requests."""
+    pass
+
+
+def parse_retry_after(value: str) -> Union[float, None]:
+    """Seconds to wait from 'Retry-After' header, either delay in seconds or HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_rate_limit_reset(headers) -> Union[float, None]:
+    """
+    Seconds until the rate limit window resets if the quota is exhausted,
+    from 'RateLimit-*' or 'X-RateLimit-*' headers.
+    """
+    for prefix in ("RateLimit", "X-RateLimit"):
+        remaining = headers.get(f"{prefix}-Remaining")
+        reset = headers.get(f"{prefix}-Reset")
+        if remaining is None or reset is None:
+            continue
+        try:
+            remaining, reset = int(float(remaining)), float(reset)
+        except ValueError:
+            continue
+        if remaining > 0:
+            return None
+        # Some hosts send epoch timestamp instead of delay
+        return max(0.0, reset - time.time()) if reset > 1e9 else reset
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled by 'rate' tokens per second up to 'capacity'.
+
+    Tokens are reserved in order of the requests, a request which can't be
+    served yet takes the tokens on credit and waits until they're refilled,
+    so concurrent callers are served first come first served.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Takes the tokens and returns seconds to wait before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class _HostState:
+    def __init__(self, rate: float, burst: float):
+        self.bucket = TokenBucket(rate, burst)
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.backoff = 0  # consecutive throttled responses
+
+
+class HostRateLimiter:
+    """
+    Adaptive request rate limit kept separately for every host.
+
+    Starts at 'max_rate' requests per second. A throttled response
+    (429/503) halves the host's rate and blocks the host for the time from
+    'Retry-After' (exponential backoff without it), exhausted rate limit
+    quota blocks it until the quota resets. Every successful response
+    raises the rate back by 'increase' up to 'max_rate'.
+    Only the throttled host waits, requests to other hosts aren't affected.
+    """
+    def __init__(self,
+                 max_rate: float = 20.0,
+                 burst: float = 10.0,
+                 min_rate: float = 0.2,
+                 increase: float = 0.2
+                 ):
+        self.max_rate = max_rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.increase = increase
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostState(self.max_rate, self.burst)
+            return self._hosts[host]
+
+    def delay(self, host: str) -> float:
+        """Reserves a request to the host, returns seconds to wait before sending it."""
+        state = self._state(host)
+        blocked = max(0.0, state.blocked_until - time.monotonic())
+        return blocked + state.bucket.reserve()
+
+    def acquire(self, host: str):
+        """Blocks until a request to the host is allowed."""
+        delay = self.delay(host)
+        if delay > 0:
+            logging.debug(f"Rate limit for {host}, waiting {delay:.2f}s")
+            time.sleep(delay)
+
+    def update(self, host: str, status_code: int, headers):
+        """Adapts the host rate to the response."""
+        state = self._state(host)
+        bucket = state.bucket
+        now = time.monotonic()
+
+        if status_code in THROTTLE_STATUS_CODES:
+            state.throttled += 1
+            state.backoff += 1
+            wait = parse_retry_after(headers.get("Retry-After"))
+            if wait is None:
+                wait = min(60.0, 2.0 ** state.backoff)
+            with self._lock:
+                state.blocked_until = max(state.blocked_until, now + wait)
+            bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+            logging.debug(
+                f"{host} throttled ({status_code}), blocked for {wait:.1f}s, "
+                f"rate lowered to {bucket.rate:.2f}/s"
+            )
+            return
+
+        state.backoff = 0
+        reset = parse_rate_limit_reset(headers)
+        if reset is not None:
+            with self._lock:
+                state.blocked_until = max(state.blocked_until, now + reset)
+            logging.debug(f"{host} rate limit quota exhausted, blocked for {reset:.1f}s")
+
+        if bucket.rate < self.max_rate:
+            bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+
+    def throttled(self) -> dict:
+        """Number of throttled responses by host."""
+        with self._lock:
+            return {host: state.throttled for host, state in self._hosts.items() if state.throttled}
+
+    def report(self):
+        for host, count in self.throttled().items():
+            print(f"{host} throttled requests {count} times.")
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+import logging
+
+# Scheduling policies
+SCRAPE_ORDER = "scrape"
+SMALLEST_FIRST = "smallest"
+LARGEST_FIRST = "largest"
+INTERLEAVE = "interleave"  # smallest and largest remaining items in turns
+
+POLICIES = (SCRAPE_ORDER, SMALLEST_FIRST, LARGEST_FIRST, INTERLEAVE)
+
+
+class SizeProber:
+    """Fills in sizes the scrapers didn't provide with concurrent HEAD requests."""
+    def __init__(self, downloader, workers: int = 8):
+        self._downloader = downloader
+        self.workers = max(1, workers)
+
+    def probe(self, items: list) -> list:
+        """Returns the items, the ones without size replaced by items with the probed size."""
+        unknown = [item for item in items if item.size is None]
+        if not unknown:
+            return list(items)
+
+        # Requests go through the rate limiter and host connection pools of the downloader
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            probed = list(executor.map(self.probe_item, items))
+
+        logging.debug(f"Probed sizes of {sum(item.size is not None for item in probed) - len(items) + len(unknown)}"
+                      f"/{len(unknown)} items")
+        return probed
+
+    def probe_item(self, item):
+        """Returns the item, replaced by item with the probed size if it had none."""
+        if item.size is not None:
+            return item
+        size = self._downloader._remote_size(item)
+        return item.replace(size=size) if size is not None else item
+
+
+class DownloadScheduler:
+    """
+    Orders items for downloading by their size.
+
+    Items of unknown size are kept in scrape order after the sized ones.
+    'large_threshold' marks items downloaded by dedicated workers
+    of the pool (see DownloadPool 'large_workers').
+    """
+    def __init__(self,
+                 policy: str = SCRAPE_ORDER,
+                 prober: SizeProber = None,
+                 large_threshold: int = None
+                 ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}', expected one of {POLICIES}")
+        self.policy = policy
+        self.prober = prober
+        self.large_threshold = large_threshold
+
+    @property
+    def needs_sizes(self) -> bool:
+        return self.needs_order or self.large_threshold is not None
+
+    @property
+    def needs_order(self) -> bool:
+        """True if all items have to be known before downloading."""
+        return self.policy != SCRAPE_ORDER
+
+    def probe(self, items: list) -> list:
+        """Returns the items with missing sizes probed, if the policy needs them."""
+        if self.needs_sizes and self.prober:
+            return self.prober.probe(items)
+        return list(items)
+
+    def order(self, items: list) -> list:
+        if self.policy == SCRAPE_ORDER:
+            return list(items)
+
+        known = sorted((item for item in items if item.size is not None), key=lambda item: item.size)
+        unknown = [item for item in items if item.size is None]
+
+        if self.policy == LARGEST_FIRST:
+            known.reverse()
+        elif self.policy == INTERLEAVE:
+            known = self._interleave(known)
+        return known + unknown
+
+    @staticmethod
+    def _interleave(ordered: list) -> list:
+        """Takes items from both ends of the size ordered list in turns."""
+        result = []
+        low, high = 0, len(ordered) - 1
+        while low <= high:
+            result.append(ordered[low])
+            if low != high:
+                result.append(ordered[high])
+            low += 1
+            high -= 1
+        return result
+
+    def is_large(self, item) -> bool:
+        return (self.large_threshold is not None
+                and item.size is not None
+                and item.size >= self.large_threshold)
+
+    def split(self, items: list) -> Tuple[List, List]:
+        """(small, large) items, both in their scheduled order."""
+        small = [item for item in items if not self.is_large(item)]
+        large = [item for item in items if self.is_large(item)]
+        return small, large
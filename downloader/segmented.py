@@ -0,0 +1,134 @@
+from exceptions import IncompleteDownloadError, RangeNotSupportedError, StalledTransferError
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.exceptions import ProtocolError
+from pathlib import Path
+from typing import List, Tuple
+from .hosts import host_of
+from .diskio import body_reader, preallocate_full, check_free_space, fsync, FSYNC_NEVER
+import requests
+import logging
+
+ByteRange = Tuple[int, int]
+
+
+def split_ranges(size: int, segments: int) -> List[ByteRange]:
+    """Splits file of 'size' bytes into inclusive (start, end) byte ranges."""
+    segments = max(1, min(segments, size))
+    step = size // segments
+    ranges = []
+    for i in range(segments):
+        start = i * step
+        end = size - 1 if i == segments - 1 else start + step - 1
+        ranges.append((start, end))
+    return ranges
+
+
+class SegmentedDownload:
+    """
+    Downloads a single file over several parallel connections.
+
+    File is preallocated to its full size and every byte range
+    is written at its offset by a separate thread.
+    Raises RangeNotSupportedError if the server doesn't honor ranges,
+    so the caller can fall back to a single stream.
+    """
+    CHUNK_SIZE = 1024 * 1024
+    SEGMENT_TRIES = 3
+
+    def __init__(self, downloader, item, path: Path, size: int, segments: int):
+        self._downloader = downloader
+        self.item = item
+        self.url = item.source
+        self.path = path
+        self.size = size
+        self.segments = segments
+
+    def run(self):
+        ranges = split_ranges(self.size, self.segments)
+        logging.debug(f"Downloading {self.url} in {len(ranges)} segments")
+
+        check_free_space(self.path.parent, self.size, self._downloader.min_free_space)
+        with open(self.path, "wb") as f:
+            preallocate_full(f, self.size)
+
+        self._downloader.progress.item_started(self.item, total=self.size)
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(self._fetch_range, *byte_range) for byte_range in ranges]
+            received = sum(future.result() for future in futures)
+
+        if self._downloader.fsync_policy != FSYNC_NEVER:
+            with open(self.path, "r+b") as f:
+                fsync(f)
+
+        written = self.path.stat().st_size
+        if received != self.size or written != self.size:
+            raise IncompleteDownloadError(
+                f"Received {received} of {self.size} bytes in segments: {self.path.name}"
+            )
+
+    def _fetch_range(self, start: int, end: int) -> int:
+        """Downloads the range, continuing inside of it on connection errors."""
+        position = start
+        for attempt in range(1, self.SEGMENT_TRIES + 1):
+            try:
+                for received in self._fetch(position, end):
+                    position += received
+                if position != end + 1:
+                    raise IncompleteDownloadError(f"Segment {start}-{end} ended at byte {position}")
+                break
+            except (requests.exceptions.RequestException, ProtocolError,
+                    IncompleteDownloadError, StalledTransferError) as e:
+                if attempt == self.SEGMENT_TRIES:
+                    raise
+                logging.debug(f"Segment {start}-{end} failed at byte {position}: {e!r}")
+        return position - start
+
+    def _fetch(self, start: int, end: int):
+        """Writes the range at its offset, yields number of bytes of every written chunk."""
+        response = self._downloader.send_request(
+            method='GET',
+            url=self.url,
+            stream=True,
+            headers={"Range": f"bytes={start}-{end}"}
+        )
+        bandwidth = self._downloader.bandwidth
+        watchdog = self._downloader.watchdog
+        host = host_of(self.url)
+        with response:
+            self._check_range(response, start)
+            readinto = body_reader(response)
+            buffer = memoryview(bytearray(watchdog.chunk_size(bandwidth.chunk_size(self.CHUNK_SIZE))))
+            monitor = watchdog.monitor(response, name=f"{self.url} [{start}-{end}]")
+
+            with monitor, open(self.path, "r+b") as f:
+                f.seek(start)
+                while True:
+                    try:
+                        size = readinto(buffer)
+                    except ProtocolError as e:
+                        if monitor.stalled:
+                            raise monitor.error() from e
+                        raise
+                    if not size:
+                        break
+                    bandwidth.consume(host, size, monitor)
+                    self._downloader.metrics.transferred(host, size)
+                    f.write(buffer[:size])
+                    self._downloader.progress.item_progress(self.item, size)
+                    monitor.update(size)
+                    yield size
+
+            if monitor.stalled:
+                raise monitor.error()
+
+    @staticmethod
+    def _check_range(response: requests.Response, start: int):
+        content_range = response.headers.get("Content-Range", "")
+        if response.status_code != 206 or not content_range.startswith(f"bytes {start}-"):
+            raise RangeNotSupportedError(
+                f"Requested range from byte {start}, got {response.status_code} '{content_range}'"
+            )
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            raise RangeNotSupportedError(
+                f"Encoded range response: {response.headers['Content-Encoding']}"
+            )
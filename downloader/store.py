@@ -0,0 +1,152 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+import threading
+import hashlib
+import logging
+import sqlite3
+import shutil
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, reflinks fall back to hardlinks/copies
+    fcntl = None
+
+# ioctl request cloning file extents (Btrfs, XFS), linux/fs.h
+FICLONE = 0x40049409
+
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+
+
+class ContentStore:
+    """
+    Content addressed store of downloaded files.
+
+    Every unique content is kept once under 'objects/<sha256[:2]>/<sha256>'
+    and album files are hardlinks (or reflinks) to it, so a file downloaded
+    into several albums takes disk space only once.
+    Known hashes are indexed in SQLite database persisted next to the objects.
+    """
+    DIR_NAME = ".store"
+    HASH_ALGORITHM = "sha256"
+
+    def __init__(self, root: Path, link_mode: str = HARDLINK):
+        self.root = root
+        self.objects_path = root / "objects"
+        self.objects_path.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(root / "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "digest TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "created_at TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+        self.stored = 0
+        self.duplicates = 0
+        self.saved_bytes = 0
+
+    @classmethod
+    def new_hasher(cls):
+        return hashlib.new(cls.HASH_ALGORITHM)
+
+    @classmethod
+    def hash_file(cls, path: Path, hasher=None, chunk_size: int = 1024 * 1024):
+        """Updates the hasher with the file content."""
+        hasher = hasher or cls.new_hasher()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+        return hasher
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_path / digest[:2] / digest
+
+    def lookup(self, digest: str) -> Union[Path, None]:
+        """Returns path of the stored object with the digest, None if unknown."""
+        row = self._db.execute("SELECT size FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        path = self.object_path(digest)
+        return path if path.exists() else None
+
+    def put(self, source: Path, file_path: Path, digest: str) -> bool:
+        """
+        Moves complete downloaded file 'source' into the store and links it to 'file_path'.
+        Returns True if the content was already stored and the source was dropped.
+        """
+        with self._lock:
+            object_path = self.lookup(digest)
+            duplicate = object_path is not None
+
+            if duplicate:
+                size = source.stat().st_size
+                source.unlink()
+                self.duplicates += 1
+                self.saved_bytes += size
+                logging.debug(f"Duplicate content {digest}: {file_path}")
+            else:
+                object_path = self.object_path(digest)
+                object_path.parent.mkdir(exist_ok=True)
+                source.replace(object_path)
+                size = object_path.stat().st_size
+                self._db.execute(
+                    "INSERT OR REPLACE INTO objects (digest, size, created_at) VALUES (?, ?, ?)",
+                    (digest, size, datetime.now().isoformat())
+                )
+                self._db.commit()
+                self.stored += 1
+
+        self._link(object_path, file_path)
+        return duplicate
+
+    def _link(self, object_path: Path, file_path: Path):
+        if file_path.exists():
+            file_path.unlink()
+
+        methods = [self._hardlink, self._reflink]
+        if self.link_mode == REFLINK:
+            methods.reverse()
+        for method in methods:
+            try:
+                method(object_path, file_path)
+                return
+            except OSError as e:
+                logging.debug(f"{method.__name__} failed for {file_path}: {e!r}")
+
+        # Filesystem supports neither, keep an ordinary copy
+        shutil.copyfile(object_path, file_path)
+
+    @staticmethod
+    def _hardlink(object_path: Path, file_path: Path):
+        os.link(object_path, file_path)
+
+    @staticmethod
+    def _reflink(object_path: Path, file_path: Path):
+        if fcntl is None:
+            raise OSError("Reflinks aren't supported on this platform.")
+        with open(object_path, "rb") as src, open(file_path, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                file_path.unlink()
+                raise
+
+    def report(self):
+        if self.duplicates:
+            print(f"Deduplicated {self.duplicates} files, "
+                  f"saved {self.saved_bytes / 1024 / 1024:.1f} MB.")
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,55 @@
+from collections import Counter
+import threading
+import logging
+
+# Download decisions
+DOWNLOADED = "downloaded"
+RESUMED = "resumed"  # continued from '.part' file or truncated file
+REFETCHED = "refetched"  # existing file didn't match remote size
+SKIPPED = "skipped"  # existing file matches remote size
+INVALID = "invalid"  # server responded with an error status
+FAILED = "failed"
+
+
+class RunSummary:
+    """
+    Counts download decisions of the items for the end of run report.
+    Only sources of the items listed in the report are kept, not the items.
+    """
+    # Decisions listed item by item in the report
+    REPORTED_ITEMS = (REFETCHED, INVALID, FAILED)
+
+    def __init__(self):
+        self._counts = Counter()
+        self._reported = []  # (status, source, error message)
+        self._lock = threading.Lock()
+
+    def record(self, item, status: str, error: Exception = None):
+        logging.debug(f"[{status.upper()}] {item}" + (f" {error!r}" if error else ""))
+        with self._lock:
+            self._counts[status] += 1
+            if status in self.REPORTED_ITEMS:
+                # Message only, the error's traceback holds frames of the download
+                self._reported.append((status, item.source, str(error) if error else None))
+
+    def counts(self) -> Counter:
+        with self._lock:
+            return Counter(self._counts)
+
+    def sources(self, status: str) -> list:
+        """(source, error message) of the items with one of REPORTED_ITEMS statuses."""
+        with self._lock:
+            return [(source, error) for s, source, error in self._reported if s == status]
+
+    def report(self):
+        counts = self.counts()
+        if not counts:
+            return
+
+        print(f"\nProcessed {sum(counts.values())} items:")
+        for status, count in counts.most_common():
+            print(f"  {status:<12}{count}")
+
+        for status in self.REPORTED_ITEMS:
+            for source, error in self.sources(status):
+                print(f"[{status.upper()}] {source}" + (f": {error}" if error else ""))
@@ -0,0 +1,169 @@
+from exceptions import StalledTransferError
+from contextlib import contextmanager
+import threading
+import logging
+import socket
+import time
+
+
+def abort_response(response):
+    """Shuts down the socket of a streamed response, unblocking a pending read."""
+    connection = getattr(response.raw, "_connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class TransferMonitor:
+    """
+    Throughput of a single transfer measured in windows of 'window' seconds,
+    the transfer is stalled once a window ends below 'min_speed' bytes per second.
+    Time spent waiting for the bandwidth limit ('sleep') isn't counted in the window,
+    so transfers throttled below 'min_speed' aren't taken as stalled.
+    """
+    def __init__(self, min_speed: float, window: float, name: str = "", on_stall=None):
+        self.min_speed = min_speed
+        self.window = window
+        self.name = name
+        self.on_stall = on_stall
+        self.received = 0
+        self.stalled = False
+        self._watchdog = None
+        self._window_start = time.monotonic()
+        self._window_received = 0
+        self._paused = 0.0  # seconds waited for the bandwidth limit in total
+        self._pause_start = None
+        self._window_paused = 0.0
+
+    def update(self, size: int):
+        self.received += size
+
+    @contextmanager
+    def paused(self):
+        """Time spent within the block, waiting for the bandwidth limit, is left out of the stall window."""
+        self._pause_start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._paused += time.monotonic() - self._pause_start
+            self._pause_start = None
+
+    def sleep(self, seconds: float):
+        """Waits for the bandwidth limit, the time is left out of the stall window."""
+        with self.paused():
+            time.sleep(seconds)
+
+    def _paused_until(self, now: float) -> float:
+        # Start read first, a pause ending in between is counted twice rather than not at all
+        pause_start = self._pause_start
+        paused = self._paused
+        return paused + (now - pause_start if pause_start is not None else 0.0)
+
+    def check(self) -> bool:
+        """Returns True if the transfer stalled, calls 'on_stall' the first time."""
+        if self.stalled or not self.min_speed:
+            return self.stalled
+
+        now = time.monotonic()
+        paused = self._paused_until(now)
+        elapsed = now - self._window_start - (paused - self._window_paused)
+        if elapsed < self.window:
+            return False
+
+        speed = (self.received - self._window_received) / elapsed
+        if speed >= self.min_speed:
+            self._window_start = now
+            self._window_received = self.received
+            self._window_paused = paused
+            return False
+
+        self.stalled = True
+        logging.debug(f"Transfer stalled at {speed:.0f} B/s for {elapsed:.0f}s: {self.name}")
+        if self.on_stall:
+            self.on_stall()
+        return True
+
+    def error(self) -> StalledTransferError:
+        return StalledTransferError(
+            f"Slower than {self.min_speed / 1024:.1f} KB/s for {self.window:.0f}s "
+            f"after {self.received} bytes: {self.name}"
+        )
+
+    def __enter__(self):
+        if self._watchdog:
+            self._watchdog.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._watchdog:
+            self._watchdog.remove(self)
+
+
+class StallWatchdog:
+    """
+    Background thread aborting transfers slower than 'min_speed' bytes per second
+    for 'window' seconds. Aborted transfer raises StalledTransferError,
+    so the item is retried and resumes on a new connection.
+    """
+    INTERVAL = 1.0
+    MIN_READ_SIZE = 4 * 1024
+
+    def __init__(self, min_speed: float = 0, window: float = 60.0):
+        self.min_speed = min_speed
+        self.window = window
+        self.stalled = 0
+        self._monitors = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.min_speed)
+
+    def chunk_size(self, default: int) -> int:
+        """
+        Size of reads, small enough to complete at least twice per window
+        at the minimum speed, as progress is only seen once a read returns.
+        """
+        if not self.enabled:
+            return default
+        return min(default, max(self.MIN_READ_SIZE, int(self.min_speed * self.window / 2)))
+
+    def monitor(self, response, name: str = "") -> TransferMonitor:
+        """Monitor of the streamed response, watched within its 'with' block."""
+        monitor = TransferMonitor(
+            self.min_speed, self.window, name,
+            on_stall=(lambda: abort_response(response)) if response is not None else None
+        )
+        if self.enabled:
+            monitor._watchdog = self
+        return monitor
+
+    def add(self, monitor: TransferMonitor):
+        with self._lock:
+            self._monitors.add(monitor)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def remove(self, monitor: TransferMonitor):
+        with self._lock:
+            self._monitors.discard(monitor)
+            if monitor.stalled:
+                self.stalled += 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.INTERVAL)
+            with self._lock:
+                monitors = list(self._monitors)
+            for monitor in monitors:
+                monitor.check()
+
+    def report(self):
+        if self.stalled:
+            print(f"Aborted {self.stalled} stalled transfers.")
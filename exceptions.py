@@ -20,3 +20,32 @@ class ContentTypeError(ScraperError):
 class ParsingError(ScraperError):
     """Raised if error during scraped data parsing."""
     pass
+
+
+class DownloadError(Exception):
+    pass
+
+
+class MissingAlbumNameError(DownloadError):
+    """Raised if there's neither an output directory name nor an album title for the item."""
+    pass
+
+
+class IncompleteDownloadError(DownloadError):
+    """Raised if received file doesn't match the size announced by the server."""
+    pass
+
+
+class RangeNotSupportedError(DownloadError):
+    """Raised if server doesn't honor requested byte range."""
+    pass
+
+
+class InsufficientDiskSpaceError(DownloadError):
+    """Raised if there isn't enough free disk space for the file."""
+    pass
+
+
+class StalledTransferError(DownloadError):
+    """Raised if transfer was aborted for staying below the minimum speed."""
+    pass
@@ -0,0 +1,470 @@
+import requests
+from pathlib import Path
+from downloader.downloader import Downloader
+from downloader.pool import DownloadPool, DownloadResult
+from downloader.summary import RunSummary, FAILED
+from downloader.store import ContentStore
+from downloader.hosts import load_host_policies, mount_host_adapters
+from downloader.ratelimit import HostRateLimiter
+from downloader.bandwidth import BandwidthLimiter
+from downloader.watchdog import StallWatchdog
+from downloader.scheduler import DownloadScheduler, SizeProber
+from downloader.journal import DownloadJournal, ScrapeRecorder, SCRAPED
+from downloader.pipeline import Pipeline, PoolStage, Stage
+from downloader.progress import ProgressView
+from downloader.metrics import Metrics
+from utils import load_file, roundrobin
+from downloader.downloader import Item
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+from contextlib import nullcontext
+from profiling import Profiler
+import logging
+from scrapers import get_scraper_index, get_link_scanner
+
+# logging.debug('This message should go to the log file')
+# logging.info('So should this')
+# logging.warning('And this, too')
+# logging.error('And non-ASCII stuff, too, like Øresund and Malmö')
+
+
+class LoLs:
+    def __init__(self,
+                 link: str = None,
+                 load_from_file: str = None,
+                 **kwargs
+                 ):
+        self.input_link = link
+        self.load_from_file = load_from_file
+        self.session = requests.Session()
+        self.host_policies = load_host_policies()
+        self.host_adapter = mount_host_adapters(
+            self.session, self.host_policies,
+            host_workers=kwargs.get("host_workers", 4),
+            segments=kwargs.get("segments", 1),
+            # Resolve and probe workers send their requests through the same pools as downloads
+            scrape_workers=kwargs.get("resolve_workers", 4)
+            + (kwargs.get("probe_workers", 8) if kwargs.get("probe_sizes") else 0)
+        )
+        self.rate_limiter = HostRateLimiter(max_rate=kwargs.get("max_request_rate", 20.0))
+        self.bandwidth = BandwidthLimiter(
+            rate=(kwargs.get("limit_rate") or 0) * 1024,
+            host_rate=(kwargs.get("host_limit_rate") or 0) * 1024
+        )
+        self.watchdog = StallWatchdog(
+            min_speed=kwargs.get("min_speed", 1) * 1024,
+            window=kwargs.get("stall_time", 60)
+        )
+        self.downloader = Downloader(
+            self.session,
+            segments=kwargs.get("segments", 1),
+            segment_threshold=kwargs.get("segment_threshold", 50) * 1024 * 1024,
+            skip_existing=kwargs.get("skip_existing", False),
+            rate_limiter=self.rate_limiter,
+            bandwidth=self.bandwidth,
+            chunk_size=kwargs.get("chunk_size", 64) * 1024,
+            fsync_policy=kwargs.get("fsync", "never"),
+            min_free_space=kwargs.get("min_free_space", 100) * 1024 * 1024,
+            host_policies=self.host_policies,
+            connect_timeout=kwargs.get("connect_timeout"),
+            read_timeout=kwargs.get("read_timeout"),
+            watchdog=self.watchdog
+        )
+        large_threshold = kwargs.get("large_threshold")
+        self.scheduler = DownloadScheduler(
+            policy=kwargs.get("order", "scrape"),
+            prober=SizeProber(self.downloader, workers=kwargs.get("probe_workers", 8))
+            if kwargs.get("probe_sizes") else None,
+            large_threshold=large_threshold * 1024 * 1024 if large_threshold else None
+        )
+        self.store = None
+        if kwargs.get("dedupe"):
+            self.store = ContentStore(
+                root=self.downloader.output_path / ContentStore.DIR_NAME,
+                link_mode=kwargs["dedupe"]
+            )
+            self.downloader.store = self.store
+        self.journal = None
+        if kwargs.get("journal", True):
+            self.downloader.output_path.mkdir(parents=True, exist_ok=True)
+            self.journal = DownloadJournal(self.downloader.output_path / DownloadJournal.FILE_NAME)
+        self.metrics = Metrics(
+            path=kwargs.get("metrics_file"),
+            fmt=kwargs.get("metrics_format"),
+            interval=kwargs.get("metrics_interval", 15)
+        )
+        self.downloader.metrics = self.metrics
+        self.profiler = None
+        if kwargs.get("profile"):
+            self.profiler = Profiler(
+                output_dir=kwargs["profile"],
+                top=kwargs.get("profile_top", 20),
+                memory=kwargs.get("profile_memory", False)
+            )
+        self.summary = RunSummary()
+        self.pipeline = None
+        self.options = kwargs
+
+    def main(self):
+        if self.input_link:
+            urls = [self.input_link]
+        elif self.load_from_file:
+            urls = load_file(self.load_from_file)
+        else:
+            urls = []
+
+        with self.metrics, self.profiler or nullcontext():
+            # Scrapers of all urls are set up first, so items of different hosts are downloaded together
+            batch = []
+            with self.phase("scrape"):
+                scrapers = get_scraper_index().classify(urls)
+                for url, scraper_ in zip(urls, scrapers):
+                    scraped = self.scrape(url, scraper_)
+                    if scraped:
+                        batch.append(scraped)
+            # Items are extracted lazily, the extractors' time is in the spans of this phase
+            with self.phase("download"):
+                self.download_batch(batch)
+
+        self.summary.report()
+        self.metrics.report()
+        if self.profiler:
+            self.profiler.report()
+        if self.pipeline:
+            self.pipeline.report()
+        self.rate_limiter.report()
+        self.bandwidth.report()
+        self.watchdog.report()
+        if self.store:
+            self.store.report()
+
+    def phase(self, name: str):
+        """Profiled phase of the run with --profile."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def scrape(self, url, scraper_=None) -> Union[Tuple[str, Iterable[Iterable[Item]], str], None]:
+        """
+        Sets up scraping of a single link, returns (url, item sources, output directory name).
+        Every source is an iterable of items, extracted lazily as they are consumed.
+        The scraper is looked up in the scraper index unless given.
+        """
+        if self.journal and self.journal.source_status(url) == SCRAPED:
+            # Interrupted run, items are known already
+            items, dir_name = self.journal.remaining_items(url)
+            print(f"Resuming {len(items)} remaining items of: {url}")
+            return url, [items], dir_name
+
+        if scraper_ is None:
+            scraper_ = get_scraper_index().scraper_for(url)
+        if scraper_ is None:
+            return None
+
+        print(f"Chosen scraper: {scraper_.DESC}")
+        if scraper_.SCRAPER_TYPE == "EXTRACTOR":
+            sources, dir_name = self.extractor_method(url, scraper_)
+        elif scraper_.SCRAPER_TYPE == "CRAWLER":
+            sources, dir_name = self.crawler_method(url, scraper_)
+        else:
+            return None
+        return url, sources, dir_name
+
+    def extractor_method(self, url, extractor) -> Tuple[List[Iterator[Item]], str]:
+        e = extractor(self.downloader)
+        # Asked before extracting, so items can be downloaded as soon as they are extracted.
+        # Without a name the items are stored by their album titles, items without one fail.
+        output_dir_name = input("Enter name for output directory (empty for album titles): ")
+
+        return [e.iter_items(url)], output_dir_name
+
+    def crawler_method(self, url, crawler, scrape_extracted_links: bool = True) -> Tuple[Iterator[Iterator[Item]], str]:
+        c = crawler(self.downloader)
+
+        with self.phase("crawl"):
+            crawled_html = c.extract_data(url)
+
+        model_name = c.MODEL_NAME
+        sources = self.crawled_sources(crawled_html) if scrape_extracted_links else iter(())
+        return sources, model_name
+
+    def crawled_sources(self, crawled_html: Dict[str, str]) -> Iterator[Iterator[Item]]:
+        """Items of every link found on crawled pages, each link is a source resolved by its extractor."""
+        scanner = get_link_scanner()
+        found = {}
+        for page_url, html in crawled_html.items():
+            for scraper_, scraper_output in scanner.scan(html).items():
+                found.setdefault(scraper_, []).extend(scraper_output)
+
+        for entry in scanner.entries:
+            if not entry.loaded:
+                # No links of the extractor on the pages, it wasn't imported
+                continue
+            scraper_ = entry.load()
+            links = found.get(scraper_)
+            if links:
+                logging.debug(f"{scraper_.__name__} extracted {len(links)} urls."
+                              f"DATA: {links}")
+
+                s = scraper_(self.downloader)
+                for link_ in links:
+                    yield s.iter_items(link_)
+
+    def accepted_items(self, recorder: ScrapeRecorder, source: Iterable[Item]) -> Iterator[Item]:
+        """
+        Items of the source to download, see ScrapeRecorder.
+        Failure of the scraper ends only this source, the url is scraped again in the next run.
+        """
+        try:
+            for item in source:
+                if recorder.accept(item):
+                    yield item
+        except Exception as e:
+            recorder.failed = True
+            logging.exception(f"Failed to scrape {recorder.url}")
+            print(f"Failed to scrape {recorder.url}: {e}")
+
+    def finish_scrape(self, recorder: ScrapeRecorder):
+        recorder.close()
+        if recorder.skipped:
+            print(f"Skipping {recorder.skipped} items downloaded in previous runs: {recorder.url}")
+
+    def pending_items(self, url: str, sources: Iterable[Iterable[Item]], dir_name: str) -> Iterator[Item]:
+        """Items of the url which weren't downloaded in previous runs, yielded as they are scraped."""
+        recorder = ScrapeRecorder(self.journal, url, dir_name)
+        for source in sources:
+            yield from self.accepted_items(recorder, source)
+        self.finish_scrape(recorder)
+
+    def download_batch(self, batch: List[Tuple[str, Iterable[Iterable[Item]], str]]):
+        """
+        Downloads items of all (url, item sources, output directory name) scraped urls together,
+        skipping the ones done according to journal.
+
+        Items are downloaded while they are being scraped, the urls are scraped in turns.
+        With more workers the sources are resolved, probed, downloaded and recorded
+        by the stages of a pipeline. Ordering by size and the async engine need all items first.
+        """
+        progress = ProgressView(mode=self.options.get("progress", "auto"))
+        self.downloader.progress = progress
+        destinations = {}  # id(item): (dir_name, url) until the item's download starts
+
+        def destined(items: Iterable[Item], dir_name: str, url: str) -> Iterator[Item]:
+            for item in items:
+                destinations[id(item)] = (dir_name, url)
+                progress.items_added(1)
+                yield item
+
+        engine = self.options.get("engine")
+        workers = self.options.get("workers", 1)
+        pipelined = engine != "async" and workers > 1 and not self.scheduler.needs_order
+        if pipelined:
+            queued = None
+        elif engine == "async" or self.scheduler.needs_order:
+            queued = []
+            for url, sources, dir_name in batch:
+                items = self.scheduler.probe(list(self.pending_items(url, sources, dir_name)))
+                queued.extend(destined(items, dir_name, url))
+            queued = self.scheduler.order(queued)
+        else:
+            queued = roundrobin(*(
+                destined(self.pending_items(url, sources, dir_name), dir_name, url)
+                for url, sources, dir_name in batch
+            ))
+
+        with progress:
+            if pipelined:
+                self.download_pipeline(batch=batch, progress=progress)
+            elif engine == "async":
+                self.download_async(items=queued, destinations=destinations, progress=progress)
+            elif workers > 1:
+                self.download_concurrent(items=queued, destinations=destinations)
+            else:
+                self.download_sequential(items=queued, destinations=destinations)
+
+        if self.journal:
+            for url, _, _ in batch:
+                if url:
+                    self.journal.finish_source(url)
+
+    def download_item(self, item: Item, dir_name: str, url: str = None) -> str:
+        """Downloads the item, recording the progress in journal."""
+        try:
+            status = self.fetch_item(item, dir_name, url)
+        except Exception as e:
+            self.finish_item(item, dir_name, url, FAILED, error=e)
+            raise
+
+        self.finish_item(item, dir_name, url, status)
+        return status
+
+    def fetch_item(self, item: Item, dir_name: str, url: str = None) -> str:
+        """Downloads the item, marked started in journal, its decision is recorded by 'finish_item'."""
+        if self.journal and url:
+            self.journal.start(url, item)
+
+        try:
+            status = self.downloader.download_item(
+                item=item,
+                separate_content=self.options["separate"],
+                save_urls=self.options["save_urls"],
+                album_name=dir_name
+            )
+        except Exception:
+            self.downloader.progress.item_finished(item, FAILED)
+            raise
+
+        self.downloader.progress.item_finished(item, status)
+        return status
+
+    def finish_item(self, item: Item, dir_name: str, url: str, status: str, error: Exception = None):
+        if self.journal and url:
+            target = self.target_path(item, dir_name) if error is None else None
+            self.journal.finish(url, item, status, target=target, error=error)
+
+    def target_path(self, item: Item, dir_name: str) -> Union[Path, None]:
+        if not (dir_name or item.album_title):
+            return None
+        return self.downloader.file_path(
+            item=item,
+            album_path=self.downloader.album_path(item, dir_name),
+            separate_content=self.options["separate"],
+            create=False
+        )
+
+    def download_sequential(self, items: Iterable[Item], destinations: Dict[int, Tuple[str, str]]):
+        for item in items:
+            try:
+                status = self.download_item(item, *destinations.pop(id(item)))
+            except Exception as e:
+                logging.exception(f"Failed to download {item}")
+                self.summary.record(item, FAILED, e)
+            else:
+                self.summary.record(item, status)
+
+    def download_pool(self) -> DownloadPool:
+        return DownloadPool(
+            workers=self.options["workers"],
+            host_workers=self.options["host_workers"],
+            host_policies=self.host_policies,
+            large_workers=self.options.get("large_workers", 0)
+        )
+
+    def download_concurrent(self, items: List[Item], destinations: Dict[int, Tuple[str, str]]):
+        def fetch(item):
+            return self.download_item(item, *destinations.pop(id(item)))
+
+        def record(result: DownloadResult):
+            self.summary.record(result.item, result.status, result.error)
+
+        items, large = self.scheduler.split(items)
+        # Only the summary needs the results, they aren't collected
+        self.download_pool().run(items=items, fetch=fetch, large_items=large, on_result=record, collect=False)
+
+    def download_pipeline(self, batch: List[Tuple[str, Iterable[Iterable[Item]], str]], progress: ProgressView):
+        """
+        Runs the stages of the batch concurrently: link resolution by the extractors,
+        HEAD probe of missing sizes (for --large-threshold), download on the pool
+        and recording of the results.
+        """
+        destinations = {}  # id(item): (dir_name, url) until the item's result is recorded
+        recorders = [ScrapeRecorder(self.journal, url, dir_name) for url, _, dir_name in batch]
+        capacity = self.options.get("stage_queue", 100)
+
+        def resolve(task: Tuple[ScrapeRecorder, Iterable[Item]]) -> Iterator[Item]:
+            recorder, source = task
+            for item in self.accepted_items(recorder, source):
+                destinations[id(item)] = (recorder.dir_name, recorder.url)
+                progress.items_added(1)
+                yield item
+
+        def probe(item: Item) -> Item:
+            probed = self.scheduler.prober.probe_item(item)
+            if probed is not item:
+                destinations[id(probed)] = destinations.pop(id(item))
+            return probed
+
+        def fetch(item: Item) -> str:
+            return self.fetch_item(item, *destinations[id(item)])
+
+        def post_process(result: DownloadResult):
+            dir_name, url = destinations.pop(id(result.item))
+            self.finish_item(result.item, dir_name, url, result.status, result.error)
+            self.summary.record(result.item, result.status, result.error)
+
+        def tasks(recorder: ScrapeRecorder, sources: Iterable[Iterable[Item]]):
+            for source in sources:
+                yield recorder, source
+
+        stages = [Stage("resolve", resolve, workers=self.options.get("resolve_workers", 4),
+                        capacity=capacity, expand=True)]
+        if self.scheduler.needs_sizes and self.scheduler.prober:
+            stages.append(Stage("probe", probe, workers=self.scheduler.prober.workers, capacity=capacity))
+        stages.append(PoolStage("download", self.download_pool(), fetch, capacity=capacity,
+                                is_large=self.scheduler.is_large if self.scheduler.large_threshold else None))
+        stages.append(Stage("post-process", post_process, workers=self.options.get("post_workers", 1),
+                            capacity=capacity))
+        self.pipeline = Pipeline(stages)
+
+        try:
+            self.pipeline.run(roundrobin(*(
+                tasks(recorder, sources) for recorder, (_, sources, _) in zip(recorders, batch)
+            )))
+        except BaseException:
+            # Scraping may be incomplete, the urls are scraped again in the next run
+            for recorder in recorders:
+                recorder.failed = True
+            raise
+        finally:
+            for recorder in recorders:
+                self.finish_scrape(recorder)
+
+    def download_async(self,
+                       items: List[Item],
+                       destinations: Dict[int, Tuple[str, str]],
+                       progress: ProgressView = None
+                       ):
+        # Imported here, so aiohttp is only required for the async engine
+        from downloader.async_downloader import AsyncDownloader
+
+        async_downloader = AsyncDownloader(
+            session=self.session,
+            workers=self.options["workers"],
+            host_workers=self.options["host_workers"],
+            host_policies=self.host_policies,
+            skip_existing=self.options.get("skip_existing", False),
+            rate_limiter=self.rate_limiter,
+            bandwidth=self.bandwidth,
+            connect_timeout=self.options.get("connect_timeout"),
+            read_timeout=self.options.get("read_timeout"),
+            watchdog=self.watchdog,
+            chunk_size=self.downloader.chunk_size,
+            fsync_policy=self.downloader.fsync_policy,
+            min_free_space=self.downloader.min_free_space
+        )
+        if progress:
+            async_downloader.progress = progress
+        async_downloader.metrics = self.metrics
+
+        def on_result(result: DownloadResult):
+            dir_name, url = destinations.pop(id(result.item))
+            self.finish_item(result.item, dir_name, url, result.status, result.error)
+            self.summary.record(result.item, result.status, result.error)
+
+        async_downloader.run(
+            items=items,
+            separate_content=self.options["separate"],
+            save_urls=self.options["save_urls"],
+            album_name_of=lambda item: destinations[id(item)][0],
+            on_result=on_result,
+            collect=False
+        )
+
+    def list_failed(self):
+        """Prints failed items from journal, in batch file format."""
+        failed = {}
+        for url, source, target, error in self.journal.failed_items():
+            failed.setdefault(url, []).append((source, error))
+
+        for url, items in failed.items():
+            print(f"# {len(items)} failed items")
+            for source, error in items:
+                print(f"#   {source}: {error}")
+            print(url)
@@ -1,111 +1,35 @@
-import requests
 from options import parser
+from scrapers import list_scrapers
 from pathlib import Path
-from downloader.downloader import Downloader
-from utils import load_file, cls
-from downloader.downloader import Item
-from typing import List
 import logging
-from scrapers import get_scraper_classes
-
-# logging.debug('This message should go to the log file')
-# logging.info('So should this')
-# logging.warning('And this, too')
-# logging.error('And non-ASCII stuff, too, like Øresund and Malmö')
-
-
-class LoLs:
-    def __init__(self,
-                 link: str = None,
-                 load_from_file: str = None,
-                 **kwargs
-                 ):
-        self.input_link = link
-        self.load_from_file = load_from_file
-        self.session = requests.Session()
-        self.downloader = Downloader(self.session)
-        self.options = kwargs
-
-    def main(self):
-        if self.input_link:
-            self.scrape(self.input_link)
-        elif self.load_from_file:
-            urls = load_file(self.load_from_file)
-            for url in urls:
-                self.scrape(url)
-
-    def scrape(self, url):
-        """Function that scraper a single link."""
-        for scraper_ in get_scraper_classes():
-            if scraper_.is_suitable(url):
-                print(f"Chosen scraper: {scraper_.DESC}")
-                if scraper_.SCRAPER_TYPE == "EXTRACTOR":
-                    self.extractor_method(url, scraper_)
-                elif scraper_.SCRAPER_TYPE == "CRAWLER":
-                    self.crawler_method(url, scraper_)
-                return
-
-    def extractor_method(self, url, extractor):
-        e = extractor(self.downloader)
-        data = e.extract_data(url)
-        output_dir_name = input("Enter name for output directory: ")
-
-        self.download(items=data, dir_name=output_dir_name)
-
-    def crawler_method(self, url, crawler, scrape_extracted_links: bool = True):
-        c = crawler(self.downloader)
-
-        crawled_html = c.extract_data(url)
-
-        model_name = c.MODEL_NAME
-        data = []
-
-        for scraper_ in get_scraper_classes():
-            if scraper_.SCRAPER_TYPE == "EXTRACTOR":
-                links = []
-                for url, html in crawled_html.items():
-                    scraper_output = scraper_._extract_from_html(html)
-                    if scraper_output:
-                        links.extend(scraper_output)
-                if links:
-                    logging.debug(f"{scraper_.__name__} extracted {len(links)} urls."
-                                  f"DATA: {links}")
-
-                    if scrape_extracted_links:
-                        s = scraper_(self.downloader)
-                        for link_ in links:
-                            data.extend(s.extract_data(link_))
-
-        logging.debug(f"Scraped total of {len(data)} items.")
-        self.download(items=data, dir_name=model_name)
-
-    def download(self, items: List[Item], dir_name: str):
-        step = 1
-        for item in items:
-            # Clear console
-            cls()
-            print(f"Item no. {step}/{len(items)}")
-
-            self.downloader.download_item(
-                item=item,
-                separate_content=self.options["separate"],
-                save_urls=self.options["save_urls"],
-                album_name=dir_name
-            )
-            step += 1
 
 
 if __name__ == '__main__':
 
     args = parser.parse_args()
+    if args.list_scrapers:
+        list_scrapers()
+        raise SystemExit
 
     input_url = args.url
     batchfile = Path(args.batchfile) if args.batchfile else None
     separate_content = False if args.separate else True
     save_urls = args.save_urls
 
-    if not (input_url or batchfile):
+    if not (input_url or batchfile or args.list_failed):
         raise Exception("You need to provide some URL!")
+    if args.list_failed and not args.journal:
+        parser.error("--list-failed reads the journal, it can't be used with --no-journal")
+    if args.engine == "async":
+        # Only the threads engine has a content store, segmented downloads and worker lanes
+        unsupported = [option for option, used in (("--dedupe", args.dedupe),
+                                                   ("--segments", args.segments > 1),
+                                                   ("--large-workers", args.large_workers > 0)) if used]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} can't be used with --engine async")
+
+    # Imported once the arguments are checked, listing the scrapers doesn't need requests and the downloader
+    from lols import LoLs
 
     logging.basicConfig(
         filename='lols.log',
@@ -119,6 +43,42 @@ if __name__ == '__main__':
         link=input_url,
         load_from_file=batchfile,
         separate=separate_content,
-        save_urls=save_urls
+        save_urls=save_urls,
+        workers=args.workers,
+        host_workers=args.host_workers,
+        engine=args.engine,
+        segments=args.segments,
+        segment_threshold=args.segment_threshold,
+        skip_existing=args.skip_existing,
+        dedupe=args.dedupe,
+        max_request_rate=args.max_request_rate,
+        journal=args.journal,
+        progress=args.progress,
+        limit_rate=args.limit_rate,
+        host_limit_rate=args.host_limit_rate,
+        chunk_size=args.chunk_size,
+        fsync=args.fsync,
+        min_free_space=args.min_free_space,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        min_speed=args.min_speed,
+        stall_time=args.stall_time,
+        order=args.order,
+        probe_sizes=args.probe_sizes,
+        large_workers=args.large_workers,
+        resolve_workers=args.resolve_workers,
+        probe_workers=args.probe_workers,
+        post_workers=args.post_workers,
+        stage_queue=args.stage_queue,
+        metrics_file=args.metrics_file,
+        metrics_format=args.metrics_format,
+        metrics_interval=args.metrics_interval,
+        profile=args.profile,
+        profile_memory=args.profile_memory,
+        profile_top=args.profile_top,
+        large_threshold=args.large_threshold
     )
-    lols.main()
+    if args.list_failed:
+        lols.list_failed()
+    else:
+        lols.main()
@@ -26,4 +26,244 @@ parser.add_argument(
     action="store_true",
     help="Provided the flag, all direct urls for content will be saved into txt"
          "file in the output folder. (default=False)"
-)
\ No newline at end of file
+)
+parser.add_argument(
+    '-w', '--workers',
+    dest='workers', metavar='N',
+    type=int, default=1,
+    help="Number of items downloaded concurrently. (default=1)"
+)
+parser.add_argument(
+    '--host-workers',
+    dest='host_workers', metavar='N',
+    type=int, default=4,
+    help="Maximum number of concurrent downloads from a single host "
+         "without a limit in its host policy. (default=4)"
+)
+parser.add_argument(
+    '--engine',
+    dest='engine',
+    choices=["threads", "async"], default="threads",
+    help="Download engine. 'async' runs all transfers on a single asyncio "
+         "event loop, suited for batches of many small files, "
+         "use it with high --workers value. It doesn't support --dedupe, --segments "
+         "and --large-workers. (default=threads)"
+)
+parser.add_argument(
+    '--segments',
+    dest='segments', metavar='N',
+    type=int, default=1,
+    help="Download large files over N parallel connections, "
+         "each fetching its own byte range. (default=1)"
+)
+parser.add_argument(
+    '--segment-threshold',
+    dest='segment_threshold', metavar='MB',
+    type=int, default=50,
+    help="Minimum file size in MB to be downloaded in segments. (default=50)"
+)
+parser.add_argument(
+    '--skip-existing',
+    dest='skip_existing',
+    action="store_true",
+    help="Provided the flag, existing files matching the size of the remote file "
+         "are skipped and truncated ones are resumed. (default=False)"
+)
+parser.add_argument(
+    '--dedupe',
+    dest='dedupe', nargs='?',
+    choices=["hardlink", "reflink"], const="hardlink", default=None,
+    help="Provided the flag, downloaded files are kept in a content addressed store "
+         "in the output folder and duplicate files are linked to the stored copy "
+         "instead of being saved again. (default=off, mode=hardlink)"
+)
+parser.add_argument(
+    '--max-request-rate',
+    dest='max_request_rate', metavar='N',
+    type=float, default=20.0,
+    help="Maximum number of requests per second sent to a single host. "
+         "The rate is lowered automatically for hosts responding "
+         "with 429 Too Many Requests. (default=20)"
+)
+parser.add_argument(
+    '--no-journal',
+    dest='journal',
+    action="store_false",
+    help="Provided the flag, downloads aren't recorded in the journal in the output folder. "
+         "Without journal, interrupted runs can't be resumed without scraping again "
+         "and items downloaded before aren't skipped."
+)
+parser.add_argument(
+    '--list-failed',
+    dest='list_failed',
+    action="store_true",
+    help="List urls with failed items from the journal and exit. "
+         "The output can be used as a batch file to retry them."
+)
+parser.add_argument(
+    '--list-scrapers',
+    dest='list_scrapers',
+    action="store_true",
+    help="List the supported sites and exit. The scrapers aren't imported for the list."
+)
+parser.add_argument(
+    '--progress',
+    dest='progress',
+    choices=["auto", "live", "plain"], default="auto",
+    help="Progress display. 'live' redraws overall progress and active transfers in place, "
+         "'plain' prints a summary line every few seconds, suited for logs of cron jobs and CI. "
+         "'auto' picks 'live' when running in a terminal. (default=auto)"
+)
+parser.add_argument(
+    '--limit-rate',
+    dest='limit_rate', metavar='KB',
+    type=float, default=None,
+    help="Maximum download speed of all transfers together in KB/s, "
+         "shared evenly by concurrent transfers. "
+         "Can be changed while running in 'config/bandwidth.json'. (default=unlimited)"
+)
+parser.add_argument(
+    '--host-limit-rate',
+    dest='host_limit_rate', metavar='KB',
+    type=float, default=None,
+    help="Maximum download speed from a single host in KB/s. (default=unlimited)"
+)
+parser.add_argument(
+    '--chunk-size',
+    dest='chunk_size', metavar='KB',
+    type=int, default=64,
+    help="Size of the buffer downloaded data is read into in KB. (default=64)"
+)
+parser.add_argument(
+    '--fsync',
+    dest='fsync',
+    choices=["never", "close", "periodic"], default="never",
+    help="When downloaded files are flushed to disk. 'close' once the file is complete, "
+         "'periodic' also every 16 MB while downloading. (default=never, left to the OS)"
+)
+parser.add_argument(
+    '--min-free-space',
+    dest='min_free_space', metavar='MB',
+    type=int, default=100,
+    help="Disk space in MB which has to stay free, files which wouldn't fit "
+         "aren't started. (default=100)"
+)
+parser.add_argument(
+    '--connect-timeout',
+    dest='connect_timeout', metavar='SECONDS',
+    type=float, default=None,
+    help="Timeout for connecting to a host, overrides host policies. (default=10)"
+)
+parser.add_argument(
+    '--read-timeout',
+    dest='read_timeout', metavar='SECONDS',
+    type=float, default=None,
+    help="Timeout for receiving data from a host, overrides host policies. (default=60)"
+)
+parser.add_argument(
+    '--min-speed',
+    dest='min_speed', metavar='KB',
+    type=float, default=1,
+    help="Transfers slower than this speed in KB/s for --stall-time seconds "
+         "are aborted and retried on a new connection, 0 disables it. (default=1)"
+)
+parser.add_argument(
+    '--stall-time',
+    dest='stall_time', metavar='SECONDS',
+    type=float, default=60,
+    help="Time a transfer can stay below --min-speed. (default=60)"
+)
+parser.add_argument(
+    '--order',
+    dest='order',
+    choices=["scrape", "smallest", "largest", "interleave"], default="scrape",
+    help="Order of downloads by file size. 'interleave' alternates the smallest "
+         "and the largest files. Items of unknown size go last. (default=scrape)"
+)
+parser.add_argument(
+    '--probe-sizes',
+    dest='probe_sizes',
+    action="store_true",
+    help="Provided the flag, sizes the hosts didn't provide are requested "
+         "with HEAD requests before downloading, for --order and --large-workers. (default=False)"
+)
+parser.add_argument(
+    '--large-workers',
+    dest='large_workers', metavar='N',
+    type=int, default=0,
+    help="Number of workers dedicated to files larger than --large-threshold, "
+         "other workers take them only when no smaller file is left. "
+         "Requires --workers greater than N. (default=0)"
+)
+parser.add_argument(
+    '--large-threshold',
+    dest='large_threshold', metavar='MB',
+    type=int, default=None,
+    help="Size in MB of files downloaded by --large-workers. (default=off)"
+)
+parser.add_argument(
+    '--resolve-workers',
+    dest='resolve_workers', metavar='N',
+    type=int, default=4,
+    help="Number of links resolved by their scrapers at once while downloading "
+         "with more --workers. (default=4)"
+)
+parser.add_argument(
+    '--probe-workers',
+    dest='probe_workers', metavar='N',
+    type=int, default=8,
+    help="Number of concurrent HEAD requests of --probe-sizes. (default=8)"
+)
+parser.add_argument(
+    '--post-workers',
+    dest='post_workers', metavar='N',
+    type=int, default=1,
+    help="Number of workers recording results of finished downloads. (default=1)"
+)
+parser.add_argument(
+    '--stage-queue',
+    dest='stage_queue', metavar='N',
+    type=int, default=100,
+    help="Number of items waiting between the stages of the download pipeline, "
+         "a full queue holds back the stage before it. (default=100)"
+)
+parser.add_argument(
+    '--metrics-file',
+    dest='metrics_file', metavar='PATH',
+    type=str, default=None,
+    help="Per-host and per-scraper request, download and latency metrics are rewritten "
+         "to this file every --metrics-interval seconds. (default=off)"
+)
+parser.add_argument(
+    '--metrics-format',
+    dest='metrics_format',
+    choices=["json", "prometheus"], default=None,
+    help="Format of --metrics-file, Prometheus text format for '.prom' and '.txt' files, "
+         "JSON otherwise. (default=by extension)"
+)
+parser.add_argument(
+    '--metrics-interval',
+    dest='metrics_interval', metavar='SECONDS',
+    type=float, default=15,
+    help="Seconds between rewrites of --metrics-file. (default=15)"
+)
+parser.add_argument(
+    '--profile',
+    dest='profile', metavar='DIR',
+    nargs='?', const='profile', default=None,
+    help="Profiles scrape, crawl and download phases with cProfile, writes a profile "
+         "of every phase and timings of every scraper to DIR and prints the top functions. "
+         "(default=off, DIR=profile)"
+)
+parser.add_argument(
+    '--profile-memory',
+    dest='profile_memory',
+    action="store_true",
+    help="Provided the flag, --profile also traces memory allocations of every phase. (default=False)"
+)
+parser.add_argument(
+    '--profile-top',
+    dest='profile_top', metavar='N',
+    type=int, default=20,
+    help="Number of top functions and allocation sites listed by --profile. (default=20)"
+)
@@ -0,0 +1,255 @@
+"""
+Profiling of the phases of a run (--profile).
+
+Every phase (scrape, crawl, download) gets its own cProfile profile including
+the threads started during it, written as '<phase>.prof' for pstats/snakeviz
+and '<phase>.txt' with the top functions. Named spans time the extractors'
+'_extract_data' and crawlers' '_crawl_link' calls, so a slow run can be pinned
+to a single scraper. Allocations are traced per phase with 'memory' set.
+"""
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+import tracemalloc
+import threading
+import cProfile
+import logging
+import pstats
+import time
+import sys
+
+# cProfile uses sys.monitoring since 3.12, a single enabled profile sees all threads
+_SHARED_PROFILE = sys.version_info >= (3, 12)
+
+_profiler = None  # Profiler of the run, spans are recorded only while it's running
+
+
+def span(name: str):
+    """Times the block as span 'name' while a Profiler is running."""
+    return _profiler.span(name) if _profiler else nullcontext()
+
+
+def timed_items(items: Iterator, name: str) -> Iterator:
+    """Times the work done by the iterator as span 'name', excluding the time of its consumer."""
+    if _profiler is None:
+        return items
+    return _profiler.timed_items(items, name)
+
+
+class Span:
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float, items: int = 0):
+        self.calls += 1
+        self.items += items
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class _Phase:
+    def __init__(self):
+        self.stats = None
+        self.elapsed = 0.0
+        self.runs = 0
+        self.threads = 0
+        self.memory_peak = 0
+        self.memory_top = []
+
+
+class Profiler:
+    """
+    Profiles phases of the run, see module docstring.
+    Nested phase pauses the outer one, so every call is counted in a single phase.
+    Output files are written to 'output_dir' when the profiler stops.
+    """
+    MEMORY_FRAMES = 10
+
+    def __init__(self, output_dir: Union[str, Path] = "profile", top: int = 20, memory: bool = False):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.memory = memory
+        self.phases: Dict[str, _Phase] = {}
+        self.spans: Dict[str, Span] = {}
+        self._stack: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        global _profiler
+        _profiler = self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.MEMORY_FRAMES)
+
+    def stop(self):
+        global _profiler
+        _profiler = None
+        if self.memory:
+            tracemalloc.stop()
+        self.write()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str):
+        outer = self._stack[-1] if self._stack else None
+        if outer is not None:
+            outer.disable()
+
+        profile = cProfile.Profile()
+        thread_profiles = []
+        previous_hook = threading.getprofile() if hasattr(threading, "getprofile") else None
+        if not _SHARED_PROFILE:
+            threading.setprofile(self._thread_hook(thread_profiles))
+        snapshot = None
+        if self.memory:
+            tracemalloc.reset_peak()
+            snapshot = tracemalloc.take_snapshot()
+
+        self._stack.append(profile)
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if not _SHARED_PROFILE:
+                threading.setprofile(previous_hook)
+            self._collect(name, profile, thread_profiles, elapsed, snapshot)
+            if outer is not None:
+                outer.enable()
+
+    def _thread_hook(self, profiles: List[Tuple[threading.Thread, cProfile.Profile]]):
+        def hook(frame, event, arg):
+            # First event of a thread started in the phase, its own profile takes over the hook
+            profile = cProfile.Profile()
+            with self._lock:
+                profiles.append((threading.current_thread(), profile))
+            profile.enable()
+        return hook
+
+    def _collect(self, name: str, profile: cProfile.Profile, thread_profiles: list, elapsed: float, snapshot):
+        phase = self.phases.setdefault(name, _Phase())
+        phase.runs += 1
+        phase.elapsed += elapsed
+
+        profiles = [profile]
+        for thread, thread_profile in thread_profiles:
+            if thread.is_alive():
+                # Helper threads outliving the phase (progress, watchdog) are still being profiled
+                logging.debug(f"Profile of running thread '{thread.name}' left out of phase '{name}'")
+                continue
+            profiles.append(thread_profile)
+            phase.threads += 1
+
+        for item in profiles:
+            try:
+                if phase.stats is None:
+                    phase.stats = pstats.Stats(item)
+                else:
+                    phase.stats.add(item)
+            except TypeError:
+                # Profile without any call recorded
+                pass
+
+        if snapshot is not None:
+            phase.memory_peak = max(phase.memory_peak, tracemalloc.get_traced_memory()[1])
+            phase.memory_top = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:self.top]
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_span(name, time.perf_counter() - start)
+
+    def timed_items(self, items: Iterator, name: str) -> Iterator:
+        iterator = iter(items)
+        seconds = 0.0
+        count = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                count += 1
+                yield item
+        finally:
+            self._add_span(name, seconds, count)
+
+    def _add_span(self, name: str, seconds: float, items: int = 0):
+        with self._lock:
+            self.spans.setdefault(name, Span()).add(seconds, items)
+
+    def top_functions(self, name: str, sort: str = "tottime") -> list:
+        """(function, calls, own seconds, cumulative seconds) of the phase's top functions."""
+        stats = self.phases[name].stats
+        if stats is None:
+            return []
+        index = {"tottime": 2, "cumtime": 3}[sort]
+        rows = sorted(stats.stats.items(), key=lambda entry: entry[1][index], reverse=True)[:self.top]
+        return [(_function_name(function), calls, own, cumulative)
+                for function, (_, calls, own, cumulative, _) in rows]
+
+    def write(self):
+        if not self.phases and not self.spans:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for name, phase in self.phases.items():
+            if phase.stats is not None:
+                phase.stats.dump_stats(str(self.output_dir / f"{name}.prof"))
+                with open(self.output_dir / f"{name}.txt", "w") as f:
+                    phase.stats.stream = f
+                    phase.stats.sort_stats("cumulative").print_stats(self.top * 5)
+                    phase.stats.sort_stats("tottime").print_stats(self.top * 5)
+                    phase.stats.stream = sys.stdout
+            if phase.memory_top:
+                with open(self.output_dir / f"{name}.memory.txt", "w") as f:
+                    f.write(f"Peak traced memory: {phase.memory_peak} bytes\n")
+                    f.write("\n".join(str(stat) for stat in phase.memory_top) + "\n")
+        with open(self.output_dir / "spans.txt", "w") as f:
+            f.write(self._spans_table())
+
+    def _spans_table(self) -> str:
+        lines = [f"{'Span':<48}{'calls':>7}{'items':>8}{'total s':>10}{'avg s':>9}{'max s':>9}"]
+        for name, span_ in sorted(self.spans.items(), key=lambda entry: -entry[1].total):
+            lines.append(f"{name[:47]:<48}{span_.calls:>7}{span_.items:>8}{span_.total:>10.3f}"
+                         f"{span_.total / span_.calls:>9.3f}{span_.max:>9.3f}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        if not self.phases:
+            return
+        print(f"\nProfile written to {self.output_dir}:")
+        for name, phase in self.phases.items():
+            memory = f", peak memory {phase.memory_peak / 1024 / 1024:.1f} MB" if self.memory else ""
+            print(f"\n[{name}] {phase.elapsed:.2f}s in {phase.runs} runs, "
+                  f"{phase.threads} worker threads{memory}")
+            print(f"  {'own s':>8}{'cum s':>9}{'calls':>9}  function")
+            for function, calls, own, cumulative in self.top_functions(name):
+                print(f"  {own:>8.3f}{cumulative:>9.3f}{calls:>9}  {function}")
+        if self.spans:
+            print()
+            print(self._spans_table(), end="")
+
+
+def _function_name(function: tuple) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Built-in function
+        return name
+    return f"{Path(filename).name}:{line}({name})"
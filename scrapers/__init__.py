@@ -1,15 +1,47 @@
-from ._all import *
+from .manifest import MANIFEST, ScraperEntry
+from .dispatch import ScraperIndex
+from .linkscan import LinkScanner
 
-_ALL_CLASSES = [
-    klass
-    for name, klass in globals().items()
-    if (name.endswith('Extractor')
-        or name.endswith('Crawler'))
-]
+# Scraper modules are imported when a url needs them, not with the package
+_ENTRIES = {entry.name: entry for entry in MANIFEST}
+
+
+def __getattr__(name):
+    entry = _ENTRIES.get(name)
+    if entry is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return entry.load()
 
 
 def get_scraper_classes():
     """ Return a list of supported extractors.
     The order does matter; the first extractor matched is the one handling the URL.
+    Imports all the scraper modules, 'get_scraper_index' imports only the needed ones.
     """
-    return _ALL_CLASSES
+    return [entry.load() for entry in MANIFEST]
+
+
+def list_scrapers():
+    """Prints the supported scrapers from the manifest, without importing them."""
+    for entry in MANIFEST:
+        print(f"{entry.SCRAPER_TYPE:<10} {entry.DOMAIN:<22} {entry.DESC}")
+
+
+_INDEX = None
+_SCANNER = None
+
+
+def get_scraper_index() -> ScraperIndex:
+    """Index finding the scraper of a url, built once from the manifest."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = ScraperIndex(MANIFEST)
+    return _INDEX
+
+
+def get_link_scanner() -> LinkScanner:
+    """Scanner of crawled pages for links of the supported extractors, built once from the manifest."""
+    global _SCANNER
+    if _SCANNER is None:
+        _SCANNER = LinkScanner([entry for entry in MANIFEST if entry.SCRAPER_TYPE == "EXTRACTOR"])
+    return _SCANNER
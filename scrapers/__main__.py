@@ -0,0 +1,8 @@
+"""
+Lists the supported sites, without importing the downloader or the scrapers.
+
+    python -m scrapers
+"""
+from scrapers import list_scrapers
+
+list_scrapers()
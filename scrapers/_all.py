@@ -1,13 +0,0 @@
-from .bunkr import BunkrAlbumExtractor, BunkrVideoExtractor, BunkrImageExtractor
-from .cyberdrop import CyberdropAlbumExtractor, CyberdropImageExtractor
-from .jpgchurch import JPGChurchExtractor, JPGChurchImageExtractor
-from .pixeldrain import PixelDrainAlbumExtractor
-from .gofile import GoFileFolderExtractor
-from .anonfiles import AnonfilesExtractor
-from .pixl import PixlAlbumExtractor
-from .imgbox import IMGBoxImageExtractor
-from .imagetwist import ImageTwistImageExtractor
-from .planetsuzy import PlanetSuzyCrawler
-from .pixhost import PixHostTHExtractor
-from .imagebam import ImageBamExtractor
-from .forum_thotsbay import ForumThotsbayCrawler, ForumThotsbayImageExtractor
\ No newline at end of file
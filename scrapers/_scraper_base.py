@@ -1,18 +1,22 @@
-from downloader.downloader import Downloader, Item
-from typing import List, Union
+from downloader.item import Item
+from typing import Iterator, List, Union, TYPE_CHECKING
 import logging
 import re
 
+if TYPE_CHECKING:
+    # Only for the hints, the downloader (and requests) isn't imported with the scrapers
+    from downloader.downloader import Downloader
+
 
 class ScraperBase:
-    ALL_ITEMS: list = []
     VALID_URL_RE: Union[re.Pattern, List]  # Regex pattern for url validation
     PROTOCOL: str  # http/s
     DOMAIN: str  # domain.com
+    HOSTS: tuple = ()  # hosts of the urls including their subdomains, used by ScraperIndex; empty for any host
     DESC: str  # scraper description
     SCRAPER_TYPE: str  # scraper type EXTRACTOR/CRAWLER
     SAMPLE_URLS: list  # list of example urls
-    _downloader: Downloader
+    _downloader: "Downloader"
 
     def initialize(self):
         """
@@ -35,25 +39,27 @@ class ScraperBase:
         self._downloader = downloader
 
     def request(self, url: str, method: str = 'GET', **kwargs):
-        return self._downloader.send_request(url, method, **kwargs)
+        return self._downloader.send_request(url, method, scraper=self.__class__.__name__, **kwargs)
 
-    def add_item(self,
+    def new_item(self,
                  content_type: str,
                  filename: str,
                  extension: str,
                  source: str,
-                 album_title: str = None
-                 ):
-
+                 album_title: str = None,
+                 size: int = None
+                 ) -> Item:
+        """Creates item of the scraped content, yielded by '_extract_data' of extractors."""
         new_item = Item(
             content_type=content_type,
             filename=filename,
             extension=extension,
             source=source,
-            album_title=album_title
+            album_title=album_title,
+            size=size
         )
         logging.debug(f"{self.__class__.__name__} ADDED {new_item}")
-        self.ALL_ITEMS.append(new_item)
+        return new_item
 
     @property
     def base_url(self):
@@ -73,17 +79,34 @@ class ExtractorBase(ScraperBase):
         self._downloader = downloader
         self.initialize()
 
-    def extract_data(self, url: str) -> List[Item]:
-        self.ALL_ITEMS = []
-        self._extract_data(url)
+    def iter_items(self, url: str) -> Iterator[Item]:
+        """
+        Yields items of the url as soon as they are extracted, a page or API response at a time.
+        State of the url is kept in '_extract_data', not on the instance, so one instance
+        can extract several urls at once on different threads.
+        """
+        # Imported here, profiling brings cProfile, pstats and tracemalloc, not needed to load a scraper
+        import profiling
 
-        if len(self.ALL_ITEMS) > 1:
-            logging.info(f"{self.__class__.__name__} EXTRACTED {len(self.ALL_ITEMS)} ITEMS")
-        return self.ALL_ITEMS
+        metrics = self._downloader.metrics if self._downloader else None
+        count = 0
+        name = self.__class__.__name__
+        for item in profiling.timed_items(self._extract_data(url), f"{name}._extract_data"):
+            count += 1
+            if metrics:
+                metrics.item_scraped(name)
+            yield item
 
-    def _extract_data(self, url: str):
-        """This method is implemented in the subclass"""
-        pass
+        if count > 1:
+            logging.info(f"{name} EXTRACTED {count} ITEMS")
+
+    def extract_data(self, url: str) -> List[Item]:
+        """All items of the url, kept for compatibility, see 'iter_items'."""
+        return list(self.iter_items(url))
+
+    def _extract_data(self, url: str) -> Iterator[Item]:
+        """This method is implemented in the subclass as a generator of items"""
+        yield from ()
 
     @classmethod
     def _extract_from_html(cls, html):
@@ -105,7 +128,10 @@ class CrawlerBase(ScraperBase):
         self.initialize()
 
     def extract_data(self, url: str) -> str:
-        return self._crawl_link(url)
+        import profiling
+
+        with profiling.span(f"{self.__class__.__name__}._crawl_link"):
+            return self._crawl_link(url)
 
     def _crawl_link(self, url: str) -> str:
         """This method is implemented in the subclass"""
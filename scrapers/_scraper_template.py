@@ -21,6 +21,7 @@ class DomainNameExtractor:
     VALID_URL_RE = re.compile(r"")  # Regex pattern for url validation
     PROTOCOL = "https"  # http/s
     DOMAIN = "domain.com"
+    HOSTS = ("domain.com",)  # hosts of the urls, subdomains included
     DESC = "Simple Domain Description"
     # CONTENT_TYPE = None  # ITEM/ALBUM/THREAD  None if unknown
     SAMPLE_URLS = []
@@ -31,7 +32,7 @@ class DomainNameExtractor:
     #         url=url,
     #     )
     #
-    #     self.add_item(
+    #     yield self.new_item(
     #         content_type=content_type,
     #         filename=filename,
     #         extension=extension,
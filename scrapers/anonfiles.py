@@ -13,6 +13,7 @@ class AnonfilesExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_ANONFILES)
     PROTOCOL = "https"
     DOMAIN = "anonfiles.com"
+    HOSTS = ("anonfiles.com",)
     DESC = "AnonFiles File Storage"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -41,7 +42,7 @@ class AnonfilesExtractor(ExtractorBase):
         file = source.split("/")[-1]
         filename, extension = split_filename_ext(file)
         content_type = determine_content_type_(extension)
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -1,7 +1,7 @@
 from ._scraper_base import ExtractorBase
 from downloader.types import determine_content_type_, img_extensions, vid_extensions
 from exceptions import ExtractionError
-from utils import split_filename_ext
+from utils import split_filename_ext, parse_size
 from typing import Union
 import logging
 import re
@@ -26,6 +26,7 @@ class BunkrAlbumExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_BUNKR_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "bunkr.is"
+    HOSTS = ("bunkr.is",)
     DESC = "Bunkr.is storage"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -104,12 +105,13 @@ class BunkrAlbumExtractor(ExtractorBase):
                     f"Data to parse: {item}"
                 )
 
-            self.add_item(
+            yield self.new_item(
                 content_type=content_type,
                 filename=filename,
                 extension=extension,
                 source=source,
-                album_title=album_title
+                album_title=album_title,
+                size=parse_size(item.get('size'))
             )
 
     @classmethod
@@ -121,6 +123,7 @@ class BunkrVideoExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_BUNKR_VIDEO)
     PROTOCOL = "https"
     DOMAIN = "stream.bunkr.is"
+    HOSTS = ("bunkr.is",)
     DESC = "Bunkr.is video page"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -155,7 +158,7 @@ class BunkrVideoExtractor(ExtractorBase):
 
             source = f"{STREAM_URL.format(server_num=server_num)}/{file_w_extension}"
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -200,6 +203,7 @@ class BunkrImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_BUNKR_IMAGE)
     PROTOCOL = "https"
     DOMAIN = "bunkr.is"
+    HOSTS = ("bunkr.is",)
     DESC = "Bunkr.is Image direct link"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -215,7 +219,7 @@ class BunkrImageExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file_w_extension)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
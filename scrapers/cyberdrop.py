@@ -13,6 +13,7 @@ class CyberdropAlbumExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_CYBERDROP_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "cyberdrop.me"
+    HOSTS = ("cyberdrop.to", "cyberdrop.me")
     DESC = "Cyberdrop storage"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -41,7 +42,7 @@ class CyberdropAlbumExtractor(ExtractorBase):
             filename = image_match[1]
             extension = image_match[2]
 
-            self.add_item(
+            yield self.new_item(
                 content_type="image",
                 filename=filename,
                 extension=extension,
@@ -54,7 +55,7 @@ class CyberdropAlbumExtractor(ExtractorBase):
             filename = video_match[1]
             extension = video_match[2]
 
-            self.add_item(
+            yield self.new_item(
                 content_type="video",
                 filename=filename,
                 extension=extension,
@@ -81,6 +82,7 @@ class CyberdropImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_CYBERDROP_IMAGE)
     PROTOCOL = "https"
     DOMAIN = "cyberdrop.com"
+    HOSTS = ("cyberdrop.to", "cyberdrop.me", "cyberdrop.cc")
     DESC = "CyberDrop Image Link"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -97,7 +99,7 @@ class CyberdropImageExtractor(ExtractorBase):
         filename = match[1]
         extension = match[2]
 
-        self.add_item(
+        yield self.new_item(
             content_type="image",
             filename=filename,
             extension=extension,
@@ -0,0 +1,91 @@
+from downloader.hostnames import host_of, domain_suffixes
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+import logging
+import re
+
+
+def _patterns(scraper) -> List[re.Pattern]:
+    if isinstance(scraper.VALID_URL_RE, re.Pattern):
+        return [scraper.VALID_URL_RE]
+    return list(scraper.VALID_URL_RE)
+
+
+class _Route:
+    """Scrapers possibly matching urls of a host, their patterns combined into one."""
+    def __init__(self, scrapers: Sequence):
+        self.scrapers = list(scrapers)
+        self.pattern = None
+        self.owners = {}  # group name: scraper
+        alternatives = []
+        for scraper in self.scrapers:
+            for pattern in _patterns(scraper):
+                name = f"_{len(alternatives)}"
+                alternatives.append(f"(?P<{name}>{pattern.pattern})")
+                self.owners[name] = scraper
+        if not alternatives:
+            return
+        try:
+            self.pattern = re.compile("|".join(alternatives))
+        except re.error as e:
+            # Patterns which can't be combined (global flags, named groups) are tried one by one
+            logging.debug(f"Failed to combine patterns of {[s.__name__ for s in self.scrapers]}: {e}")
+
+    def match(self, url: str):
+        if self.pattern is None:
+            for scraper in self.scrapers:
+                if scraper.is_suitable(url):
+                    return scraper
+            return None
+
+        # Alternatives are tried in order, so the first matching scraper wins as in a linear scan
+        match = self.pattern.match(url)
+        if match is None:
+            return None
+        # Group of the whole alternative is the last one closed
+        return self.owners.get(match.lastgroup)
+
+
+class ScraperIndex:
+    """
+    Finds the scraper of a url by its host instead of trying every scraper.
+
+    Scrapers are indexed by their HOSTS, a url is matched against the combined
+    pattern of the scrapers of its host and its parent domains, together with
+    the scrapers which don't declare any host. The scrapers keep the order
+    of the registry, so the first matching one wins as with 'is_suitable' in order.
+    The index is built from the manifest entries, only the scrapers
+    of the hosts of classified urls are imported.
+    """
+    def __init__(self, entries: Sequence):
+        self.entries = list(entries)
+        self._by_host: Dict[str, List[int]] = {}
+        self._any_host: List[int] = []
+        for order, entry in enumerate(self.entries):
+            hosts = entry.HOSTS
+            if not hosts:
+                self._any_host.append(order)
+            for host in hosts:
+                self._by_host.setdefault(host.lower(), []).append(order)
+        self._routes: Dict[Tuple[int, ...], _Route] = {}
+        self._host_routes: Dict[str, _Route] = {}
+
+    def _route(self, host: str) -> _Route:
+        route = self._host_routes.get(host)
+        if route is None:
+            orders = set(self._any_host)
+            for suffix in domain_suffixes(host):
+                orders.update(self._by_host.get(suffix, ()))
+            key = tuple(sorted(orders))
+            route = self._routes.get(key)
+            if route is None:
+                route = self._routes[key] = _Route([self.entries[order].load() for order in key])
+            self._host_routes[host] = route
+        return route
+
+    def scraper_for(self, url: str):
+        """Scraper class handling the url, None if there is none."""
+        return self._route(host_of(url)).match(url)
+
+    def classify(self, urls: Iterable[str]) -> List[Union[type, None]]:
+        """Scraper class of every url (None if there is none), in order of the urls."""
+        return [self.scraper_for(url) for url in urls]
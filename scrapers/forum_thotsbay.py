@@ -20,6 +20,7 @@ class ForumThotsbayCrawler(CrawlerBase, ForumThotsbayAuth):
     VALID_URL_RE = re.compile(PATTERN_THOTSBAYFORUM_THREAD)
     PROTOCOL = "https"
     DOMAIN = "forum.thotsbay.com"
+    HOSTS = ("forum.thotsbay.com",)
     DESC = "Thotsbay Forum Thread"
     CONTENT_TYPE = "THREAD"
     MODEL_NAME = ""
@@ -91,6 +92,7 @@ class ForumThotsbayImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_THOTSBAYFORUM_IMAGE)
     PROTOCOL = "https"
     DOMAIN = "forum.thotsbay.com"
+    HOSTS = ("forum.thotsbay.com",)
     DESC = "Thotsbay Forum Image"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -104,7 +106,7 @@ class ForumThotsbayImageExtractor(ExtractorBase):
         filename, extension = self._thotsbay_process_filename(url)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -1,15 +1,22 @@
 from ._scraper_base import ExtractorBase
 from downloader.types import determine_content_type_
 from exceptions import ExtractionError
-from utils import split_filename_ext
+from utils import split_filename_ext, parse_size
 from .gofile_auth import GoFileAuth
+from config import Manager as config
 from hashlib import sha256
+import threading
 import logging
 import re
 
 # Constant URLs
 GOFILE_CONTENT_URL = "https://api.gofile.io/getContent"
 
+# Passwords of protected albums, 'config/gofile_passwords.json', e.g.:
+#     {"https://gofile.io/d/abc123": "password"}
+# Missing ones are asked for when extracting on the main thread.
+GOFILE_PASSWORDS_CONFIG_NAME = "gofile_passwords"
+
 # Regex Patterns
 PATTERN_GOFILE_ALBUM = r"((?:https?://)?gofile\.io/d/\w+)"
 
@@ -31,6 +38,7 @@ class GoFileFolderExtractor(ExtractorBase, GoFileAuth):
     VALID_URL_RE = re.compile(PATTERN_GOFILE_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "gofile.io"
+    HOSTS = ("gofile.io",)
     DESC = "GoFile File Storage"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -44,11 +52,14 @@ class GoFileFolderExtractor(ExtractorBase, GoFileAuth):
     def initialize(self):
         # Authorize here
         self.authorize()
+        # Read before extraction, items extracted on worker threads can't ask for the missing ones
+        self.passwords = config.load_settings(GOFILE_PASSWORDS_CONFIG_NAME)
 
     def _extract_data(self, url, password: str = None):
         """Recursively scrapes the album if it contains any subfolders."""
         # Album ID from url
         album_id = url.split("/")[-1]
+        password = password or self.passwords.get(url) or self.passwords.get(album_id)
 
         # Generate query parameters
         params = gf_query_params(album_id, self.ACCESS_TOKEN, password)
@@ -82,7 +93,15 @@ class GoFileFolderExtractor(ExtractorBase, GoFileAuth):
             logging.debug(f"GoFile Error, file not found. {url}")
         elif json["status"] == "error-passwordRequired":
             logging.debug(f"PASSWORD REQUIRED FOR: {url}")
-            self._extract_data(url=url, password=input(f"Enter password for '{url}': "))
+            if threading.current_thread() is threading.main_thread():
+                yield from self._extract_data(url=url, password=input(f"Enter password for '{url}': "))
+                return
+            # Prompts of worker threads would interleave with each other and the progress display
+            raise ExtractionError(
+                f"{'Wrong' if password else 'No'} password for '{url}', "
+                f"add it to 'config/{GOFILE_PASSWORDS_CONFIG_NAME}.json' as {{\"{url}\": \"<password>\"}} "
+                f"and run again."
+            )
         else:
             raise ExtractionError(f"GoFile ERROR: {json}")
 
@@ -97,7 +116,7 @@ class GoFileFolderExtractor(ExtractorBase, GoFileAuth):
                     folder_url = f"https://gofile.io/d/{folder_code}"
 
                     # Extract subfolder (Recursive manner)
-                    self._extract_data(url=folder_url)
+                    yield from self._extract_data(url=folder_url)
 
                 elif file_type == "file":
                     source = item_info["link"]
@@ -105,11 +124,12 @@ class GoFileFolderExtractor(ExtractorBase, GoFileAuth):
                     filename, extension = split_filename_ext(file_w_extension)
                     content_type = determine_content_type_(extension)
 
-                    self.add_item(
+                    yield self.new_item(
                         source=source,
                         filename=filename,
                         extension=extension,
-                        content_type=content_type
+                        content_type=content_type,
+                        size=parse_size(item_info.get("size"))
                     )
 
     @classmethod
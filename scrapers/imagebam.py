@@ -13,6 +13,7 @@ class ImageBamExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_IMAGEBAM_INDIRECT_LINK)
     PROTOCOL = "https"
     DOMAIN = "imagebam.com"
+    HOSTS = ("imagebam.com",)
     DESC = "ImageBam Image Hosting (Indirect Link)"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -38,7 +39,7 @@ class ImageBamExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -18,6 +18,7 @@ class ImageTwistImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_IMAGETWIST_INDIRECT_LINK)
     PROTOCOL = "https"
     DOMAIN = "imagetwist.com"
+    HOSTS = ("imagetwist.com",)
     DESC = "ImageTwist Image Hosting (Indirect Link)"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -38,7 +39,7 @@ class ImageTwistImageExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -12,6 +12,7 @@ class IMGBoxImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_IMGBOX_IMAGE_TH)
     PROTOCOL = "https"
     DOMAIN = "imgbox.com"
+    HOSTS = ("imgbox.com",)
     DESC = "ImgBox Extract From Thumbnail"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -32,7 +33,7 @@ class IMGBoxImageExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             source=source,
             content_type=content_type,
             filename=filename,
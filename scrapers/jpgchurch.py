@@ -18,6 +18,7 @@ class JPGChurchExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_JPEGCHURCH_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "jpg.church"
+    HOSTS = ("jpg.church",)
     DESC = "JpegChurch Image Album"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -28,43 +29,45 @@ class JPGChurchExtractor(ExtractorBase):
     ]
 
     def _extract_data(self, url: str):
-        # Album name from url
-        self.jpegchurch_album_id = url.split("/")[-1]
+        # Album name from url, kept local as items of several albums may be extracted at once
+        album_id = url.split("/")[-1]
 
-        all_pages_html = ""
+        seen = set()
 
+        # Items of every page are yielded before the next page is requested
         while url:
-            html, url = self._get_album_page(url)
-            all_pages_html = all_pages_html + html
-
-        try:
-            urls = self._extract_content_links(all_pages_html)
-        except Exception as e:
-            raise ExtractionError(
-                f"{e}\n"
-                f"{url}\n"
-                f"Failed to extract data."
-            )
-
-        for url in urls:
-            source = url.replace(".md.", ".")
-            file_w_extension = source.split("/")[-1]
-            filename, extension = split_filename_ext(file_w_extension)
-            content_type = determine_content_type_(extension)
-
-            self.add_item(
-                source=source,
-                content_type=content_type,
-                filename=filename,
-                extension=extension,
-                album_title=self.jpegchurch_album_id
-            )
-
-    def _get_album_page(self, url):
+            page_url = url
+            html, url = self._get_album_page(url, album_id)
+
+            try:
+                urls = self._extract_content_links(html)
+            except Exception as e:
+                raise ExtractionError(
+                    f"{e}\n"
+                    f"{page_url}\n"
+                    f"Failed to extract data."
+                )
+
+            for link in urls - seen:
+                seen.add(link)
+                source = link.replace(".md.", ".")
+                file_w_extension = source.split("/")[-1]
+                filename, extension = split_filename_ext(file_w_extension)
+                content_type = determine_content_type_(extension)
+
+                yield self.new_item(
+                    source=source,
+                    content_type=content_type,
+                    filename=filename,
+                    extension=extension,
+                    album_title=album_id
+                )
+
+    def _get_album_page(self, url, album_id):
         response = self.request(url)
         html = response.text
 
-        next_page = self._next_page(html)
+        next_page = self._next_page(html, album_id)
 
         return html, next_page
 
@@ -72,9 +75,9 @@ class JPGChurchExtractor(ExtractorBase):
         """Extract image links from the album html."""
         return set(re.findall(PATTERN_JPEGCHURCH_IMAGE, html, re.I))
 
-    def _next_page(self, html):
+    def _next_page(self, html, album_id):
         """Extract next page url."""
-        pattern = re.compile(PATTERN_JPEGCHURCH_NEXT_PAGE_TAG.format(album_id=self.jpegchurch_album_id))
+        pattern = re.compile(PATTERN_JPEGCHURCH_NEXT_PAGE_TAG.format(album_id=album_id))
         try:
             match = pattern.search(html)
             next_page = match.group(1)
@@ -94,6 +97,7 @@ class JPGChurchImageExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_JPEGCHURCH_IMAGE)
     PROTOCOL = "https"
     DOMAIN = "simp[0-9].jpeg.church"
+    HOSTS = ("jpg.church",)
     DESC = "JPGChurch Image Link"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -110,7 +114,7 @@ class JPGChurchImageExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file_w_extension)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -0,0 +1,93 @@
+from downloader.hostnames import domain_suffixes
+from typing import Dict, List, Sequence
+import re
+
+# Urls end at these characters, the url patterns of the extractors don't match them
+_TOKEN_END = re.compile(r'[\s"\'<>]')
+_TOKEN_SEPARATORS = (" ", "\n", "\t", "\r", "\f", "\v", '"', "'", "<", ">")
+# Characters of a hostname around a hit
+_HOST_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-")
+_HOST_END = re.compile(r'[^A-Za-z0-9.-]')
+
+
+class LinkScanner:
+    """
+    Finds links of all extractors on a crawled page in a single pass over its html.
+
+    The page is scanned once for the HOSTS of the extractors, every hit is widened
+    to its url (the run of characters up to whitespace, quotes or angle brackets)
+    and handed to the extractors of the domains its hostname belongs to, by the same
+    rule the dispatch and the host policies use. Each extractor then runs
+    its own '_extract_from_html' only on its urls instead of on the whole page,
+    which gives the same links of the hosts it handles, as a host appears in every
+    url its pattern matches.
+    Extractors without HOSTS get the whole page. The scanner is built from
+    the manifest entries, an extractor is imported once a page has its urls.
+    """
+    def __init__(self, entries: Sequence):
+        self.entries = list(entries)
+        self._owners: Dict[str, List[int]] = {}
+        self._any_host: List[int] = []
+        for order, entry in enumerate(self.entries):
+            if not entry.HOSTS:
+                self._any_host.append(order)
+            for host in entry.HOSTS:
+                self._owners.setdefault(host.lower(), []).append(order)
+        # Longer hosts first, so a host isn't hidden by a host it ends with
+        hosts = sorted(self._owners, key=len, reverse=True)
+        self._hosts_re = re.compile("|".join(re.escape(host) for host in hosts)) if hosts else None
+
+    @staticmethod
+    def _hostname(html: str, match: re.Match, start: int) -> str:
+        """Hostname the hit is part of, 'notbunkr.is' doesn't belong to 'bunkr.is'."""
+        left = match.start()
+        while left > start and html[left - 1] in _HOST_CHARS:
+            left -= 1
+        host_end = _HOST_END.search(html, match.end())
+        right = host_end.start() if host_end else len(html)
+        return html[left:right].lower()
+
+    def urls(self, html: str) -> Dict[int, List[str]]:
+        """Urls containing a host of the extractors, by order of the extractor."""
+        urls = {}
+        if self._hosts_re is None:
+            return urls
+        end = 0
+        owners = set()
+        url = None
+        for match in self._hosts_re.finditer(html):
+            position = match.start()
+            if position >= end:
+                for order in owners:
+                    urls.setdefault(order, []).append(url)
+                owners = set()
+                # The previous url ended at a separator, so the search doesn't go past it
+                start = max(html.rfind(separator, end, position) for separator in _TOKEN_SEPARATORS) + 1
+                token_end = _TOKEN_END.search(html, match.end())
+                end = token_end.start() if token_end else len(html)
+                url = html[start:end]
+            for domain in domain_suffixes(self._hostname(html, match, start)):
+                owners.update(self._owners.get(domain, ()))
+        for order in owners:
+            urls.setdefault(order, []).append(url)
+        return urls
+
+    def scan(self, html: str) -> Dict[type, list]:
+        """
+        Links of every extractor found on the page, as returned by its '_extract_from_html',
+        in order of the extractors. Extractors without links are left out.
+        """
+        urls = self.urls(html)
+        result = {}
+        for order, entry in enumerate(self.entries):
+            if order in urls:
+                text = "\n".join(urls[order])
+            elif order in self._any_host:
+                text = html
+            else:
+                continue
+            extractor = entry.load()
+            links = extractor._extract_from_html(text)
+            if links:
+                result[extractor] = links
+        return result
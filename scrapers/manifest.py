@@ -0,0 +1,71 @@
+class ScraperEntry:
+    """
+    Scraper as known without importing its module: class name, module,
+    domain, hosts, type and description, copied from the class attributes.
+    The class is imported on the first 'load'.
+    """
+    def __init__(self, name: str, module: str, domain: str, hosts: tuple, scraper_type: str, desc: str):
+        self.name = name
+        self.module = module
+        self.DOMAIN = domain
+        self.HOSTS = hosts
+        self.SCRAPER_TYPE = scraper_type
+        self.DESC = desc
+        self._class = None
+
+    def load(self) -> type:
+        """The scraper class, its module is imported on the first call."""
+        if self._class is None:
+            # __import__ rather than importlib.import_module, which '-X importtime' doesn't report
+            module = __import__(f"scrapers.{self.module}", fromlist=[self.name])
+            self._class = getattr(module, self.name)
+        return self._class
+
+    @property
+    def loaded(self) -> bool:
+        return self._class is not None
+
+    def __repr__(self):
+        return f"ScraperEntry({self.module}.{self.name})"
+
+
+# The order does matter; the first scraper matching a url is the one handling it.
+# Values have to be the same as the attributes of the classes, tests/url_matching.py checks them.
+MANIFEST = [
+    ScraperEntry("BunkrAlbumExtractor", "bunkr", "bunkr.is", ("bunkr.is",),
+                 "EXTRACTOR", "Bunkr.is storage"),
+    ScraperEntry("BunkrVideoExtractor", "bunkr", "stream.bunkr.is", ("bunkr.is",),
+                 "EXTRACTOR", "Bunkr.is video page"),
+    ScraperEntry("BunkrImageExtractor", "bunkr", "bunkr.is", ("bunkr.is",),
+                 "EXTRACTOR", "Bunkr.is Image direct link"),
+    ScraperEntry("CyberdropAlbumExtractor", "cyberdrop", "cyberdrop.me", ("cyberdrop.to", "cyberdrop.me"),
+                 "EXTRACTOR", "Cyberdrop storage"),
+    ScraperEntry("CyberdropImageExtractor", "cyberdrop", "cyberdrop.com", ("cyberdrop.to", "cyberdrop.me", "cyberdrop.cc"),
+                 "EXTRACTOR", "CyberDrop Image Link"),
+    ScraperEntry("JPGChurchExtractor", "jpgchurch", "jpg.church", ("jpg.church",),
+                 "EXTRACTOR", "JpegChurch Image Album"),
+    ScraperEntry("JPGChurchImageExtractor", "jpgchurch", "simp[0-9].jpeg.church", ("jpg.church",),
+                 "EXTRACTOR", "JPGChurch Image Link"),
+    ScraperEntry("PixelDrainAlbumExtractor", "pixeldrain", "pixeldrain.com", ("pixeldrain.com",),
+                 "EXTRACTOR", "Pixeldrain Image Storage"),
+    ScraperEntry("GoFileFolderExtractor", "gofile", "gofile.io", ("gofile.io",),
+                 "EXTRACTOR", "GoFile File Storage"),
+    ScraperEntry("AnonfilesExtractor", "anonfiles", "anonfiles.com", ("anonfiles.com",),
+                 "EXTRACTOR", "AnonFiles File Storage"),
+    ScraperEntry("PixlAlbumExtractor", "pixl", "pixl.is", ("pixl.is",),
+                 "EXTRACTOR", "Pixl Image Storage Album"),
+    ScraperEntry("IMGBoxImageExtractor", "imgbox", "imgbox.com", ("imgbox.com",),
+                 "EXTRACTOR", "ImgBox Extract From Thumbnail"),
+    ScraperEntry("ImageTwistImageExtractor", "imagetwist", "imagetwist.com", ("imagetwist.com",),
+                 "EXTRACTOR", "ImageTwist Image Hosting (Indirect Link)"),
+    ScraperEntry("PlanetSuzyCrawler", "planetsuzy", "planetsuzy.org", ("planetsuzy.org",),
+                 "CRAWLER", "PlanetSuzy Forum Thread"),
+    ScraperEntry("PixHostTHExtractor", "pixhost", "pixhost.to", ("pixhost.to",),
+                 "EXTRACTOR", "PixHost Image Hosting (Extract from thumbnail)"),
+    ScraperEntry("ImageBamExtractor", "imagebam", "imagebam.com", ("imagebam.com",),
+                 "EXTRACTOR", "ImageBam Image Hosting (Indirect Link)"),
+    ScraperEntry("ForumThotsbayCrawler", "forum_thotsbay", "forum.thotsbay.com", ("forum.thotsbay.com",),
+                 "CRAWLER", "Thotsbay Forum Thread"),
+    ScraperEntry("ForumThotsbayImageExtractor", "forum_thotsbay", "forum.thotsbay.com", ("forum.thotsbay.com",),
+                 "EXTRACTOR", "Thotsbay Forum Image"),
+]
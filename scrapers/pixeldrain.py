@@ -1,7 +1,7 @@
 from ._scraper_base import ExtractorBase
 from downloader.types import determine_content_type_
 from exceptions import ExtractionError
-from utils import split_filename_ext
+from utils import split_filename_ext, parse_size
 import logging
 import re
 import json
@@ -19,6 +19,7 @@ class PixelDrainAlbumExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_PIXELDRAIN_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "pixeldrain.com"
+    HOSTS = ("pixeldrain.com",)
     DESC = "Pixeldrain Image Storage"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -52,12 +53,13 @@ class PixelDrainAlbumExtractor(ExtractorBase):
             source = API_FILE_LINK + item["id"]
             content_type = determine_content_type_(extension)
 
-            self.add_item(
+            yield self.new_item(
                 content_type=content_type,
                 filename=filename,
                 extension=extension,
                 source=source,
-                album_title=album_id
+                album_title=album_id,
+                size=parse_size(item.get("size"))
             )
 
     def _extract_album_data(self, html) -> dict:
@@ -15,6 +15,7 @@ class PixHostTHExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_PIXHOST_THUMBNAIL)
     PROTOCOL = "https"
     DOMAIN = "pixhost.to"
+    HOSTS = ("pixhost.to",)
     DESC = "PixHost Image Hosting (Extract from thumbnail)"
     CONTENT_TYPE = "ITEM"
     SAMPLE_URLS = [
@@ -37,7 +38,7 @@ class PixHostTHExtractor(ExtractorBase):
         filename, extension = split_filename_ext(file)
         content_type = determine_content_type_(extension)
 
-        self.add_item(
+        yield self.new_item(
             content_type=content_type,
             filename=filename,
             extension=extension,
@@ -15,6 +15,7 @@ class PixlAlbumExtractor(ExtractorBase):
     VALID_URL_RE = re.compile(PATTERN_PIXL_ALBUM)
     PROTOCOL = "https"
     DOMAIN = "pixl.is"
+    HOSTS = ("pixl.is",)
     DESC = "Pixl Image Storage Album"
     CONTENT_TYPE = "ALBUM"
     SAMPLE_URLS = [
@@ -22,37 +23,41 @@ class PixlAlbumExtractor(ExtractorBase):
     ]
 
     def _extract_data(self, url):
-        self.pixl_album_id = url.split("/")[-1]
-        all_html = ""
+        # Kept local, items of several albums may be extracted at once
+        album_id = url.split("/")[-1]
+        album_name = None
+        seen = set()
 
+        # Items of every page are yielded before the next page is requested
         while url:
-            html, url = self._get_album_page(url)
-            all_html = all_html + html
+            html, url = self._get_album_page(url, album_id)
+            if album_name is None:
+                album_name = self._extract_album_name(html)
 
-        album_name = self._extract_album_name(all_html)
-        data = self._extract_images(all_html)
+            for source in self._extract_images(html):
+                if source in seen:
+                    continue
+                seen.add(source)
+                file = source.split("/")[-1]
+                filename, extension = split_filename_ext(file)
+                content_type = determine_content_type_(extension)
 
-        for source in data:
-            file = source.split("/")[-1]
-            filename, extension = split_filename_ext(file)
-            content_type = determine_content_type_(extension)
+                yield self.new_item(
+                    content_type=content_type,
+                    filename=filename,
+                    extension=extension,
+                    source=source,
+                    album_title=album_name
+                )
 
-            self.add_item(
-                content_type=content_type,
-                filename=filename,
-                extension=extension,
-                source=source,
-                album_title=album_name
-            )
-
-    def _get_album_page(self, url):
+    def _get_album_page(self, url, album_id):
         response = self.request(
             url=url,
         )
         html = response.text
 
         # Get next page url
-        pattern = re.compile(PATTERN_PIXL_NEXT_PAGE.format(album_id=self.pixl_album_id))
+        pattern = re.compile(PATTERN_PIXL_NEXT_PAGE.format(album_id=album_id))
         result = pattern.findall(html)
         if result:
             next_page = result[0]
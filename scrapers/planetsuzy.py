@@ -17,6 +17,7 @@ class PlanetSuzyCrawler(CrawlerBase):
     VALID_URL_RE = re.compile(PATTERN_PLANETSUZY_THREAD)
     PROTOCOL = "http"
     DOMAIN = "planetsuzy.org"
+    HOSTS = ("planetsuzy.org",)
     DESC = "PlanetSuzy Forum Thread"
     CONTENT_TYPE = "THREAD"
     MODEL_NAME = ""
@@ -32,7 +33,7 @@ class PlanetSuzyCrawler(CrawlerBase):
 
         output = dict()
         while url:
-            html, next_page = self._get_html_nextpage(url)
+            html, next_page = self._get_page_html(url)
             output[url] = html
             url = next_page
         return output
@@ -0,0 +1,99 @@
+from benchmarks.standin import StandInServer
+from downloader.async_downloader import AsyncDownloader
+from downloader.downloader import Item
+from downloader.summary import DOWNLOADED, RESUMED, REFETCHED, SKIPPED, INVALID
+import requests
+import tempfile
+import os
+
+SIZE = 300 * 1024
+
+
+def new_item(server: StandInServer, index: int, size: int = SIZE) -> Item:
+    """Item of a synthetic file of the stand-in server, its name ends with the size."""
+    return Item(content_type="image", filename=f"file{index}", extension=".jpg",
+                source=f"http://{server.address}/file{index:06d}s{size}.jpg")
+
+
+class AsyncDownloadTest:
+    """Downloads of the async engine from the local stand-in server, statuses as of the threads engine."""
+    @classmethod
+    def run_in_tempdir(cls, test):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as path, StandInServer(items=1, page_size=1, sizes=[SIZE]) as server:
+            os.chdir(path)
+            try:
+                test(server)
+            finally:
+                os.chdir(cwd)
+
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def download(cls, downloader: AsyncDownloader, items: list) -> list:
+        """Statuses of the items in their order, every result is passed to 'on_result' too."""
+        reported = []
+        results = downloader.run(items, False, False, "album", on_result=reported.append)
+        cls.check("reported results", len(reported), len(items))
+        statuses = {result.item: result.status for result in results}
+        return [statuses[item] for item in items]
+
+    @classmethod
+    def test_resume(cls):
+        """Partial '.part' file is resumed with a Range request, only the rest is transferred."""
+        def test(server):
+            downloader = AsyncDownloader()
+            item = new_item(server, 1)
+            content = requests.get(item.source).content
+            file_path = downloader.file_path(item, downloader.album_path(item, "album"), False)
+            downloader.part_path(file_path).write_bytes(content[:SIZE // 3])
+
+            sent = server.counters["bytes"]
+            cls.check("resume status", cls.download(downloader, [item]), [RESUMED])
+            cls.check("resumed content", file_path.read_bytes() == content, True)
+            cls.check("resumed bytes", server.counters["bytes"] - sent, SIZE - SIZE // 3)
+            cls.check("part removed", downloader.part_path(file_path).exists(), False)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_skip_existing(cls):
+        """With 'skip_existing', a complete file is skipped, a truncated one resumed and a longer one refetched."""
+        def test(server):
+            downloader = AsyncDownloader(skip_existing=True)
+            items = [new_item(server, index) for index in (1, 2, 3)]
+            contents, paths = {}, {}
+            for item, size in zip(items, (SIZE, SIZE // 2, None)):
+                contents[item] = requests.get(item.source).content
+                paths[item] = downloader.file_path(item, downloader.album_path(item, "album"), False)
+                paths[item].write_bytes(contents[item][:size] if size else contents[item] + b"stale")
+
+            sent = server.counters["bytes"]
+            cls.check("skip statuses", cls.download(downloader, items), [SKIPPED, RESUMED, REFETCHED])
+            cls.check("skip bytes", server.counters["bytes"] - sent, SIZE - SIZE // 2 + SIZE)
+            for item in items:
+                cls.check(f"{item.filename} content", paths[item].read_bytes() == contents[item], True)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_statuses(cls):
+        """Without 'skip_existing' an existing file is downloaded again as by the threads engine."""
+        def test(server):
+            downloader = AsyncDownloader()
+            existing, new = new_item(server, 1), new_item(server, 2)
+            missing = Item(content_type="image", filename="missing", extension=".jpg",
+                           source=f"http://{server.address}/missing.jpg")
+            path = downloader.file_path(existing, downloader.album_path(existing, "album"), False)
+            path.write_bytes(b"old")
+
+            cls.check("statuses", cls.download(downloader, [existing, new, missing]), [DOWNLOADED, DOWNLOADED, INVALID])
+            cls.check("replaced content", path.stat().st_size, SIZE)
+        cls.run_in_tempdir(test)
+
+
+if __name__ == '__main__':
+    AsyncDownloadTest.test_resume()
+    AsyncDownloadTest.test_skip_existing()
+    AsyncDownloadTest.test_statuses()
@@ -0,0 +1,81 @@
+from benchmarks.standin import StandInServer
+from downloader.diskio import body_reader, preallocate, preallocate_full, check_free_space
+from exceptions import InsufficientDiskSpaceError
+from urllib3.response import HTTPResponse
+from pathlib import Path
+import requests
+import tempfile
+import gzip
+import io
+
+SIZE = 300 * 1024
+
+
+def read_all(readinto, buffer_size: int = 64 * 1024) -> bytes:
+    """Body read by 'readinto' into a reused buffer, as '_stream' reads it."""
+    buffer = memoryview(bytearray(buffer_size))
+    data = bytearray()
+    while True:
+        size = readinto(buffer)
+        if not size:
+            return bytes(data)
+        data += buffer[:size]
+
+
+class DiskIOTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_preallocate(cls):
+        """Preallocation keeps the size of a '.part' file, the full one extends the file."""
+        with tempfile.TemporaryDirectory() as path:
+            part = Path(path) / "file.part"
+            with open(part, "wb") as f:
+                f.write(b"x" * 100)
+                f.flush()
+                if preallocate(f, 100, SIZE):
+                    cls.check("blocks reserved", part.stat().st_blocks * 512 >= SIZE, True)
+            cls.check("part size kept", part.stat().st_size, 100)
+
+            full = Path(path) / "file"
+            with open(full, "wb") as f:
+                preallocate_full(f, SIZE)
+            cls.check("full size", full.stat().st_size, SIZE)
+
+    @classmethod
+    def test_free_space(cls):
+        """Download which wouldn't leave the reserve free is refused before writing."""
+        with tempfile.TemporaryDirectory() as path:
+            check_free_space(Path(path), 1024)
+            try:
+                check_free_space(Path(path), 1024, reserve=2 ** 62)
+            except InsufficientDiskSpaceError:
+                pass
+            else:
+                print("free space FAILED: no error for a reserve larger than the disk")
+
+    @classmethod
+    def test_body_reader(cls):
+        """Identity body is read from the socket into the buffer, encoded body is decoded."""
+        with StandInServer(items=1, page_size=1, sizes=[SIZE]) as server:
+            url = f"http://{server.address}/file000001s{SIZE}.jpg"
+            expected = requests.get(url).content
+            response = requests.get(url, stream=True)
+            cls.check("identity body", read_all(body_reader(response)), expected)
+            cls.check("connection released", response.raw._fp is None or response.raw._fp.isclosed(), True)
+
+        data = b"gzip encoded body " * 1000
+        response = requests.Response()
+        response.headers["Content-Encoding"] = "gzip"
+        response.raw = HTTPResponse(body=io.BytesIO(gzip.compress(data)), headers={"Content-Encoding": "gzip"},
+                                    preload_content=False, decode_content=True)
+        cls.check("decoded body", read_all(body_reader(response), 1000), data)
+
+
+if __name__ == '__main__':
+    DiskIOTest.test_preallocate()
+    DiskIOTest.test_free_space()
+    DiskIOTest.test_body_reader()
@@ -0,0 +1,164 @@
+from benchmarks.standin import StandInServer
+from downloader.bandwidth import BandwidthLimiter
+from downloader.downloader import Downloader, Item
+from downloader.pool import DownloadPool
+from downloader.segmented import split_ranges
+from downloader.store import ContentStore
+from downloader.summary import DOWNLOADED, RESUMED, SKIPPED, FAILED
+from exceptions import MissingAlbumNameError
+import requests
+import logging
+import tempfile
+import time
+import os
+
+SIZE = 300 * 1024
+
+
+def new_item(server: StandInServer, index: int, size: int = SIZE) -> Item:
+    """Item of a synthetic file of the stand-in server, its name ends with the size."""
+    return Item(content_type="image", filename=f"file{index}", extension=".jpg",
+                source=f"http://{server.address}/file{index:06d}s{size}.jpg")
+
+
+class DownloadTest:
+    """Downloads from the local stand-in server, run from any directory with the repo on PYTHONPATH."""
+    @classmethod
+    def run_in_tempdir(cls, test):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as path, StandInServer(items=1, page_size=1, sizes=[SIZE]) as server:
+            os.chdir(path)
+            try:
+                test(server)
+            finally:
+                os.chdir(cwd)
+
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_resume(cls):
+        """Partial '.part' file is resumed with a Range request, only the rest is transferred."""
+        def test(server):
+            downloader = Downloader(requests.Session())
+            item = new_item(server, 1)
+            content = requests.get(item.source).content
+            file_path = downloader.file_path(item, downloader.album_path(item, "album"), False)
+            downloader.part_path(file_path).write_bytes(content[:SIZE // 3])
+
+            sent = server.counters["bytes"]
+            cls.check("resume status", downloader.download_item(item, False, False, "album"), RESUMED)
+            cls.check("resumed content", file_path.read_bytes() == content, True)
+            cls.check("resumed bytes", server.counters["bytes"] - sent, SIZE - SIZE // 3)
+            cls.check("part removed", downloader.part_path(file_path).exists(), False)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_skip_existing(cls):
+        """With 'skip_existing', a complete file is skipped and a truncated one resumed."""
+        def test(server):
+            downloader = Downloader(requests.Session(), skip_existing=True)
+            complete, truncated = new_item(server, 1), new_item(server, 2)
+            contents, paths = {}, {}
+            for item, size in ((complete, SIZE), (truncated, SIZE // 2)):
+                contents[item] = requests.get(item.source).content
+                paths[item] = downloader.file_path(item, downloader.album_path(item, "album"), False)
+                paths[item].write_bytes(contents[item][:size])
+
+            sent = server.counters["bytes"]
+            cls.check("complete status", downloader.download_item(complete, False, False, "album"), SKIPPED)
+            cls.check("truncated status", downloader.download_item(truncated, False, False, "album"), RESUMED)
+            cls.check("skip bytes", server.counters["bytes"] - sent, SIZE - SIZE // 2)
+            for item in (complete, truncated):
+                cls.check(f"{item.filename} content", paths[item].read_bytes() == contents[item], True)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_segments(cls):
+        """Byte ranges cover the file once, segmented download reassembles it."""
+        for size, segments in ((10, 3), (SIZE, 4), (5, 8), (1, 1)):
+            ranges = split_ranges(size, segments)
+            covered = [byte for start, end in ranges for byte in range(start, end + 1)]
+            cls.check(f"ranges of {size} in {segments}", covered, list(range(size)))
+
+        def test(server):
+            downloader = Downloader(requests.Session(), segments=4, segment_threshold=SIZE // 2)
+            item = new_item(server, 1)
+            files = server.counters["files"]
+            cls.check("segmented status", downloader.download_item(item, False, False, "album"), DOWNLOADED)
+            path = downloader.file_path(item, downloader.album_path(item, "album"), False)
+            cls.check("segmented content", path.read_bytes() == requests.get(item.source).content, True)
+            # Probe response, a request for every segment and the check above
+            cls.check("segment requests", server.counters["files"] - files, 6)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_store(cls):
+        """Same content in two albums is stored once and linked into both."""
+        def test(server):
+            downloader = Downloader(requests.Session())
+            downloader.store = store = ContentStore(downloader.output_path / ContentStore.DIR_NAME)
+            item = new_item(server, 1)
+            paths = []
+            for album in ("first", "second"):
+                downloader.download_item(item, False, False, album)
+                paths.append(downloader.file_path(item, downloader.album_path(item, album), False))
+
+            cls.check("stored", (store.stored, store.duplicates, store.saved_bytes), (1, 1, SIZE))
+            cls.check("objects", len(list(store.objects_path.glob("*/*"))), 1)
+            cls.check("same content", paths[0].read_bytes() == paths[1].read_bytes(), True)
+            cls.check("linked", os.path.samefile(paths[0], paths[1]), True)
+            store.close()
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_bandwidth(cls):
+        """Body is streamed within the bandwidth limit, after the burst the rest waits for the refill."""
+        def test(server):
+            rate = 400 * 1024
+            limiter = BandwidthLimiter(rate=rate, watch_config=False)
+            downloader = Downloader(requests.Session(), bandwidth=limiter)
+            item = new_item(server, 1)
+            start = time.monotonic()
+            cls.check("limited status", downloader.download_item(item, False, False, "album"), DOWNLOADED)
+            elapsed = time.monotonic() - start
+            path = downloader.file_path(item, downloader.album_path(item, "album"), False)
+            cls.check("limited content", path.read_bytes() == requests.get(item.source).content, True)
+
+            # Burst of half a second of the rate is served at once
+            expected = (SIZE - rate * BandwidthLimiter.BURST_SECONDS) / rate
+            if elapsed < expected * 0.8:
+                print(f"bandwidth limit FAILED: {elapsed:.3f}s, expected at least {expected:.3f}s")
+            cls.check("throttled", limiter.throttled > 0, True)
+        cls.run_in_tempdir(test)
+
+    @classmethod
+    def test_missing_album(cls):
+        """Item without a directory name fails on the workers, nothing is asked."""
+        def test(server):
+            downloader = Downloader(requests.Session())
+            titled = new_item(server, 1).replace(album_title="titled")
+            untitled = new_item(server, 2)
+            results = DownloadPool(workers=2).run(
+                items=[titled, untitled],
+                fetch=lambda item: downloader.download_item(item, False, False)
+            )
+            statuses = {result.item.filename: (result.status, type(result.error)) for result in results}
+            cls.check("titled", statuses["file1"], (DOWNLOADED, type(None)))
+            cls.check("untitled", statuses["file2"], (FAILED, MissingAlbumNameError))
+        logging.disable(logging.ERROR)
+        try:
+            cls.run_in_tempdir(test)
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    DownloadTest.test_resume()
+    DownloadTest.test_skip_existing()
+    DownloadTest.test_segments()
+    DownloadTest.test_store()
+    DownloadTest.test_bandwidth()
+    DownloadTest.test_missing_album()
@@ -0,0 +1,92 @@
+from benchmarks.standin import StandInServer, GOFILE_PASSWORD
+from benchmarks.end_to_end import LocalAdapter
+from downloader.downloader import Downloader
+from exceptions import ExtractionError
+from scrapers.gofile import GoFileFolderExtractor, GOFILE_PASSWORDS_CONFIG_NAME
+from pathlib import Path
+import builtins
+import tempfile
+import threading
+import requests
+import json
+import os
+
+URL = "https://gofile.io/d/locked0"
+
+
+class GoFilePasswordsTest:
+    """Password protected GoFile folder of the local stand-in server."""
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def run_in_tempdir(cls, test, passwords: dict = None):
+        """Config files of the extractor are read from and written to the working directory."""
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as path, StandInServer(items=6, page_size=6) as server:
+            os.chdir(path)
+            (Path(path) / "config").mkdir()
+            if passwords:
+                (Path(path) / "config" / f"{GOFILE_PASSWORDS_CONFIG_NAME}.json").write_text(json.dumps(passwords))
+            try:
+                session = requests.Session()
+                adapter = LocalAdapter(server.address)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                test(GoFileFolderExtractor(Downloader(session)))
+            finally:
+                os.chdir(cwd)
+
+    @classmethod
+    def extract_in_thread(cls, extractor: GoFileFolderExtractor) -> list:
+        """[items] or [error] of extraction on a worker thread."""
+        outcome = []
+
+        def extract():
+            try:
+                outcome.append(extractor.extract_data(URL))
+            except ExtractionError as e:
+                outcome.append(e)
+
+        thread = threading.Thread(target=extract)
+        thread.start()
+        thread.join()
+        return outcome
+
+    @classmethod
+    def test_prompt(cls):
+        """Missing password is asked for on the main thread, worker threads fail without asking."""
+        prompts = []
+
+        def answer(prompt: str) -> str:
+            prompts.append(prompt)
+            return GOFILE_PASSWORD
+
+        def test(extractor):
+            cls.check("main thread items", len(extractor.extract_data(URL)), 2)
+            cls.check("main thread prompts", len(prompts), 1)
+            outcome = cls.extract_in_thread(extractor)
+            cls.check("worker error", [type(value) for value in outcome], [ExtractionError])
+            cls.check("worker prompts", len(prompts), 1)
+
+        builtins_input = builtins.input
+        builtins.input = answer
+        try:
+            cls.run_in_tempdir(test)
+        finally:
+            builtins.input = builtins_input
+
+    @classmethod
+    def test_config(cls):
+        """Password of the config file is used on worker threads."""
+        def test(extractor):
+            outcome = cls.extract_in_thread(extractor)
+            cls.check("worker items", [len(value) for value in outcome], [2])
+        cls.run_in_tempdir(test, passwords={URL: GOFILE_PASSWORD})
+
+
+if __name__ == '__main__':
+    GoFilePasswordsTest.test_prompt()
+    GoFilePasswordsTest.test_config()
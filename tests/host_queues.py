@@ -0,0 +1,115 @@
+from downloader.pool import HostQueues, DownloadPool
+from downloader.downloader import Item
+from downloader.hosts import HostPolicy, HostPolicyAdapter
+from collections import Counter
+import threading
+import logging
+import time
+
+
+def new_item(host: str, index: int) -> Item:
+    return Item(content_type="image", filename=f"{host}{index}", extension=".jpg",
+                source=f"https://{host}/file{index}.jpg")
+
+
+class HostQueuesTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_round_robin(cls):
+        """Hosts are served in turns in order of their first item, items of a host in their order."""
+        queues = HostQueues(limit=lambda host: 10)
+        for index in range(3):
+            queues.put(new_item("a.com", index))
+        for index in range(2):
+            queues.put(new_item("b.com", index))
+        queues.put(new_item("c.com", 0))
+
+        taken = [queues.take().filename for _ in range(6)]
+        cls.check("round robin", taken, ["a.com0", "b.com0", "c.com0", "a.com1", "b.com1", "a.com2"])
+        cls.check("empty", queues.take(), None)
+
+    @classmethod
+    def test_host_limit(cls):
+        """A host at its limit is skipped until one of its downloads is done."""
+        queues = HostQueues(limit=lambda host: 1 if host == "a.com" else 2)
+        for index in range(3):
+            queues.put(new_item("a.com", index))
+            queues.put(new_item("b.com", index))
+
+        first = [queues.take() for _ in range(3)]
+        cls.check("limited hosts", [item.filename for item in first], ["a.com0", "b.com0", "b.com1"])
+
+        taken = []
+        worker = threading.Thread(target=lambda: taken.append(queues.take()))
+        worker.start()
+        time.sleep(0.1)
+        cls.check("waits for limit", taken, [])
+        queues.done(first[0])
+        worker.join(timeout=1)
+        cls.check("taken after done", [item.filename for item in taken], ["a.com1"])
+        queues.close()
+
+    @classmethod
+    def test_lanes(cls):
+        """Dedicated workers prefer large items, the others take them only without small items."""
+        queues = HostQueues(limit=lambda host: 10)
+        queues.put(new_item("a.com", 0), large=True)
+        queues.put(new_item("a.com", 1))
+        queues.put(new_item("b.com", 0), large=True)
+
+        cls.check("dedicated takes large", queues.take(dedicated=True).filename, "a.com0")
+        cls.check("shared takes small", queues.take().filename, "a.com1")
+        cls.check("shared takes large without small", queues.take().filename, "b.com0")
+
+    @classmethod
+    def test_pool_limits(cls):
+        """Pool never runs more downloads of a host than its limit, all items get a result."""
+        running, peak = Counter(), Counter()
+        lock = threading.Lock()
+
+        def fetch(item):
+            host = item.source.split("/")[2]
+            with lock:
+                running[host] += 1
+                peak[host] = max(peak[host], running[host])
+            time.sleep(0.01)
+            with lock:
+                running[host] -= 1
+            if item.filename == "b.com3":
+                raise ConnectionError("reset")
+            return "downloaded"
+
+        items = [new_item(host, index) for index in range(10) for host in ("a.com", "b.com")]
+        results = DownloadPool(workers=6, host_workers=2).run(iter(items), fetch)
+        cls.check("results", len(results), len(items))
+        cls.check("failed", [result.item.filename for result in results if not result.ok], ["b.com3"])
+        cls.check("host peak", max(peak.values()), 2)
+
+        reported = []
+        results = DownloadPool(workers=6, host_workers=2).run(iter(items), fetch, on_result=reported.append,
+                                                             collect=False)
+        cls.check("not collected", (len(results), len(reported)), (0, len(items)))
+
+    @classmethod
+    def test_pool_size(cls):
+        """Connection pool of a host fits every segment of its concurrent downloads and the scrape workers."""
+        adapter = HostPolicyAdapter(host_workers=4, segments=3)
+        cls.check("policy limit", adapter.pool_maxsize(HostPolicy(pool_maxsize=2, max_concurrency=2)), 6)
+        cls.check("host workers", adapter.pool_maxsize(HostPolicy(pool_maxsize=10)), 12)
+        cls.check("policy size", HostPolicyAdapter().pool_maxsize(HostPolicy(pool_maxsize=2, max_concurrency=2)), 2)
+        scraping = HostPolicyAdapter(host_workers=4, scrape_workers=12)
+        cls.check("scrape workers", scraping.pool_maxsize(HostPolicy(pool_maxsize=2, max_concurrency=2)), 14)
+
+
+if __name__ == '__main__':
+    # Failure of an item is expected in 'test_pool_limits', it's checked in the results
+    logging.disable(logging.ERROR)
+    HostQueuesTest.test_round_robin()
+    HostQueuesTest.test_host_limit()
+    HostQueuesTest.test_lanes()
+    HostQueuesTest.test_pool_limits()
+    HostQueuesTest.test_pool_size()
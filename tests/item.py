@@ -0,0 +1,55 @@
+from downloader.item import Item
+import pickle
+
+
+def new_item(index: int, album: str = "album") -> Item:
+    return Item(content_type="image", filename=f"file{index}", extension=".jpg",
+                source=f"https://cdn.bunkr.is/file{index}.jpg", album_title=album, size=index)
+
+
+class ItemTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_compact(cls):
+        """Items have no instance dict, values repeated across items are shared."""
+        item = new_item(1)
+        cls.check("no dict", hasattr(item, "__dict__"), False)
+        # Titles built at runtime, as scrapers do, are interned to one object
+        first, second = new_item(1, "".join(["al", "bum"])), new_item(2, "".join(["alb", "um"]))
+        cls.check("interned title", first.album_title is second.album_title, True)
+        cls.check("interned extension", first.extension is second.extension, True)
+
+    @classmethod
+    def test_immutable(cls):
+        """Values are changed by 'replace' only, items are equal and hashed by their source."""
+        item = new_item(1)
+        for action in (lambda: setattr(item, "size", 5), lambda: delattr(item, "size"),
+                       lambda: setattr(item, "other", 5)):
+            try:
+                action()
+            except AttributeError:
+                pass
+            else:
+                print("immutable FAILED: item was changed")
+
+        sized = item.replace(size=100)
+        cls.check("replaced", (sized.size, sized.filename, item.size), (100, "file1", 1))
+        cls.check("equal by source", sized == item, True)
+        cls.check("hashed by source", len({item, sized, new_item(2)}), 2)
+
+    @classmethod
+    def test_pickle(cls):
+        """Slotted items are pickled with all their values by '__reduce__'."""
+        item = new_item(1)
+        restored = pickle.loads(pickle.dumps(item))
+        cls.check("pickled", repr(restored), repr(item))
+
+
+if __name__ == '__main__':
+    ItemTest.test_compact()
+    ItemTest.test_immutable()
+    ItemTest.test_pickle()
@@ -0,0 +1,62 @@
+from benchmarks.standin import StandInServer
+from benchmarks.end_to_end import LocalAdapter
+from downloader.downloader import Downloader
+from downloader.metrics import Metrics
+from scrapers.jpgchurch import JPGChurchExtractor
+import requests
+
+ITEMS = 25
+PAGE_SIZE = 10
+
+
+class IterItemsTest:
+    """Extraction of a paginated jpg.church album served by the local stand-in server."""
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def extractor(cls, server: StandInServer) -> JPGChurchExtractor:
+        session = requests.Session()
+        adapter = LocalAdapter(server.address)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        downloader = Downloader(session)
+        downloader.metrics = Metrics()
+        return JPGChurchExtractor(downloader)
+
+    @classmethod
+    def test_streaming(cls):
+        """Items of the first page are yielded before the next page is requested."""
+        with StandInServer(items=ITEMS, page_size=PAGE_SIZE) as server:
+            extractor = cls.extractor(server)
+            items = extractor.iter_items("https://jpg.church/a/stream.NXstream")
+            first = [next(items) for _ in range(PAGE_SIZE)]
+            cls.check("pages for the first page of items", server.counters["pages"], 1)
+
+            rest = list(items)
+            cls.check("all items", len(first) + len(rest), ITEMS)
+            cls.check("pages for all items", server.counters["pages"], 3)
+            cls.check("scraped metric", extractor._downloader.metrics.scrapers["JPGChurchExtractor"].counters["items"],
+                      ITEMS)
+            cls.check("extract_data", extractor.extract_data("https://jpg.church/a/stream.NXstream"), first + rest)
+
+    @classmethod
+    def test_shared_instance(cls):
+        """One instance extracts two urls at once, every item keeps the album of its url."""
+        with StandInServer(items=ITEMS, page_size=PAGE_SIZE) as server:
+            extractor = cls.extractor(server)
+            first = extractor.iter_items("https://jpg.church/a/first.NXfirst")
+            second = extractor.iter_items("https://jpg.church/a/second.NXsecond")
+            titles = {"first": set(), "second": set()}
+            for first_item, second_item in zip(first, second):
+                titles["first"].add(first_item.album_title)
+                titles["second"].add(second_item.album_title)
+            cls.check("first albums", titles["first"], {"first.NXfirst"})
+            cls.check("second albums", titles["second"], {"second.NXsecond"})
+
+
+if __name__ == '__main__':
+    IterItemsTest.test_streaming()
+    IterItemsTest.test_shared_instance()
@@ -0,0 +1,96 @@
+from downloader.journal import DownloadJournal, ScrapeRecorder, SCRAPING, SCRAPED, COMPLETED
+from downloader.downloader import Item
+from downloader.summary import DOWNLOADED, FAILED
+from pathlib import Path
+import tempfile
+
+URL = "https://bunkr.is/a/journal"
+
+
+def new_items(count: int) -> list:
+    return [Item(content_type="image", filename=f"file{i}", extension=".jpg",
+                 source=f"https://cdn.bunkr.is/file{i}.jpg", album_title="journal")
+            for i in range(count)]
+
+
+def record(journal: DownloadJournal, items: list, failed: bool = False) -> ScrapeRecorder:
+    """Scrapes the items as a run does, returns the closed recorder."""
+    recorder = ScrapeRecorder(journal, URL, "journal")
+    recorder.accepted = [item for item in items if recorder.accept(item)]
+    recorder.failed = failed
+    recorder.close()
+    return recorder
+
+
+class JournalTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_resume(cls):
+        """Url goes SCRAPING -> SCRAPED -> COMPLETED, an interrupted run continues with the remaining items."""
+        with tempfile.TemporaryDirectory() as path:
+            journal = DownloadJournal(Path(path) / DownloadJournal.FILE_NAME)
+            items = new_items(5)
+
+            # Scraper failed after two items, the url is scraped again in the next run
+            record(journal, items[:2], failed=True)
+            cls.check("failed scrape status", journal.source_status(URL), SCRAPING)
+
+            recorder = record(journal, items + items[:1])
+            cls.check("scraped status", journal.source_status(URL), SCRAPED)
+            cls.check("duplicates dropped", (recorder.total, len(recorder.accepted)), (6, 5))
+
+            # Run interrupted after three items
+            for item in items[:3]:
+                journal.start(URL, item)
+                journal.finish(URL, item, DOWNLOADED)
+            journal.start(URL, items[3])
+            journal.finish_source(URL)
+            cls.check("incomplete status", journal.source_status(URL), SCRAPED)
+
+            remaining, dir_name = journal.remaining_items(URL)
+            cls.check("remaining items", [item.source for item in remaining], [item.source for item in items[3:]])
+            cls.check("remaining dir", dir_name, "journal")
+            cls.check("remaining values", (remaining[0].filename, remaining[0].album_title), ("file3", "journal"))
+
+            for item in remaining:
+                journal.start(URL, item)
+                journal.finish(URL, item, DOWNLOADED)
+            journal.finish_source(URL)
+            cls.check("completed status", journal.source_status(URL), COMPLETED)
+            journal.close()
+
+    @classmethod
+    def test_skip_done(cls):
+        """Scraping the url again skips items done in previous runs, failed ones are listed and retried."""
+        with tempfile.TemporaryDirectory() as path:
+            journal = DownloadJournal(Path(path) / DownloadJournal.FILE_NAME)
+            items = new_items(4)
+            record(journal, items)
+            for item in items[:3]:
+                journal.start(URL, item)
+                journal.finish(URL, item, DOWNLOADED)
+            journal.start(URL, items[3])
+            journal.finish(URL, items[3], FAILED, error=ConnectionError("reset"))
+
+            failed = journal.failed_items()
+            cls.check("failed items", [(url, source) for url, source, _, _ in failed], [(URL, items[3].source)])
+            cls.check("failed error", failed[0][3], repr(ConnectionError("reset")))
+
+            recorder = record(journal, items)
+            cls.check("skipped", recorder.skipped, 3)
+            cls.check("accepted", [item.source for item in recorder.accepted], [items[3].source])
+            journal.close()
+
+            # Journal is kept in the output folder, a new run reads it back
+            journal = DownloadJournal(Path(path) / DownloadJournal.FILE_NAME)
+            cls.check("reopened skipped", record(journal, items).skipped, 3)
+            journal.close()
+
+
+if __name__ == '__main__':
+    JournalTest.test_resume()
+    JournalTest.test_skip_done()
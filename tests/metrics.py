@@ -0,0 +1,105 @@
+from downloader.metrics import Metrics, Histogram, JSON, PROMETHEUS
+from downloader.summary import DOWNLOADED, FAILED
+from pathlib import Path
+import tempfile
+import json
+import re
+
+# Sample line of the Prometheus text format: name{label="value",...} number
+PATTERN_SAMPLE = re.compile(
+    r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-z]+="(?:[^"\\]|\\.)*",?)+)\})? (-?[\d.e+]+|\+Inf)$'
+)
+
+
+def recorded_metrics(**kwargs) -> Metrics:
+    metrics = Metrics(**kwargs)
+    metrics.request("cdn.bunkr.is", "GET", 0.03, status=200)
+    metrics.request("cdn.bunkr.is", "HEAD", 0.2, status=429)
+    metrics.request("bunkr.is", "GET", 0.7, status=200, scraper="BunkrAlbumExtractor")
+    metrics.request('odd"host', "GET", 1.0, error=ConnectionError("reset"))
+    for _ in range(3):
+        metrics.download_attempt("cdn.bunkr.is")
+    metrics.transferred("cdn.bunkr.is", 2048)
+    metrics.item_finished("cdn.bunkr.is", DOWNLOADED, 2.0)
+    metrics.item_finished("cdn.bunkr.is", FAILED, 40.0)
+    metrics.item_scraped("BunkrAlbumExtractor")
+    return metrics
+
+
+class MetricsTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_histogram(cls):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+        cls.check("cumulative", histogram.cumulative(), [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        cls.check("median", histogram.quantile(0.5), 0.1)
+        cls.check("p95", histogram.quantile(0.95), float("inf"))
+        cls.check("empty", Histogram((1.0,)).quantile(0.5), None)
+
+    @classmethod
+    def test_json(cls):
+        """Counters of hosts and scrapers, histograms with cumulative buckets."""
+        snapshot = json.loads(recorded_metrics().to_json())
+        host = snapshot["hosts"]["cdn.bunkr.is"]
+        cls.check("host counters", {name: host["counters"][name] for name in
+                                    ("requests", "requests_head", "responses_2xx", "throttled", "attempts",
+                                     "bytes", "items", "items_failed", "transfer_seconds")},
+                  {"requests": 2, "requests_head": 1, "responses_2xx": 1, "throttled": 1, "attempts": 3,
+                   "bytes": 2048, "items": 2, "items_failed": 1, "transfer_seconds": 2.0})
+        cls.check("latency buckets", (host["request_seconds"]["buckets"]["0.05"],
+                                      host["request_seconds"]["buckets"]["+Inf"]), (1, 2))
+        cls.check("errors", snapshot["hosts"]['odd"host']["counters"]["errors"], 1)
+        cls.check("scraper", snapshot["scrapers"]["BunkrAlbumExtractor"]["counters"],
+                  {"requests": 1, "requests_get": 1, "responses_2xx": 1, "items": 1})
+
+    @classmethod
+    def test_prometheus(cls):
+        """Every line is a TYPE comment or a valid sample, declared before its samples."""
+        text = recorded_metrics().to_prometheus()
+        declared, samples = set(), {}
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                declared.add(line.split()[2])
+                continue
+            match = PATTERN_SAMPLE.match(line)
+            if not match:
+                print(f"prometheus line FAILED: {line!r}")
+                continue
+            name = match.group(1)
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in declared else name
+            if family not in declared:
+                print(f"prometheus type FAILED: {name} before its TYPE")
+            samples[f"{name}{{{match.group(2) or ''}}}"] = match.group(3)
+
+        cls.check("requests", samples.get('lols_host_requests_total{host="cdn.bunkr.is"}'), "2")
+        cls.check("escaped label", samples.get('lols_host_errors_total{host="odd\\"host"}'), "1")
+        cls.check("inf bucket", samples.get('lols_host_request_seconds_bucket{host="cdn.bunkr.is",le="+Inf"}'), "2")
+        cls.check("count", samples.get('lols_host_request_seconds_count{host="cdn.bunkr.is"}'), "2")
+        cls.check("scraper items", samples.get('lols_scraper_items_total{scraper="BunkrAlbumExtractor"}'), "1")
+
+    @classmethod
+    def test_write(cls):
+        """Format follows the file suffix, the file is written on stop."""
+        with tempfile.TemporaryDirectory() as path:
+            for name, fmt in (("metrics.json", JSON), ("metrics.prom", PROMETHEUS)):
+                metrics = recorded_metrics(path=Path(path) / name)
+                cls.check(f"{name} format", metrics.format, fmt)
+                with metrics:
+                    pass
+                content = (Path(path) / name).read_text()
+                cls.check(f"{name} content", content.startswith("{" if fmt == JSON else "# TYPE"), True)
+            cls.check("no temporary files", sorted(p.name for p in Path(path).iterdir()),
+                      ["metrics.json", "metrics.prom"])
+
+
+if __name__ == '__main__':
+    MetricsTest.test_histogram()
+    MetricsTest.test_json()
+    MetricsTest.test_prometheus()
+    MetricsTest.test_write()
@@ -0,0 +1,121 @@
+from downloader.pipeline import Pipeline, Stage, PoolStage
+from downloader.pool import DownloadPool
+from downloader.downloader import Item
+import threading
+import logging
+import time
+
+
+def new_item(host: str, index: int) -> Item:
+    return Item(content_type="image", filename=f"{host}{index}", extension=".jpg",
+                source=f"https://{host}/file{index}.jpg")
+
+
+class PipelineTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_stages(cls):
+        """Values pass every stage, expanded, dropped on None and counted on errors."""
+        collected = []
+        lock = threading.Lock()
+
+        def collect(value):
+            with lock:
+                collected.append(value)
+
+        def check_value(value):
+            if value == 13:
+                raise ValueError("unlucky")
+            return value if value % 2 else None
+
+        pipeline = Pipeline([
+            Stage("expand", lambda n: range(n * 10, n * 10 + 10), workers=2, capacity=2, expand=True),
+            Stage("odd", check_value, workers=3, capacity=5),
+            Stage("collect", collect, capacity=5),
+        ])
+        pipeline.run(range(3))
+        cls.check("collected", sorted(collected), [n for n in range(30) if n % 2 and n != 13])
+        stats = {row["stage"]: row for row in pipeline.stats()}
+        cls.check("expanded", (stats["expand"]["in"], stats["expand"]["out"]), (3, 30))
+        cls.check("errors", stats["odd"]["errors"], 1)
+        cls.check("queues bounded", all(row["max_queue"] <= row["capacity"] for row in stats.values()), True)
+
+    @classmethod
+    def test_backpressure(cls):
+        """Slow last stage holds back the input, values aren't read far ahead of it."""
+        produced = []
+        done = []
+
+        def values():
+            for n in range(40):
+                produced.append(n)
+                yield n
+
+        def slow(value):
+            time.sleep(0.005)
+            done.append(value)
+            # Queues of 2 + 2, one value in each of the two workers and one waiting to be put
+            if len(produced) - len(done) > 7:
+                print(f"backpressure FAILED: {len(produced)} read, {len(done)} done")
+
+        Pipeline([Stage("pass", lambda n: n, capacity=2), Stage("slow", slow, capacity=2)]).run(values())
+        cls.check("all done", len(done), 40)
+
+    @classmethod
+    def test_pool_stage(cls):
+        """Download stage runs items on the pool within host limits and emits their results."""
+        running, peak = {}, {}
+        lock = threading.Lock()
+
+        def fetch(item):
+            host = item.source.split("/")[2]
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), running[host])
+            time.sleep(0.005)
+            with lock:
+                running[host] -= 1
+            if item.filename == "b.com2":
+                raise ConnectionError("reset")
+            return "downloaded"
+
+        results = []
+        pipeline = Pipeline([
+            PoolStage("download", DownloadPool(workers=4, host_workers=2), fetch, capacity=4),
+            Stage("record", results.append),
+        ])
+        pipeline.run(new_item(host, index) for index in range(6) for host in ("a.com", "b.com"))
+        cls.check("results", len(results), 12)
+        cls.check("failed", [result.item.filename for result in results if not result.ok], ["b.com2"])
+        cls.check("host peak", max(peak.values()) <= 2, True)
+
+    @classmethod
+    def test_failed_input(cls):
+        """Error of the input stops the stages and is raised by 'run'."""
+        def values():
+            yield 1
+            raise RuntimeError("scraper failed")
+
+        pipeline = Pipeline([Stage("pass", lambda n: n, workers=2)])
+        try:
+            pipeline.run(values())
+        except RuntimeError:
+            pass
+        else:
+            print("failed input FAILED: no error")
+        time.sleep(0.6)
+        alive = [thread.name for thread in threading.enumerate() if thread.name.startswith("pass-")]
+        cls.check("stopped workers", alive, [])
+
+
+if __name__ == '__main__':
+    # Failures of values are expected, they're checked in the stats and results
+    logging.disable(logging.ERROR)
+    PipelineTest.test_stages()
+    PipelineTest.test_backpressure()
+    PipelineTest.test_pool_stage()
+    PipelineTest.test_failed_input()
@@ -0,0 +1,85 @@
+from profiling import Profiler
+from pathlib import Path
+import tempfile
+import threading
+import profiling
+import time
+
+DELAY = 0.05
+
+
+def scrape_work():
+    time.sleep(DELAY)
+
+
+def download_work():
+    sum(range(10000))
+
+
+def slow_items(count: int):
+    for index in range(count):
+        time.sleep(DELAY)
+        yield index
+
+
+class ProfilerTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def functions(cls, profiler: Profiler, phase: str) -> set:
+        return {function.split("(")[-1].rstrip(")") for function, _, _, _ in profiler.top_functions(phase)}
+
+    @classmethod
+    def test_inactive(cls):
+        """Without a running profiler spans cost nothing and items are passed through."""
+        items = iter([1, 2])
+        cls.check("same iterator", profiling.timed_items(items, "name") is items, True)
+        with profiling.span("name"):
+            pass
+
+    @classmethod
+    def test_phases(cls):
+        """Calls are profiled in their phase, also in threads started during it, nested phase pauses the outer."""
+        with tempfile.TemporaryDirectory() as path:
+            profiler = Profiler(Path(path), top=50)
+            with profiler:
+                with profiler.phase("scrape"):
+                    thread = threading.Thread(target=scrape_work)
+                    thread.start()
+                    thread.join()
+                    with profiler.phase("download"):
+                        download_work()
+
+            cls.check("scrape thread profiled", "scrape_work" in cls.functions(profiler, "scrape"), True)
+            cls.check("nested call left out", "download_work" in cls.functions(profiler, "scrape"), False)
+            cls.check("nested call", "download_work" in cls.functions(profiler, "download"), True)
+            cls.check("files", sorted(p.name for p in Path(path).iterdir()),
+                      ["download.prof", "download.txt", "scrape.prof", "scrape.txt", "spans.txt"])
+
+    @classmethod
+    def test_spans(cls):
+        """Item spans count the time of the producer only, not of the consumer."""
+        with tempfile.TemporaryDirectory() as path:
+            profiler = Profiler(Path(path))
+            with profiler:
+                for _ in profiling.timed_items(slow_items(3), "Extractor._extract_data"):
+                    time.sleep(DELAY * 2)
+                with profiling.span("Crawler._crawl_link"):
+                    time.sleep(DELAY)
+
+            extract = profiler.spans["Extractor._extract_data"]
+            cls.check("items", (extract.calls, extract.items), (1, 3))
+            if not DELAY * 3 <= extract.total < DELAY * 5:
+                print(f"producer time FAILED: {extract.total:.3f}s, expected about {DELAY * 3:.3f}s")
+            cls.check("crawl span", profiler.spans["Crawler._crawl_link"].calls, 1)
+            cls.check("spans written", "Extractor._extract_data" in (Path(path) / "spans.txt").read_text(), True)
+        cls.check("stopped", profiling._profiler, None)
+
+
+if __name__ == '__main__':
+    ProfilerTest.test_inactive()
+    ProfilerTest.test_phases()
+    ProfilerTest.test_spans()
@@ -0,0 +1,72 @@
+from downloader.progress import ProgressView, LIVE, PLAIN, format_size, format_duration
+from downloader.downloader import Item
+import io
+
+
+def new_item(index: int) -> Item:
+    return Item(content_type="image", filename=f"file{index}", extension=".jpg",
+                source=f"https://cdn.bunkr.is/file{index}.jpg")
+
+
+class ProgressTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_formatting(cls):
+        cls.check("bytes", format_size(512), "512 B")
+        cls.check("megabytes", format_size(1.5 * 1024 * 1024), "1.5 MB")
+        cls.check("terabytes", format_size(2 * 1024 ** 4), "2.0 TB")
+        cls.check("duration", format_duration(3725), "01:02:05")
+
+    @classmethod
+    def test_aggregate(cls):
+        """Items and bytes of all transfers are counted together, failed items apart."""
+        view = ProgressView(total_items=2, mode=PLAIN, stream=io.StringIO())
+        view.items_added(1)
+        first, second = new_item(1), new_item(2)
+        view.item_started(first, total=2048)
+        view.item_started(second, total=None, received=512)
+        view.item_progress(first, 1024)
+        view.item_progress(second, 1024)
+        cls.check("bytes", view.bytes, 2048)
+        cls.check("transfer lines", [line.split() for line in view.transfer_lines()],
+                  [["file1.jpg", "50%", "1.0", "KB/2.0", "KB"], ["file2.jpg", "1.5", "KB"]])
+
+        view.item_finished(first, "downloaded")
+        view.item_finished(second, "failed")
+        cls.check("summary", view.summary_line().split(" | ")[:2], ["Items 2/3 (1 failed)", "2.0 KB"])
+        cls.check("finished transfers", view.transfer_lines(), [])
+
+    @classmethod
+    def test_render(cls):
+        """Plain mode appends a summary line, live mode redraws its previous lines in place."""
+        stream = io.StringIO()
+        view = ProgressView(total_items=1, mode=PLAIN, stream=stream)
+        view.render()
+        view.render()
+        cls.check("plain lines", len(stream.getvalue().splitlines()), 2)
+        cls.check("plain no escapes", "\x1b" in stream.getvalue(), False)
+
+        stream = io.StringIO()
+        view = ProgressView(total_items=1, mode=LIVE, stream=stream)
+        view.item_started(new_item(1), total=100)
+        view.render()
+        cls.check("first draw", stream.getvalue().startswith("Items 0/1"), True)
+        drawn = len(stream.getvalue())
+        view.render()
+        cls.check("redraw clears two lines", stream.getvalue()[drawn:].startswith("\x1b[2F\x1b[J"), True)
+
+    @classmethod
+    def test_auto_mode(cls):
+        """Output which isn't a terminal gets plain lines."""
+        cls.check("auto mode", ProgressView(stream=io.StringIO()).mode, PLAIN)
+
+
+if __name__ == '__main__':
+    ProgressTest.test_formatting()
+    ProgressTest.test_aggregate()
+    ProgressTest.test_render()
+    ProgressTest.test_auto_mode()
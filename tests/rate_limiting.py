@@ -0,0 +1,77 @@
+from downloader.ratelimit import TokenBucket, HostRateLimiter, parse_retry_after, parse_rate_limit_reset
+from downloader.bandwidth import BandwidthLimiter
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import time
+
+# Allowed difference of measured waits, sleeps overshoot a little
+TOLERANCE = 0.05
+
+
+class RateLimitTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def check_close(cls, name: str, value: float, expected: float, tolerance: float = TOLERANCE):
+        if abs(value - expected) > tolerance:
+            print(f"{name} FAILED: {value:.3f}, expected {expected:.3f}")
+
+    @classmethod
+    def test_token_bucket(cls):
+        """Burst is served at once, then the requests wait in order for the refill."""
+        bucket = TokenBucket(rate=10, capacity=2)
+        waits = [bucket.reserve() for _ in range(5)]
+        for i, (wait, expected) in enumerate(zip(waits, (0, 0, 0.1, 0.2, 0.3))):
+            cls.check_close(f"bucket wait {i}", wait, expected, tolerance=0.01)
+
+        limiter = HostRateLimiter(max_rate=10, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire("a.example.com")
+        cls.check_close("acquire timing", time.monotonic() - start, 0.4)
+
+    @classmethod
+    def test_retry_after(cls):
+        """Throttled host waits for Retry-After at a halved rate, other hosts aren't affected."""
+        cls.check("retry after seconds", parse_retry_after("3"), 3.0)
+        date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        cls.check_close("retry after date", parse_retry_after(date), 30, tolerance=1.5)
+        cls.check("retry after invalid", parse_retry_after("soon"), None)
+        cls.check("quota left", parse_rate_limit_reset({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "9"}),
+                  None)
+        cls.check("quota exhausted", parse_rate_limit_reset({"RateLimit-Remaining": "0", "RateLimit-Reset": "9"}),
+                  9.0)
+
+        limiter = HostRateLimiter(max_rate=10, burst=10)
+        limiter.update("a.example.com", 429, {"Retry-After": "2"})
+        cls.check_close("throttled host delay", limiter.delay("a.example.com"), 2.0)
+        cls.check_close("other host delay", limiter.delay("b.example.com"), 0.0)
+        cls.check("halved rate", limiter._state("a.example.com").bucket.rate, 5.0)
+        cls.check("throttled count", limiter.throttled(), {"a.example.com": 1})
+
+        # Without Retry-After the block grows with every throttled response
+        limiter.update("c.example.com", 503, {})
+        limiter.update("c.example.com", 503, {})
+        cls.check_close("backoff delay", limiter.delay("c.example.com"), 4.0)
+
+        limiter.update("a.example.com", 200, {})
+        cls.check_close("raised rate", limiter._state("a.example.com").bucket.rate, 5.2, tolerance=1e-9)
+
+    @classmethod
+    def test_bandwidth(cls):
+        """Transfers share the global limit, the host limit applies to its host only."""
+        limiter = BandwidthLimiter(rate=100 * 1024, host_rate=50 * 1024, watch_config=False)
+        waits = [limiter.delay("a.example.com", 50 * 1024) for _ in range(3)]
+        other = limiter.delay("b.example.com", 50 * 1024)
+        cls.check("first transfers within burst", waits[0], 0.0)
+        cls.check("host limited", waits[2] > waits[1] > 0, True)
+        cls.check("global limit applies to other host", other > 0, True)
+
+
+if __name__ == '__main__':
+    RateLimitTest.test_token_bucket()
+    RateLimitTest.test_retry_after()
+    RateLimitTest.test_bandwidth()
@@ -0,0 +1,68 @@
+from benchmarks.standin import StandInServer
+from downloader.scheduler import DownloadScheduler, SizeProber, SCRAPE_ORDER, SMALLEST_FIRST, LARGEST_FIRST, \
+    INTERLEAVE
+from downloader.downloader import Downloader, Item
+import requests
+
+
+def new_item(name: str, size: int = None, source: str = None) -> Item:
+    return Item(content_type="image", filename=name, extension=".jpg",
+                source=source or f"https://cdn.bunkr.is/{name}.jpg", size=size)
+
+
+ITEMS = [new_item("a", 30), new_item("b"), new_item("c", 10), new_item("d", 40), new_item("e", 20), new_item("f")]
+
+
+class SchedulerTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def names(cls, items: list) -> str:
+        return "".join(item.filename for item in items)
+
+    @classmethod
+    def test_order(cls):
+        """Sized items are ordered by the policy, the ones of unknown size follow in scrape order."""
+        for policy, expected in ((SCRAPE_ORDER, "abcdef"), (SMALLEST_FIRST, "ceadbf"),
+                                 (LARGEST_FIRST, "daecbf"), (INTERLEAVE, "cdeabf")):
+            cls.check(f"{policy} order", cls.names(DownloadScheduler(policy).order(ITEMS)), expected)
+
+        try:
+            DownloadScheduler("random")
+        except ValueError:
+            pass
+        else:
+            print("unknown policy FAILED: no error")
+
+    @classmethod
+    def test_split(cls):
+        """Items from the large threshold go to the dedicated workers, unknown sizes stay small."""
+        scheduler = DownloadScheduler(SMALLEST_FIRST, large_threshold=30)
+        small, large = scheduler.split(scheduler.order(ITEMS))
+        cls.check("small", cls.names(small), "cebf")
+        cls.check("large", cls.names(large), "ad")
+        cls.check("needs sizes", (scheduler.needs_sizes, DownloadScheduler().needs_sizes), (True, False))
+
+    @classmethod
+    def test_probe(cls):
+        """Missing sizes are probed with HEAD requests, sizes given by the host aren't."""
+        with StandInServer(items=1, page_size=1, sizes=[1024]) as server:
+            sized = new_item("sized", 5, f"http://{server.address}/file000001s1024.jpg")
+            unknown = new_item("unknown", source=f"http://{server.address}/file000002s2048.jpg")
+            missing = new_item("missing", source=f"http://{server.address}/missing.jpg")
+            scheduler = DownloadScheduler(SMALLEST_FIRST, prober=SizeProber(Downloader(requests.Session())))
+
+            requests_before = server.counters["requests"]
+            probed = scheduler.probe([sized, unknown, missing])
+            cls.check("probed sizes", [item.size for item in probed], [5, 2048, None])
+            cls.check("probe requests", server.counters["requests"] - requests_before, 2)
+            cls.check("probed order", cls.names(scheduler.order(probed)), "sizedunknownmissing")
+
+
+if __name__ == '__main__':
+    SchedulerTest.test_order()
+    SchedulerTest.test_split()
+    SchedulerTest.test_probe()
@@ -0,0 +1,33 @@
+from downloader.summary import RunSummary, DOWNLOADED, SKIPPED, FAILED
+from downloader.item import Item
+
+
+def new_item(index: int) -> Item:
+    return Item(content_type="image", filename=f"file{index}", extension=".jpg",
+                source=f"https://cdn.bunkr.is/file{index}.jpg")
+
+
+class RunSummaryTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_record(cls):
+        """Decisions are counted, only sources and messages of the reported ones are kept."""
+        summary = RunSummary()
+        for index in range(5):
+            summary.record(new_item(index), DOWNLOADED if index % 2 else SKIPPED)
+        failed = new_item(5)
+        summary.record(failed, FAILED, ConnectionError("reset"))
+
+        cls.check("counts", dict(summary.counts()), {DOWNLOADED: 2, SKIPPED: 3, FAILED: 1})
+        cls.check("failed", summary.sources(FAILED), [(failed.source, "reset")])
+        cls.check("skipped not listed", summary.sources(SKIPPED), [])
+        cls.check("item not kept", any(isinstance(value, Item) for entry in summary._reported for value in entry),
+                  False)
+
+
+if __name__ == '__main__':
+    RunSummaryTest.test_record()
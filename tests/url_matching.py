@@ -1,4 +1,16 @@
-from scrapers import get_scraper_classes
+from scrapers import get_scraper_classes, get_scraper_index, get_link_scanner, MANIFEST
+from scrapers._scraper_base import ScraperBase
+from downloader.hostnames import host_of
+import subprocess
+import sys
+
+
+def linear_scan(url):
+    """Scraper chosen by trying every scraper in order, as before the scraper index."""
+    for scraper in get_scraper_classes():
+        if scraper.is_suitable(url):
+            return scraper
+    return None
 
 
 class UrlMatchingTest:
@@ -10,6 +22,87 @@ class UrlMatchingTest:
                 if not scraper.is_suitable(url):
                     print(f"{scraper.__name__} FAILED TO MATCH: {url}")
 
+    @classmethod
+    def test_manifest(cls):
+        """Manifest entries have the values of their classes and cover every scraper."""
+        for entry in MANIFEST:
+            scraper = entry.load()
+            for attribute in ("DOMAIN", "HOSTS", "SCRAPER_TYPE", "DESC"):
+                if getattr(entry, attribute) != getattr(scraper, attribute):
+                    print(f"{entry.name} MANIFEST MISMATCH: {attribute} {getattr(entry, attribute)!r}, "
+                          f"class has {getattr(scraper, attribute)!r}")
+
+        names = [entry.name for entry in MANIFEST]
+        for name in set(names):
+            if names.count(name) > 1:
+                print(f"{name} LISTED {names.count(name)} TIMES IN MANIFEST")
+
+        listed = set(get_scraper_classes())
+        stack = list(ScraperBase.__subclasses__())
+        while stack:
+            scraper = stack.pop()
+            stack += scraper.__subclasses__()
+            if scraper.__module__.startswith("scrapers.") and scraper.__name__.endswith(("Extractor", "Crawler")) \
+                    and scraper not in listed:
+                print(f"{scraper.__name__} MISSING IN MANIFEST")
+
+        # Classifying a url imports only the module of its scraper
+        code = "import sys; from scrapers import get_scraper_index; " \
+               "get_scraper_index().scraper_for('https://gofile.io/d/abc'); " \
+               "print(sorted(name for name in sys.modules if name.startswith('scrapers.')))"
+        imported = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout.strip()
+        expected = str(sorted(["scrapers._scraper_base", "scrapers.dispatch", "scrapers.gofile",
+                               "scrapers.gofile_auth", "scrapers.linkscan", "scrapers.manifest"]))
+        if imported != expected:
+            print(f"LAZY IMPORT MISMATCH: {imported}, expected {expected}")
+
+    @classmethod
+    def test_dispatch(cls):
+        """Scraper index chooses the same scraper as the linear scan."""
+        urls = []
+        for scraper in get_scraper_classes():
+            for url in scraper.SAMPLE_URLS:
+                scheme_less = url.split("://", 1)[-1]
+                urls += [url, scheme_less, f"www.{scheme_less}", url.upper(), url + "/", url[:-3], f"{url}?page=2"]
+        urls += ["", "not a url", "https://example.com/a/xyz", "https://bunkr.is.example.com/a/xyz",
+                 "ftp://bunkr.is/a/xyz", "https://user@gofile.io/d/abc", "https://gofile.io:443/d/abc"]
+
+        hosts = {"https://cdn1.Bunkr.is/file.jpg": "cdn1.bunkr.is", "bunkr.is/a/xyz": "bunkr.is",
+                 "HTTP://user@Host.com:80/x?y#z": "host.com", "http://[::1]:80/a": "::1",
+                 "a.com?u=http://b.com": "a.com", "http://[::1": "", "": ""}
+        for url, expected in hosts.items():
+            if host_of(url) != expected:
+                print(f"HOST MISMATCH: {url!r} -> {host_of(url)!r}, expected {expected!r}")
+
+        index = get_scraper_index()
+        for url, scraper in zip(urls, index.classify(urls)):
+            expected = linear_scan(url)
+            if scraper is not expected:
+                print(f"DISPATCH MISMATCH: {url} -> {scraper and scraper.__name__}, "
+                      f"expected {expected and expected.__name__}")
+
+    @classmethod
+    def test_link_scan(cls):
+        """Link scanner finds the same links as '_extract_from_html' of every extractor on the whole page."""
+        urls = [url for scraper in get_scraper_classes() for url in scraper.SAMPLE_URLS]
+        html = "<html><body>\n" + "\n".join(
+            f'<div class="post">Post {i} <a href="{url}" target="_blank">{url}</a> '
+            f"<img src='{url}'/> text {url}<br/>{url}&amp;x=1 ({url})</div>"
+            for i, url in enumerate(urls)
+        ) + "\n</body></html>"
+
+        scanner = get_link_scanner()
+        found = scanner.scan(html)
+        for entry in scanner.entries:
+            extractor = entry.load()
+            expected = extractor._extract_from_html(html) or []
+            links = found.get(extractor, [])
+            if sorted(links) != sorted(expected):
+                print(f"{extractor.__name__} LINK SCAN MISMATCH: {sorted(links)}, expected {sorted(expected)}")
+
 
 if __name__ == '__main__':
     UrlMatchingTest.test()
+    UrlMatchingTest.test_manifest()
+    UrlMatchingTest.test_dispatch()
+    UrlMatchingTest.test_link_scan()
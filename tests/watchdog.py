@@ -0,0 +1,69 @@
+from downloader.watchdog import TransferMonitor, StallWatchdog
+import threading
+import time
+
+WINDOW = 0.2
+
+
+class WatchdogTest:
+    @classmethod
+    def check(cls, name: str, value, expected):
+        if value != expected:
+            print(f"{name} FAILED: {value!r}, expected {expected!r}")
+
+    @classmethod
+    def test_stall(cls):
+        """Window ending below the minimum speed stalls the transfer once, faster windows start a new one."""
+        stalls = []
+        monitor = TransferMonitor(min_speed=1000, window=WINDOW, on_stall=lambda: stalls.append(True))
+        cls.check("window not over", monitor.check(), False)
+        time.sleep(WINDOW)
+        monitor.update(1000)
+        cls.check("fast window", monitor.check(), False)
+
+        time.sleep(WINDOW)
+        monitor.update(10)
+        cls.check("slow window", monitor.check(), True)
+        cls.check("stays stalled", monitor.check(), True)
+        cls.check("on_stall called once", stalls, [True])
+
+        unlimited = TransferMonitor(min_speed=0, window=WINDOW)
+        time.sleep(WINDOW)
+        cls.check("no minimum speed", unlimited.check(), False)
+
+    @classmethod
+    def test_paused(cls):
+        """Waits for the bandwidth limit aren't counted in the window."""
+        monitor = TransferMonitor(min_speed=1000, window=WINDOW)
+        monitor.sleep(WINDOW * 1.5)
+        cls.check("paused window", monitor.check(), False)
+
+        # Pause still running when checked from the watchdog thread
+        checked = []
+        with monitor.paused():
+            thread = threading.Thread(target=lambda: checked.append(monitor.check()))
+            time.sleep(WINDOW * 1.5)
+            thread.start()
+            thread.join()
+        cls.check("check during pause", checked, [False])
+
+    @classmethod
+    def test_watchdog(cls):
+        """Watchdog thread finds a transfer without progress and aborts it."""
+        watchdog = StallWatchdog(min_speed=1000, window=WINDOW)
+        watchdog.INTERVAL = WINDOW / 4
+        cls.check("read size", watchdog.chunk_size(64 * 1024), StallWatchdog.MIN_READ_SIZE)
+        cls.check("disabled read size", StallWatchdog().chunk_size(64 * 1024), 64 * 1024)
+
+        with watchdog.monitor(None, name="stuck") as monitor:
+            aborted = threading.Event()
+            monitor.on_stall = aborted.set
+            cls.check("aborted", aborted.wait(WINDOW * 5), True)
+        cls.check("stalled count", watchdog.stalled, 1)
+        cls.check("error", "stuck" in str(monitor.error()), True)
+
+
+if __name__ == '__main__':
+    WatchdogTest.test_stall()
+    WatchdogTest.test_paused()
+    WatchdogTest.test_watchdog()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, Iterator, List, Union
 from pathlib import Path
 import os
 
@@ -16,6 +16,26 @@ def split_filename_ext(file) -> tuple:
     return filename, extension
 
 
+def parse_size(value) -> Union[int, None]:
+    """Size in bytes from a number or numeric string of host metadata, None if invalid."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return None
+    return size if size >= 0 else None
+
+
+def roundrobin(*iterables: Iterable) -> Iterator:
+    """Yields from the iterables in turns until all of them are exhausted."""
+    iterators = [iter(iterable) for iterable in iterables]
+    while iterators:
+        for iterator in list(iterators):
+            try:
+                yield next(iterator)
+            except StopIteration:
+                iterators.remove(iterator)
+
+
 def save_links(
         links: List[str],
         output_path: Path,